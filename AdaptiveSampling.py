@@ -0,0 +1,150 @@
+import time
+
+
+class SensorSchedule:
+    """
+    Adaptive sampling interval of a sensor with an acceptable band [low, high].
+
+    The interval doubles after every reading that is stable and well inside the band, up to max_interval.
+    It drops back to min_interval as soon as a reading gets close to (or outside) a threshold, and it is
+    halved when the value moves fast. When the value is drifting, the interval is also kept shorter than
+    the time the drift would take to reach the nearest threshold.
+    """
+
+    NEAR_THRESHOLD = 0.1  # Fraction of the band width considered close to a threshold
+    FAST_CHANGE = 0.1  # Change between two readings, as a fraction of the band width, considered fast
+    SAFETY_FACTOR = 0.5  # Fraction of the estimated time to the nearest threshold the interval may use
+
+    def __init__(self, low: float, high: float, min_interval: float, max_interval: float):
+        """
+        :param low: Lower threshold of the band, None if only the upper one matters.
+        :type low: float
+        :param high: Upper threshold of the band, None if only the lower one matters.
+        :type high: float
+        :param min_interval: Shortest interval between two readings, in seconds.
+        :type min_interval: float
+        :param max_interval: Longest interval between two readings, in seconds.
+        :type max_interval: float
+        """
+        self.low = low
+        self.high = high
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.next_time = None
+        self.last_value = None
+        self.last_time = None
+
+    def is_due(self, now: float) -> bool:
+        """
+        :param now: The current time (time.monotonic()).
+        :type now: float
+
+        :return: True if the sensor should be read now.
+        """
+        return self.next_time is None or now >= self.next_time
+
+    def band_width(self) -> float:
+        if self.low is not None and self.high is not None:
+            return self.high - self.low
+        return abs(self.high if self.high is not None else self.low) or 1.0
+
+    def distance_to_threshold(self, value: float) -> float:
+        """
+        :return: Distance from value to the nearest threshold, negative if value is outside the band.
+        """
+        distances = []
+        if self.low is not None:
+            distances.append(value - self.low)
+        if self.high is not None:
+            distances.append(self.high - value)
+        return min(distances)
+
+    def update(self, value: float, now: float) -> float:
+        """
+        Record a reading and schedule the next one.
+
+        :param value: The reading, None if the sensor could not be read.
+        :type value: float
+        :param now: When the reading was taken (time.monotonic()).
+        :type now: float
+
+        :return: The interval before the next reading, in seconds.
+        """
+        if value is None:
+            self.interval = self.min_interval
+        else:
+            width = self.band_width()
+            distance = self.distance_to_threshold(value)
+            change = abs(value - self.last_value) if self.last_value is not None else 0.0
+            if distance <= self.NEAR_THRESHOLD * width:
+                self.interval = self.min_interval
+            elif change >= self.FAST_CHANGE * width:
+                self.interval = max(self.interval / 2, self.min_interval)
+            else:
+                self.interval = min(self.interval * 2, self.max_interval)
+            if change > 0 and self.last_time is not None and now > self.last_time:
+                # Keep a margin before the drift could reach the nearest threshold
+                time_to_threshold = distance / (change / (now - self.last_time))
+                self.interval = max(min(self.interval, time_to_threshold * self.SAFETY_FACTOR), self.min_interval)
+            self.last_value = value
+            self.last_time = now
+        self.next_time = now + self.interval
+        return self.interval
+
+
+class AdaptiveSampler:
+    """
+    Decide which sensors are due for a reading.
+
+    Each sensor has a SensorSchedule and a function returning its latest value, read after the sensor
+    has been sampled to adapt its interval.
+    """
+
+    def __init__(self, clock=None):
+        """
+        :param clock: Function returning the current time in seconds, time.monotonic if None.
+        :type clock: callable
+        """
+        self.clock = clock if clock is not None else time.monotonic
+        self.sensors = {}
+
+    def add(self, name, schedule: SensorSchedule, get_value) -> None:
+        """
+        :param name: The key of the sensor.
+        :param schedule: The sampling schedule of the sensor.
+        :type schedule: SensorSchedule
+        :param get_value: Function returning the latest value of the sensor.
+        :type get_value: callable
+
+        :return: None
+        """
+        self.sensors[name] = (schedule, get_value)
+
+    def due(self) -> list:
+        """
+        :return: The names of the sensors that should be read now.
+        """
+        now = self.clock()
+        return [name for name, (schedule, _) in self.sensors.items() if schedule.is_due(now)]
+
+    def sampled(self, name, ok: bool = True) -> float:
+        """
+        Adapt the interval of a sensor that has just been read.
+
+        :param name: The key of the sensor.
+        :param ok: False if the reading failed, the sensor is then read again after the minimum interval.
+        :type ok: bool
+
+        :return: The interval before its next reading, in seconds.
+        """
+        schedule, get_value = self.sensors[name]
+        return schedule.update(get_value() if ok else None, self.clock())
+
+    def time_until_next(self) -> float:
+        """
+        :return: Seconds before the next sensor is due, 0 if one is already due.
+        """
+        now = self.clock()
+        return max(min((schedule.next_time - now if schedule.next_time is not None else 0.0)
+                       for schedule, _ in self.sensors.values()), 0.0) if self.sensors else 0.0
@@ -0,0 +1,142 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from EmbeddedPool import EmbeddedPool
+from libs.DFRobot_ADS1115 import ADS1115_PGA_COEFFICIENTS
+from libs.DFRobot_PH import DFRobot_PH, PHCalibration
+
+SENSORS = ("ph", "orp", "turbidity", "light")
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("NumPy is required for batch conversion (pip install numpy)")
+
+
+def codes_to_millivolts(codes, gain: int = 0x00):
+    """
+    Convert raw ADS1115 codes to mV, truncating like ADS1115.read_voltage.
+
+    :param codes: Array of raw signed 16-bit codes.
+    :param gain: The ADS1115 gain setting the codes were taken with.
+    :type gain: int
+
+    :return: Array of voltages in mV.
+    """
+    _require_numpy()
+    return np.trunc(np.asarray(codes, dtype=np.float64) * ADS1115_PGA_COEFFICIENTS[gain])
+
+
+def ph_from_voltage(voltages, calibration=None, temperature=None):
+    """
+    Vectorized DFRobot_PH.read_PH.
+
+    :param voltages: Array of pH probe voltages in mV.
+    :param calibration: (neutralVoltage, acidVoltage), the default DFRobot_PH calibration if None.
+    :type calibration: tuple
+    :param temperature: Water temperature (°C), one value or an array matching voltages, 25°C if None.
+
+    :return: Array of pH values.
+    """
+    _require_numpy()
+    if calibration is None:
+        calibration = DFRobot_PH().get_calibration()
+    model = PHCalibration(*calibration)
+    ph = model.to_PH(np.asarray(voltages, dtype=np.float64))
+    if temperature is None:
+        return ph
+    return model.compensate(ph, np.asarray(temperature, dtype=np.float64))
+
+
+def orp_from_voltage(voltages):
+    """
+    Vectorized EmbeddedPool.voltage_to_orp.
+
+    :param voltages: Array of ORP probe voltages in mV.
+
+    :return: Array of ORP values in mV.
+    """
+    _require_numpy()
+    voltages = np.asarray(voltages, dtype=np.float64) / 1000  # from mV to V
+    system_voltage = EmbeddedPool.ORP_SYSTEM_VOLTAGE
+    orp = np.trunc(((30 * system_voltage * 1000) - (75 * voltages * 1000)) / 75 - EmbeddedPool.ORP_OFFSET)
+    return orp.astype(np.int64)
+
+
+def turbidity_from_voltage(voltages):
+    """
+    Vectorized EmbeddedPool.voltage_to_turbidity, negative NTU values are clamped to zero.
+
+    :param voltages: Array of turbidity sensor voltages in mV.
+
+    :return: Array of turbidity values in NTU.
+    """
+    _require_numpy()
+    voltages = np.asarray(voltages, dtype=np.float64) / 1000  # from mV to V
+    a, b, c = EmbeddedPool.TURBIDITY_COEFFICIENTS
+    ntu = (a * (voltages ** 2)) + (b * voltages) + c
+    return np.maximum(ntu, 0)
+
+
+def lux_from_voltage(voltages):
+    """
+    Vectorized EmbeddedPool.voltage_to_lux, negative lux values are clamped to zero.
+
+    :param voltages: Array of light sensor voltages in mV.
+
+    :return: Array of light levels in lux.
+    """
+    _require_numpy()
+    voltages = np.asarray(voltages, dtype=np.float64)
+    numerator, denominator = EmbeddedPool.LUX_SLOPE
+    lux = np.trunc((((voltages - EmbeddedPool.LUX_ZERO_VOLTAGE) * numerator) / denominator) + EmbeddedPool.LUX_OFFSET)
+    lux = lux.astype(np.int64)
+    return np.maximum(lux, 0)
+
+
+def convert_batch(ph=None, orp=None, turbidity=None, light=None, codes=False, gain=0x00, calibration=None,
+                  temperature=None) -> dict:
+    """
+    Convert recorded analog readings and check them against the EmbeddedPool thresholds.
+
+    Uses the same formulas and the same range checks as the EmbeddedPool.check_* methods.
+    Sensors left as None are skipped.
+
+    :param ph: Array of pH probe readings.
+    :param orp: Array of ORP probe readings.
+    :param turbidity: Array of turbidity sensor readings.
+    :param light: Array of light sensor readings.
+    :param codes: True if the readings are raw ADS1115 codes, False if they are voltages in mV.
+    :type codes: bool
+    :param gain: ADS1115 gain of the codes, either one value or a dict keyed by sensor name.
+    :param calibration: (neutralVoltage, acidVoltage) for pH, the default DFRobot_PH calibration if None.
+    :type calibration: tuple
+    :param temperature: Water temperature (°C) for the pH compensation, one value or an array, 25°C if None.
+
+    :return: A dict with the converted array of each sensor ("ph", "orp", "turbidity", "light")
+             and the matching boolean in-range mask ("ph_ok", "orp_ok", "turbidity_ok", "light_ok").
+    """
+    _require_numpy()
+    readings = {"ph": ph, "orp": orp, "turbidity": turbidity, "light": light}
+    result = {}
+    for sensor in SENSORS:
+        values = readings[sensor]
+        if values is None:
+            continue
+        if codes:
+            values = codes_to_millivolts(values, gain[sensor] if isinstance(gain, dict) else gain)
+        if sensor == "ph":
+            result["ph"] = ph_from_voltage(values, calibration, temperature)
+            result["ph_ok"] = (EmbeddedPool.PH_MIN < result["ph"]) & (result["ph"] < EmbeddedPool.PH_MAX)
+        elif sensor == "orp":
+            result["orp"] = orp_from_voltage(values)
+            result["orp_ok"] = (EmbeddedPool.ORP_MIN <= result["orp"]) & (result["orp"] <= EmbeddedPool.ORP_MAX)
+        elif sensor == "turbidity":
+            result["turbidity"] = turbidity_from_voltage(values)
+            result["turbidity_ok"] = ((EmbeddedPool.TURBIDITY_MIN <= result["turbidity"])
+                                      & (result["turbidity"] <= EmbeddedPool.TURBIDITY_MAX))
+        else:
+            result["light"] = lux_from_voltage(values)
+            result["light_ok"] = (EmbeddedPool.LUX_MIN <= result["light"]) & (result["light"] <= EmbeddedPool.LUX_MAX)
+    return result
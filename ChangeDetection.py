@@ -0,0 +1,59 @@
+class ChangeDetector:
+    """
+    Report-by-exception filter for sensor readings.
+
+    A reading is reported as changed only when it moves more than the deadband of its sensor away from
+    the last reported value, or when it crosses a threshold (its in-range flag flips). Small fluctuations
+    are absorbed without moving the reference, so a slow drift is still reported once it adds up.
+    """
+
+    def __init__(self, deadbands: dict = None, default_deadband: float = 0):
+        """
+        :param deadbands: Deadband of each sensor, in the unit of its readings.
+        :type deadbands: dict
+        :param default_deadband: Deadband of the sensors missing from deadbands.
+        :type default_deadband: float
+        """
+        self.deadbands = dict(deadbands or {})
+        self.default_deadband = default_deadband
+        self.reported = {}
+
+    def update(self, name, value, in_range: bool = None) -> bool:
+        """
+        Check a new reading against the last reported one.
+
+        :param name: The key of the sensor.
+        :param value: The new reading, None if there is none.
+        :param in_range: Whether the reading is within the thresholds of the sensor, None if not applicable.
+        :type in_range: bool
+
+        :return: True if the reading must be reported (it then becomes the reference), False otherwise.
+        """
+        if name in self.reported:
+            last_value, last_in_range = self.reported[name]
+            if in_range == last_in_range and not self._moved(name, last_value, value):
+                return False
+        self.reported[name] = (value, in_range)
+        return True
+
+    def _moved(self, name, last_value, value) -> bool:
+        if last_value is None or value is None:
+            return last_value is not value
+        return abs(value - last_value) > self.deadbands.get(name, self.default_deadband)
+
+    def last(self, name) -> tuple:
+        """
+        :return: (value, in_range) last reported for a sensor, (None, None) if nothing was reported yet.
+        """
+        return self.reported.get(name, (None, None))
+
+    def reset(self, name=None) -> None:
+        """
+        Forget the last reported reading of a sensor (all sensors if None), so the next one is reported.
+
+        :return: None
+        """
+        if name is None:
+            self.reported.clear()
+        else:
+            self.reported.pop(name, None)
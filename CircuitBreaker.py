@@ -0,0 +1,110 @@
+import time
+
+# Circuit states
+CLOSED = "closed"  # Healthy: every call goes through
+OPEN = "open"  # Degraded: calls are skipped until the backoff delay expires
+HALF_OPEN = "half-open"  # Probing: one call goes through to test the sensor
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for a sensor.
+
+    After failure_threshold consecutive failures the circuit opens and the sensor is skipped for a delay
+    that doubles every time the circuit opens again, up to max_delay. Once the delay expires the circuit
+    is half-open: the next call probes the sensor, a success closes the circuit and a failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 3, base_delay: float = 5.0, max_delay: float = 300.0,
+                 clock=time.monotonic):
+        """
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :type failure_threshold: int
+        :param base_delay: Seconds the circuit stays open the first time.
+        :type base_delay: float
+        :param max_delay: Upper bound of the backoff delay, in seconds.
+        :type max_delay: float
+        :param clock: Function returning the current time in seconds.
+        :type clock: callable
+        """
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = None
+        self.last_error = None
+
+    def allow(self) -> bool:
+        """
+        Tell whether the sensor should be read now.
+
+        :return: False while the circuit is open, True otherwise.
+        """
+        if self.state == OPEN:
+            if self.clock() < self.open_until:
+                return False
+            self.state = HALF_OPEN
+        return True
+
+    def record_success(self) -> None:
+        """
+        Record a successful read, closing the circuit.
+
+        :return: None
+        """
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = None
+        self.last_error = None
+
+    def record_failure(self, error: Exception = None) -> None:
+        """
+        Record a failed read, opening the circuit after failure_threshold failures or a failed probe.
+
+        :param error: The exception raised by the read.
+        :type error: Exception
+
+        :return: None
+        """
+        self.failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trips += 1
+            delay = min(self.base_delay * 2 ** (self.trips - 1), self.max_delay)
+            self.state = OPEN
+            self.open_until = self.clock() + delay
+
+    def call(self, func, *args, **kwargs) -> bool:
+        """
+        Call func unless the circuit is open, recording the outcome.
+
+        :param func: The function reading the sensor.
+        :type func: callable
+
+        :return: True if func was called and succeeded, False if it was skipped or raised.
+        """
+        if not self.allow():
+            return False
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            return False
+        self.record_success()
+        return True
+
+    def health(self) -> dict:
+        """
+        Get the health of the sensor.
+
+        :return: A dict with the "state", the consecutive "failures", the "last_error" and
+                 the seconds before the next probe ("retry_in", None unless the circuit is open).
+        """
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(self.open_until - self.clock(), 0.0)
+        return {"state": self.state, "failures": self.failures, "last_error": self.last_error, "retry_in": retry_in}
@@ -0,0 +1,96 @@
+from array import array
+from libs.DFRobot_ADS1115 import ADS1115_PGA_COEFFICIENTS
+
+
+class ConversionTables:
+    """
+    Lookup tables from raw ADS1115 codes to engineering units.
+
+    Each registered sensor gets one table per ADC gain, with one entry for each of the 65536 raw codes.
+    A table is built the first time it is needed and rebuilt only when the sensor calibration changes,
+    so converting a burst of codes costs one indexed lookup per code.
+    """
+
+    def __init__(self):
+        self.converters = {}
+        self.tables = {}
+
+    def register(self, sensor, convert, calibration=None) -> None:
+        """
+        Register the conversion of a sensor.
+
+        :param sensor: The key of the sensor (e.g. its ADC channel).
+        :param convert: Function converting a voltage in mV to the sensor unit.
+        :type convert: callable
+        :param calibration: Function returning the current calibration data, tables are rebuilt when it changes.
+        :type calibration: callable
+
+        :return: None
+        """
+        self.converters[sensor] = (convert, calibration)
+        self.invalidate(sensor)
+
+    def invalidate(self, sensor=None) -> None:
+        """
+        Drop the tables of a sensor (all sensors if None), so they are rebuilt on the next conversion.
+
+        :return: None
+        """
+        for key in list(self.tables):
+            if sensor is None or key[0] == sensor:
+                del self.tables[key]
+
+    def table(self, sensor, gain: int) -> array:
+        """
+        Return the lookup table of a sensor for an ADC gain.
+
+        The table is indexed by the raw code as an unsigned 16-bit value (code & 0xFFFF).
+
+        :param sensor: The key of the sensor.
+        :param gain: The ADS1115 gain setting the codes were taken with.
+        :type gain: int
+
+        :return: An array of 65536 values.
+        """
+        convert, calibration = self.converters[sensor]
+        calibration_data = calibration() if calibration is not None else None
+        cached = self.tables.get((sensor, gain))
+        if cached is not None and cached[0] == calibration_data:
+            return cached[1]
+
+        coefficient = ADS1115_PGA_COEFFICIENTS[gain]
+        values = array('d', bytes(8 * 65536))
+        for index in range(65536):
+            code = index - 65536 if index > 32767 else index
+            # Same truncation to whole mV as ADS1115.read_voltage
+            values[index] = convert(int(float(code) * coefficient))
+        self.tables[(sensor, gain)] = (calibration_data, values)
+        return values
+
+    def lookup(self, sensor, gain: int, code: int) -> float:
+        """
+        Convert one raw code of a sensor to its unit.
+
+        :param sensor: The key of the sensor.
+        :param gain: The ADS1115 gain setting the code was taken with.
+        :type gain: int
+        :param code: The raw signed 16-bit code.
+        :type code: int
+
+        :return: The converted value.
+        """
+        return self.table(sensor, gain)[code & 0xFFFF]
+
+    def convert(self, sensor, gain: int, codes) -> list:
+        """
+        Convert raw codes of a sensor to its unit.
+
+        :param sensor: The key of the sensor.
+        :param gain: The ADS1115 gain setting the codes were taken with.
+        :type gain: int
+        :param codes: The raw signed 16-bit codes.
+
+        :return: The converted values.
+        """
+        values = self.table(sensor, gain)
+        return [values[code & 0xFFFF] for code in codes]
@@ -0,0 +1,182 @@
+try:
+    import Adafruit_DHT
+except ImportError:
+    import mock.Adafruit_DHT as Adafruit_DHT
+import math
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+from libs.DHT11_IIO import DHT11_IIO
+
+# Shared memory layout: sequence counter, humidity, temperature, timestamp, last attempt, failed attempts
+_SEQ = struct.Struct('<Q')
+_DATA = struct.Struct('<ddddQ')
+SHM_SIZE = _SEQ.size + _DATA.size
+
+
+def publish(buf, humidity: float, temperature: float, timestamp: float, attempted: float = None,
+            failures: int = 0) -> None:
+    """
+    Write a reading to the shared memory.
+
+    The sequence counter is odd while the reading is being written, so readers can tell a torn read
+    from a complete one without taking a lock.
+
+    :param buf: The shared memory buffer.
+    :param humidity: The humidity, NaN if there is no valid reading yet.
+    :type humidity: float
+    :param temperature: The temperature, NaN if there is no valid reading yet.
+    :type temperature: float
+    :param timestamp: When the reading was taken (time.time()), NaN if there is no valid reading yet.
+    :type timestamp: float
+    :param attempted: When the sensor was last read, successfully or not. Defaults to timestamp.
+    :type attempted: float
+    :param failures: Failed attempts since the reading was taken.
+    :type failures: int
+
+    :return: None
+    """
+    if attempted is None:
+        attempted = timestamp
+    seq = _SEQ.unpack_from(buf, 0)[0]
+    _SEQ.pack_into(buf, 0, seq + 1)
+    _DATA.pack_into(buf, _SEQ.size, humidity, temperature, timestamp, attempted, failures)
+    _SEQ.pack_into(buf, 0, seq + 2)
+
+
+def default_reader(dht_type, pin):
+    """
+    Build the function reading the DHT11, through the kernel driver if it is loaded.
+
+    :return: A function returning (humidity, temperature).
+    """
+    dht_iio = DHT11_IIO()
+    if dht_iio.is_available():
+        return dht_iio.read
+    return lambda: Adafruit_DHT.read_retry(dht_type, pin)
+
+
+def _run(shm, stop, interval, dht_type, pin, reader) -> None:
+    if reader is None:
+        reader = default_reader(dht_type, pin)
+    reading = (math.nan, math.nan, math.nan)
+    failures = 0
+    while not stop.is_set():
+        try:
+            humidity, temperature = reader()
+        except Exception:
+            humidity, temperature = None, None
+        attempted = time.time()
+        if humidity is not None and temperature is not None:
+            reading, failures = (humidity, temperature, attempted), 0
+        else:
+            failures += 1
+        # Failed attempts keep the previous reading but are published too: the parent tells a dead
+        # sensor (failures keep growing) from a stalled worker (no recent attempt)
+        publish(shm.buf, *reading, attempted, failures)
+        stop.wait(interval)
+
+
+class DHTWorker:
+    """
+    Read the DHT11 in a child process.
+
+    DHT reads are timing sensitive and fail when other threads of this process hold the GIL at the
+    wrong moment, so they run in a dedicated process. The latest reading is published through shared
+    memory, where read() picks it up without ever blocking.
+    """
+
+    READ_ATTEMPTS = 3  # Attempts at a consistent read before falling back to the previous reading
+
+    def __init__(self, dht_type, pin: int, interval: float = 5.0, reader=None):
+        """
+        :param dht_type: The Adafruit_DHT sensor type.
+        :param pin: The GPIO pin of the sensor.
+        :type pin: int
+        :param interval: Seconds between two readings.
+        :type interval: float
+        :param reader: Function returning (humidity, temperature), called in the child process.
+                       Defaults to default_reader(dht_type, pin).
+        :type reader: callable
+        """
+        self.dht_type = dht_type
+        self.pin = pin
+        self.interval = interval
+        self.reader = reader
+        self.shm = None
+        self.process = None
+        self.stop_event = None
+        self.last_snapshot = (None, None, None, None, 0)
+
+    def start(self) -> None:
+        """
+        Create the shared memory and start the worker process.
+
+        :return: None
+        """
+        if self.is_running():
+            return
+        self.shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+        self.shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+        self.stop_event = multiprocessing.Event()
+        self.process = multiprocessing.Process(
+            target=_run, args=(self.shm, self.stop_event, self.interval, self.dht_type, self.pin, self.reader),
+            daemon=True
+        )
+        self.process.start()
+
+    def stop(self) -> None:
+        """
+        Stop the worker process and release the shared memory.
+
+        :return: None
+        """
+        if self.process is not None:
+            self.stop_event.set()
+            self.process.join(self.interval + 1)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+            self.process = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def read(self) -> tuple:
+        """
+        Get the latest reading published by the worker, without blocking.
+
+        :return: (humidity, temperature, timestamp), (None, None, None) before the first reading.
+        """
+        return self.__snapshot()[:3]
+
+    def get_status(self) -> tuple:
+        """
+        Tell how the worker is doing, without blocking.
+
+        :return: (attempted, failures): when the worker last read the sensor, successfully or not, and
+                 how many attempts failed since the latest reading. (None, 0) before the first attempt.
+        """
+        return self.__snapshot()[3:]
+
+    def __snapshot(self) -> tuple:
+        if self.shm is None:
+            return self.last_snapshot
+        buf = self.shm.buf
+        for _ in range(self.READ_ATTEMPTS):
+            seq = _SEQ.unpack_from(buf, 0)[0]
+            if seq % 2:
+                continue  # The worker is writing
+            snapshot = _DATA.unpack_from(buf, _SEQ.size)
+            if _SEQ.unpack_from(buf, 0)[0] == seq:
+                if seq > 0:
+                    # NaN: no valid reading yet
+                    reading = tuple(None if math.isnan(value) else value for value in snapshot[:3])
+                    self.last_snapshot = reading + snapshot[3:]
+                break
+        return self.last_snapshot
@@ -0,0 +1,2 @@
+class DS18B20Error(Exception):
+	pass
@@ -7,13 +7,24 @@ except ImportError:
 import time
 import threading
 import logging
+from typing import Optional
 from LCDError import LCDError
 from DHTError import DHTError
-from libs.DFRobot_ADS1115 import ADS1115
+from DS18B20Error import DS18B20Error
+from libs.DFRobot_ADS1115 import ADS1115, ADS1115_READY_POLL, ADS1115_REDUCE_TRIMMED_MEAN
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_DR_860SPS, ADS1115_REG_CONFIG_PGA_6_144V
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_PGA_4_096V, ADS1115_REG_CONFIG_PGA_2_048V
 from libs.DFRobot_PH import DFRobot_PH
 from libs.PCF8574 import PCF8574_GPIO
 from libs.Adafruit_LCD1602 import Adafruit_CharLCD
 from libs.DS18B20 import DS18B20
+from libs.DHT11_IIO import DHT11_IIO
+from ConversionTables import ConversionTables
+from DHTWorker import DHTWorker
+from CircuitBreaker import CircuitBreaker, CLOSED
+from AdaptiveSampling import AdaptiveSampler, SensorSchedule
+from ChangeDetection import ChangeDetector
+from ReadCache import ReadCache
 
 
 class EmbeddedPool:
@@ -25,12 +36,22 @@ class EmbeddedPool:
     BUTTON_NEXT_PIN = 21
     WATER_LEVEL_PIN = 17
     LED_PIN = 24
+    ADC_ALERT_PIN = 23
 
     # ADC pins
     PH_SENSOR_PIN = 0
     TURBIDITY_SENSOR_PIN = 1
     ENV_LIGHT_SENSOR_PIN = 2
     ORP_SENSOR_PIN = 3
+    ADC_OVERSAMPLING = 8  # Conversions averaged into each pH/ORP reading
+    # Input ranges each probe may autorange over, a lookup table is built for each one in use
+    ADC_GAINS = {
+        PH_SENSOR_PIN: (ADS1115_REG_CONFIG_PGA_4_096V, ADS1115_REG_CONFIG_PGA_2_048V),  # 0-3 V output
+        TURBIDITY_SENSOR_PIN: (ADS1115_REG_CONFIG_PGA_6_144V, ADS1115_REG_CONFIG_PGA_4_096V),  # 2.5-4.5 V output
+        ENV_LIGHT_SENSOR_PIN: (ADS1115_REG_CONFIG_PGA_6_144V, ADS1115_REG_CONFIG_PGA_4_096V,
+                               ADS1115_REG_CONFIG_PGA_2_048V),
+        ORP_SENSOR_PIN: (ADS1115_REG_CONFIG_PGA_4_096V, ADS1115_REG_CONFIG_PGA_2_048V),  # 2000 mV - ORP
+    }
 
     # Servo motor stuff
     DC_OPEN = (180 / 18) + 2
@@ -50,9 +71,105 @@ class EmbeddedPool:
     LUX_MIN = 200
     LUX_MAX = 400
 
+    # Probe calibrations, shared by the voltage_to_* methods, BatchConversion and the ADC alarms
+    ORP_SYSTEM_VOLTAGE = 5.00  # V
+    ORP_OFFSET = 0  # mV
+    # NTU = a * V² + b * V + c, see https://wiki.dfrobot.com/Turbidity_sensor_SKU__SEN0189
+    TURBIDITY_COEFFICIENTS = (-1120.4, 5742.3, -4352.9)
+    LUX_ZERO_VOLTAGE = 206  # mV
+    LUX_SLOPE = (358, 1184)  # lux per mV, as a fraction
+    LUX_OFFSET = 15  # lux
+
     FIRST_SCREEN = 0
     LAST_SCREEN = 4
 
+    # Low-power mode
+    LOW_POWER_ACQUISITION_INTERVAL = 30  # seconds between two acquisitions
+    LCD_BACKLIGHT_TIMEOUT = 15  # seconds the backlight stays on after a button press
+
+    # Water temperature sampling
+    WATER_TEMP_SAMPLE_INTERVAL = 5  # seconds between two background DS18B20 readings
+    WATER_TEMP_MAX_AGE = 4 * WATER_TEMP_SAMPLE_INTERVAL  # seconds before a sampled reading is stale
+    DHT_SAMPLE_INTERVAL = 5  # seconds between two DHT11 readings of the worker process
+    DHT_MAX_AGE = 45  # seconds before a worker reading or attempt is stale (read_retry alone can take 30)
+
+    # Water level sensing
+    WATER_LEVEL_DEBOUNCE = 50  # ms, edges closer than this are ignored by the GPIO driver
+    WATER_LEVEL_SETTLE_TIME = 2.0  # seconds a new level must hold before it is accepted (wave slosh filter)
+
+    # Sensor circuit breakers
+    SENSOR_FAILURE_THRESHOLD = 3  # consecutive failures before a sensor is skipped
+    SENSOR_BACKOFF_BASE = 5  # seconds a failing sensor is skipped the first time, doubled on every new failure
+    SENSOR_BACKOFF_MAX = 300  # upper bound of the time a failing sensor is skipped
+    # Analog checks and their ADC channel, check_analog_sensors runs them from a single scan
+    ANALOG_CHECKS = {
+        "check_water_ph": PH_SENSOR_PIN,
+        "check_orp": ORP_SENSOR_PIN,
+        "check_turbidity": TURBIDITY_SENSOR_PIN,
+        "check_environment_light_level": ENV_LIGHT_SENSOR_PIN,
+    }
+    SENSOR_CHECKS = (
+        "check_water_temperature",
+        "check_humidity_and_environment_temperature",
+        *ANALOG_CHECKS,
+        "check_water_level",
+    )
+
+    # Adaptive sampling of the analog sensors
+    ADAPTIVE_MIN_INTERVAL = 1  # seconds between two readings of a sensor close to a threshold or changing fast
+    ADAPTIVE_MAX_INTERVAL = 60  # seconds between two readings of a stable sensor well inside its band
+
+    # Report-by-exception: a reading is a change only if it moves more than its deadband or crosses a threshold
+    REPORT_DEADBANDS = {
+        "water_temperature": 0.1,  # °C
+        "humidity": 1.0,  # %
+        "environment_temperature": 0.5,  # °C
+        "water_ph": 0.02,
+        "orp": 2,  # mV
+        "water_turbidity": 0.05,  # NTU
+        "environment_light": 10,  # lux
+        "is_water_level_good": 0,
+    }
+    # Sensor values and the flag telling whether they are within their thresholds
+    SENSOR_VALUES = (
+        ("water_temperature", "correct_water_temperature"),
+        ("humidity", "correct_humidity"),
+        ("environment_temperature", "correct_environment_temperature"),
+        ("water_ph", "is_acceptable_ph"),
+        ("orp", "is_acceptable_orp"),
+        ("water_turbidity", "is_acceptable_turbidity"),
+        ("environment_light", "is_acceptable_light"),
+        ("is_water_level_good", None),
+    )
+    # On-demand readings (see read_sensor): values set by each check and how long a reading stays fresh (s)
+    CHECK_VALUES = {
+        "check_water_temperature": ("water_temperature", "correct_water_temperature"),
+        "check_humidity_and_environment_temperature": ("humidity", "correct_humidity",
+                                                       "environment_temperature", "correct_environment_temperature"),
+        "check_water_ph": ("water_ph", "is_acceptable_ph"),
+        "check_orp": ("orp", "is_acceptable_orp"),
+        "check_turbidity": ("water_turbidity", "is_acceptable_turbidity"),
+        "check_environment_light_level": ("environment_light", "is_acceptable_light"),
+        "check_water_level": ("is_water_level_good",),
+    }
+    READ_CACHE_TTLS = {
+        "check_water_temperature": 5,
+        "check_humidity_and_environment_temperature": 2,  # The DHT11 cannot be read more often
+        "check_water_ph": 1,
+        "check_orp": 1,
+        "check_turbidity": 1,
+        "check_environment_light_level": 1,
+        "check_water_level": 0.5,
+    }
+    # Sensor values shown on each LCD screen
+    SCREEN_VALUES = {
+        0: ("environment_temperature", "humidity"),
+        1: ("water_temperature", "is_water_level_good"),
+        2: ("water_ph", "orp"),
+        3: ("environment_light",),
+        4: ("water_turbidity",),
+    }
+
     def __init__(self, log_level=None):
         if log_level == "Info":
             logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
@@ -61,19 +178,38 @@ class EmbeddedPool:
         GPIO.setwarnings(True)
 
         # ADC setup
-        self.ads1115 = ADS1115()
-        self.ads1115.set_addr_ADS1115(0x48)
+        self.ads1115 = ADS1115(0x48)
         self.ads1115.set_gain(0x00)
+        self.ads1115.set_ready_mode(ADS1115_READY_POLL)  # Wait for the conversion, not a fixed 100 ms
+        # Each probe gets the narrowest input range its signal fits in
+        for channel, gains in self.ADC_GAINS.items():
+            self.ads1115.set_autorange(channel, gains=gains)
+        # pH and ORP are noisy: average a fast burst instead of taking one 128 SPS sample
+        for channel in (self.PH_SENSOR_PIN, self.ORP_SENSOR_PIN):
+            self.ads1115.set_data_rate(channel, ADS1115_REG_CONFIG_DR_860SPS)
+            self.ads1115.set_oversampling(channel, self.ADC_OVERSAMPLING, ADS1115_REDUCE_TRIMMED_MEAN)
+
+        # The analog checks also run from the ADC alarm interrupt (see enable_ph_alarm), one at a time
+        self.analog_lock = threading.RLock()
 
         # Water temperature sensor setup
         self.ds18b20 = DS18B20()
 
-        # DHT11 setup
+        # DHT11 setup (the kernel dht11 IIO driver is used when it is loaded)
         self.dht_type = Adafruit_DHT.DHT11
+        self.dht_iio = DHT11_IIO()
+        self.dht_worker = DHTWorker(self.dht_type, self.DHT_PIN, self.DHT_SAMPLE_INTERVAL)
 
         # pH sensor setup
         self.ph_helper = DFRobot_PH()
 
+        # Raw ADC code -> engineering unit lookup tables
+        self.conversion_tables = ConversionTables()
+        self.conversion_tables.register(self.PH_SENSOR_PIN, self.voltage_to_ph, self.ph_helper.get_calibration)
+        self.conversion_tables.register(self.ORP_SENSOR_PIN, self.voltage_to_orp)
+        self.conversion_tables.register(self.TURBIDITY_SENSOR_PIN, self.voltage_to_turbidity)
+        self.conversion_tables.register(self.ENV_LIGHT_SENSOR_PIN, self.voltage_to_lux)
+
         # Liquid level sensor setup
         GPIO.setup(self.WATER_LEVEL_PIN, GPIO.IN)
 
@@ -92,6 +228,7 @@ class EmbeddedPool:
         self.lcd.begin(16, 2)  # Set number of LCD columns and rows
         self.current_screen = 0
         self.current_lcd_text = None
+        self.screen_cache = {}  # screen index -> (text, pre-encoded LCD port values)
 
         # Buttons setup
         GPIO.setup(self.BUTTON_PREV_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
@@ -101,6 +238,12 @@ class EmbeddedPool:
 
         self.current_screen_lock = threading.Lock()
 
+        # LCD render thread (see start_lcd_renderer) and its pending request, the latest request wins
+        self.lcd_renderer = None
+        self.lcd_request = None
+        self.lcd_request_condition = threading.Condition()
+        self.is_lcd_renderer_stopping = False
+
         # Instance variables - booleans
         self.correct_water_temperature = None
         self.correct_humidity = None
@@ -114,11 +257,41 @@ class EmbeddedPool:
         self.are_windows_open = False
         self.is_led_on = False
         self.is_lcd_backlight_on = False
+        self.is_low_power_mode_on = False
+        self.is_water_level_interrupt_on = False
+
+        # Low-power bookkeeping
+        self.last_interaction_time = None
+        self.lcd_backlight_lock = threading.Lock()  # Buttons and the main loop both switch the backlight
+        self.duty_cycle_start_time = None
+        self.active_time = 0.0
+
+        # One circuit breaker per sensor check, so a broken sensor does not slow down the whole loop
+        self.sensor_breakers = {
+            check: CircuitBreaker(self.SENSOR_FAILURE_THRESHOLD, self.SENSOR_BACKOFF_BASE, self.SENSOR_BACKOFF_MAX)
+            for check in self.SENSOR_CHECKS
+        }
+
+        # On-demand readings (see read_sensor)
+        self.read_cache = ReadCache(self.READ_CACHE_TTLS)
+
+        # Report-by-exception (see detect_changes)
+        self.change_detector = ChangeDetector(self.REPORT_DEADBANDS)
+
+        # Adaptive sampling (see enable_adaptive_sampling)
+        self.adaptive_sampler = None
+
+        # Water level debouncing
+        self.water_level_settle_time = self.WATER_LEVEL_SETTLE_TIME
+        self.water_level_timer = None
+        self.water_level_lock = threading.Lock()
 
         # Instance variables - values
         self.water_temperature = None
+        self.water_temperature_timestamp = None
         self.humidity = None
         self.environment_temperature = None
+        self.environment_timestamp = None
         self.water_ph = None
         self.orp = None
         self.water_turbidity = None
@@ -132,40 +305,110 @@ class EmbeddedPool:
 
         Reads the current water temperature and updates the internal state variable.
         Additionally, checks if the water temperature is within the specified optimal range.
+        If the background sampler is running, the latest sampled value is used instead of
+        blocking on a new conversion; water_temperature_timestamp tells how old it is.
 
         :return: None
+
+        :raises DS18B20Error: If no valid reading could be taken, or the sampler has no sample newer
+                              than WATER_TEMP_MAX_AGE seconds.
         """
-        logging.info("START check_water_temperature")
-        self.water_temperature = self.ds18b20.read_temp()
+        logging.debug("START check_water_temperature")
+        if self.ds18b20.is_sampling():
+            temperature, timestamp = self.ds18b20.get_latest()
+            if temperature is None:
+                # The sampler owns the 1-Wire conversions, don't block the caller on a second one
+                raise DS18B20Error("No DS18B20 sample yet")
+            if time.time() - timestamp > self.WATER_TEMP_MAX_AGE:
+                # The sampler keeps the last good reading on errors, don't report it forever
+                raise DS18B20Error("No valid DS18B20 sample for %.0f s" % (time.time() - timestamp))
+        else:
+            temperature, timestamp = self.ds18b20.read_temp(), time.time()
+        self.water_temperature = temperature
+        self.water_temperature_timestamp = timestamp
         if self.WATER_TEMP_MIN <= self.water_temperature <= self.WATER_TEMP_MAX:
             self.correct_water_temperature = True
         else:
             self.correct_water_temperature = False
-        logging.info(
+        logging.debug(
             "END   check_water_temperature (value = %.2f°C, correct = %s)",
             self.water_temperature, self.correct_water_temperature
         )
 
+    def start_water_temperature_sampler(self) -> None:
+        """
+        Start reading the DS18B20 in the background every WATER_TEMP_SAMPLE_INTERVAL seconds.
+
+        From now on check_water_temperature returns the latest sample without waiting for the
+        1-Wire conversion.
+
+        :return: None
+        """
+        self.ds18b20.start_sampler(self.WATER_TEMP_SAMPLE_INTERVAL)
+
+    def get_water_temperature_age(self) -> float:
+        """
+        Get the age of the current water temperature value.
+
+        :return: Seconds since water_temperature was read, None if it was never read.
+        """
+        if self.water_temperature_timestamp is None:
+            return None
+        return time.time() - self.water_temperature_timestamp
+
+    def start_dht_worker(self) -> None:
+        """
+        Start reading the DHT11 in a separate process every DHT_SAMPLE_INTERVAL seconds.
+
+        From now on check_humidity_and_environment_temperature returns the latest reading of the
+        worker instead of reading the sensor.
+
+        :return: None
+        """
+        self.dht_worker.start()
+
     def check_humidity_and_environment_temperature(self) -> None:
         """
         Check humidity and environment temperature using the DHT11 sensor.
 
         Reads the current humidity and environment temperature and updates the internal state variables.
+        The kernel dht11 driver is preferred when it is loaded, Adafruit_DHT is used otherwise.
+        If the DHT worker process is running, its latest reading is used without blocking; the sensor
+        is never read from this process then, a missing or stale reading raises DHTError instead.
         Checks if the environment temperature is within a specified range relative to the water temperature.
         Also, verifies if the humidity is within the optimal range.
 
         Remember to read water temperature before calling this method!
 
         :return: None
-        :raises DHTError: If failed to read data from the DHT sensor.
+        :raises DHTError: If failed to read data from the DHT sensor, or the worker has no recent reading.
         """
-        logging.info("START check_humidity_and_environment_temperature")
-        self.humidity, self.environment_temperature = Adafruit_DHT.read_retry(self.dht_type, self.DHT_PIN)
+        logging.debug("START check_humidity_and_environment_temperature")
+        if self.dht_worker.is_running():
+            humidity, temperature, timestamp = self.dht_worker.read()
+            attempted, failures = self.dht_worker.get_status()
+            now = time.time()
+            if attempted is None:
+                raise DHTError("No reading from the DHT worker yet.")
+            if now - attempted > self.DHT_MAX_AGE:
+                raise DHTError("The DHT worker has not read the sensor for %.0f s." % (now - attempted))
+            if timestamp is None or now - timestamp > self.DHT_MAX_AGE:
+                raise DHTError("Failed to read from DHT sensor (%d failed attempts)." % failures)
+        else:
+            if self.dht_iio.is_available():
+                humidity, temperature = self.dht_iio.read()
+            else:
+                humidity, temperature = Adafruit_DHT.read_retry(self.dht_type, self.DHT_PIN)
+            timestamp = time.time()
+        self.humidity, self.environment_temperature = humidity, temperature
+        self.environment_timestamp = timestamp
 
         # You should always check water temperature before proceeding
 
         if self.humidity is not None and self.environment_temperature is not None:
-            if self.environment_temperature > (self.water_temperature + 2):
+            if self.water_temperature is None:
+                self.correct_environment_temperature = None  # The water temperature sensor has never been read
+            elif self.environment_temperature > (self.water_temperature + 2):
                 self.correct_environment_temperature = False
             elif self.environment_temperature <= (self.water_temperature + 2):
                 self.correct_environment_temperature = True
@@ -176,14 +419,14 @@ class EmbeddedPool:
                 self.correct_humidity = False
         else:
             raise DHTError("Failed to read from DHT sensor.")
-        logging.info(
+        logging.debug(
             "END   check_humidity_and_environment_temperature Hum(value = %.2f%%, correct = %s)"
             " Temp(value = %.2f°C, correct = %s)",
             self.humidity, self.correct_humidity,
             self.environment_temperature, self.correct_environment_temperature
         )
 
-    def check_water_ph(self) -> None:
+    def check_water_ph(self, voltage: int = None, code: tuple = None) -> None:
         """
         Check the pH level of the water using the pH sensor.
 
@@ -191,25 +434,33 @@ class EmbeddedPool:
         and updates the internal state variable for water pH.
         Verifies if the water pH is within the optimal range.
 
+        :param voltage: Voltage (mV) already read from the pH sensor, converted with the formula.
+        :type voltage: int
+        :param code: (raw code, gain) already read from the pH sensor, read from the ADC if None.
+                     Codes are converted through the lookup table of the gain.
+        :type code: tuple
+
         :return: None
         """
-        logging.info("START check_water_ph")
-        # Read the voltage from the ADC (where the pH probe is connected)
-        voltage = self.ads1115.read_voltage(self.PH_SENSOR_PIN)
-        # Use the DFRobot pH library to convert voltage to pH
-        self.water_ph = self.ph_helper.read_PH(voltage, None)
+        with self.analog_lock:
+            logging.debug("START check_water_ph")
+            if voltage is None:
+                # Read the ADC (where the pH probe is connected), the table lookup includes the compensation
+                self.water_ph = self.read_analog(self.PH_SENSOR_PIN, code)
+            else:
+                self.water_ph = self.voltage_to_ph(voltage, self.water_temperature)
 
-        if self.PH_MIN < self.water_ph < self.PH_MAX:
-            self.is_acceptable_ph = True
-        else:
-            self.is_acceptable_ph = False
+            if self.PH_MIN < self.water_ph < self.PH_MAX:
+                self.is_acceptable_ph = True
+            else:
+                self.is_acceptable_ph = False
 
-        logging.info(
-            "END   check_water_ph (value = %.2f, correct = %s)",
-            self.water_ph, self.is_acceptable_ph
-        )
+            logging.debug(
+                "END   check_water_ph (value = %.2f, correct = %s)",
+                self.water_ph, self.is_acceptable_ph
+            )
 
-    def check_orp(self) -> None:
+    def check_orp(self, voltage: int = None, code: tuple = None) -> None:
         """
         Check the Oxidation-Reduction Potential (ORP) level of the water using the ORP sensor.
 
@@ -217,26 +468,31 @@ class EmbeddedPool:
         and updates the internal state variable for ORP.
         Verifies if the water ORP is within the optimal range.
 
+        :param voltage: Voltage (mV) already read from the ORP sensor, converted with the formula.
+        :type voltage: int
+        :param code: (raw code, gain) already read from the ORP sensor, read from the ADC if None.
+                     Codes are converted through the lookup table of the gain.
+        :type code: tuple
+
         :return: None
         """
-        logging.info("START check_orp")
-        voltage = self.ads1115.read_voltage(self.ORP_SENSOR_PIN)
-        voltage = voltage / 1000  # from mV to V
-        system_voltage = 5.00
-        offset = 0
-
-        self.orp = int(((30 * system_voltage * 1000) - (75 * voltage * 1000)) / 75 - offset)
+        with self.analog_lock:
+            logging.debug("START check_orp")
+            if voltage is None:
+                self.orp = self.read_analog(self.ORP_SENSOR_PIN, code)
+            else:
+                self.orp = self.voltage_to_orp(voltage)
 
-        if self.ORP_MIN <= self.orp <= self.ORP_MAX:
-            self.is_acceptable_orp = True
-        else:
-            self.is_acceptable_orp = False
-        logging.info(
-            "END   check_orp (value = %.2f mV, correct = %s)",
-            self.orp, self.is_acceptable_orp
-        )
+            if self.ORP_MIN <= self.orp <= self.ORP_MAX:
+                self.is_acceptable_orp = True
+            else:
+                self.is_acceptable_orp = False
+            logging.debug(
+                "END   check_orp (value = %.2f mV, correct = %s)",
+                self.orp, self.is_acceptable_orp
+            )
 
-    def check_turbidity(self) -> None:
+    def check_turbidity(self, voltage: int = None, code: tuple = None) -> None:
         """
         Check the turbidity level of the water using the turbidity sensor.
 
@@ -244,59 +500,391 @@ class EmbeddedPool:
         using a specified formula, and updates the internal state variable for water turbidity.
         Verifies if the water turbidity is within the optimal range.
 
+        :param voltage: Voltage (mV) already read from the turbidity sensor, converted with the formula.
+        :type voltage: int
+        :param code: (raw code, gain) already read from the turbidity sensor, read from the ADC if None.
+                     Codes are converted through the lookup table of the gain.
+        :type code: tuple
+
+        :return: None
+        """
+        with self.analog_lock:
+            logging.debug("START check_turbidity")
+            if voltage is None:
+                self.water_turbidity = self.read_analog(self.TURBIDITY_SENSOR_PIN, code)
+            else:
+                self.water_turbidity = self.voltage_to_turbidity(voltage)
+
+            if self.TURBIDITY_MIN <= self.water_turbidity <= self.TURBIDITY_MAX:
+                self.is_acceptable_turbidity = True
+            else:
+                self.is_acceptable_turbidity = False
+            logging.debug(
+                "END   check_turbidity (value = %.2f NTU, correct = %s)",
+                self.water_turbidity, self.is_acceptable_turbidity
+            )
+
+    def check_environment_light_level(self, voltage: int = None, code: tuple = None) -> None:
+        """
+        Check the light level in the environment using the light sensor.
+
+        Reads the voltage from the light sensor, converts it to lux using a specified formula,
+        and updates the internal state variable for environment light level.
+        Verifies if the environment light level is within the optimal range.
+
+        :param voltage: Voltage (mV) already read from the light sensor, converted with the formula.
+        :type voltage: int
+        :param code: (raw code, gain) already read from the light sensor, read from the ADC if None.
+                     Codes are converted through the lookup table of the gain.
+        :type code: tuple
+
         :return: None
         """
-        logging.info("START check_turbidity")
+        with self.analog_lock:
+            logging.debug("START check_environment_light_level")
+            if voltage is None:
+                self.environment_light = self.read_analog(self.ENV_LIGHT_SENSOR_PIN, code)
+            else:
+                self.environment_light = self.voltage_to_lux(voltage)
+
+            if self.LUX_MIN <= self.environment_light <= self.LUX_MAX:
+                self.is_acceptable_light = True
+            else:
+                self.is_acceptable_light = False
+            logging.debug(
+                "END   check_environment_light_level (value = %d lux, correct = %s)",
+                self.environment_light, self.is_acceptable_light
+            )
+
+    def voltage_to_ph(self, voltage: float, temperature: float = None) -> float:
+        """
+        Convert a pH probe voltage to pH.
+
+        :param voltage: The probe voltage in mV.
+        :type voltage: float
+        :param temperature: The water temperature (°C) for the probe slope compensation, 25°C if None.
+        :type temperature: float
+
+        :return: The pH value.
+        """
+        # Use the DFRobot pH library to convert voltage to pH
+        return self.ph_helper.read_PH(voltage, temperature)
+
+    @classmethod
+    def voltage_to_orp(cls, voltage: float) -> int:
+        """
+        Convert an ORP probe voltage to ORP.
+
+        :param voltage: The probe voltage in mV.
+        :type voltage: float
+
+        :return: The ORP value in mV.
+        """
+        voltage = voltage / 1000  # from mV to V
+
+        return int(((30 * cls.ORP_SYSTEM_VOLTAGE * 1000) - (75 * voltage * 1000)) / 75 - cls.ORP_OFFSET)
+
+    @classmethod
+    def orp_to_voltage(cls, orp: float) -> float:
+        """
+        Convert an ORP value to the matching probe voltage, the inverse of voltage_to_orp.
+
+        :param orp: The ORP value in mV.
+        :type orp: float
+
+        :return: The probe voltage in mV.
+        """
+        return 30 * cls.ORP_SYSTEM_VOLTAGE * 1000 / 75 - cls.ORP_OFFSET - orp
+
+    @classmethod
+    def voltage_to_turbidity(cls, voltage: float) -> float:
+        """
+        Convert a turbidity sensor voltage to NTU (Nephelometric Turbidity Units).
+
+        :param voltage: The sensor voltage in mV.
+        :type voltage: float
+
+        :return: The turbidity in NTU, never negative.
+        """
         # See https://wiki.dfrobot.com/Turbidity_sensor_SKU__SEN0189
-        voltage = self.ads1115.read_voltage(self.TURBIDITY_SENSOR_PIN)
         voltage = voltage / 1000  # from mV to V
-        ntu_val = (-1120.4 * (voltage ** 2)) + (5742.3 * voltage) - 4352.9
+        a, b, c = cls.TURBIDITY_COEFFICIENTS
+        ntu_val = (a * (voltage ** 2)) + (b * voltage) + c
 
         # In clean water, the sensor reads 4.3/4.4 volts,
         # but, in that case, the formula above returns a negative NTU value.
         # The value of NTU cannot be negative, so we set it equal to zero.
         if ntu_val < 0:
-            self.water_turbidity = 0
-        else:
-            self.water_turbidity = ntu_val
+            return 0
+        return ntu_val
 
-        if self.TURBIDITY_MIN <= self.water_turbidity <= self.TURBIDITY_MAX:
-            self.is_acceptable_turbidity = True
-        else:
-            self.is_acceptable_turbidity = False
-        logging.info(
-            "END   check_turbidity (value = %.2f NTU, correct = %s)",
-            self.water_turbidity, self.is_acceptable_turbidity
-        )
-
-    def check_environment_light_level(self) -> None:
+    @classmethod
+    def voltage_to_lux(cls, voltage: float) -> int:
         """
-        Check the light level in the environment using the light sensor.
+        Convert a light sensor voltage to lux.
 
-        Reads the voltage from the light sensor, converts it to lux using a specified formula,
-        and updates the internal state variable for environment light level.
-        Verifies if the environment light level is within the optimal range.
+        :param voltage: The sensor voltage in mV.
+        :type voltage: float
 
-        :return: None
+        :return: The light level in lux, never negative.
         """
-        logging.info("START check_environment_light_level")
-        voltage = self.ads1115.read_voltage(self.ENV_LIGHT_SENSOR_PIN)
-        lux_val = int((((voltage - 206) * 358) / 1184) + 15)  # This formula is not very good
+        # This formula is not very good
+        lux_val = int((((voltage - cls.LUX_ZERO_VOLTAGE) * cls.LUX_SLOPE[0]) / cls.LUX_SLOPE[1]) + cls.LUX_OFFSET)
 
         # Cannot be negative
         if lux_val < 0:
-            self.environment_light = 0
-        else:
-            self.environment_light = lux_val
+            return 0
+        return lux_val
+
+    def convert_adc_codes(self, sensor_pin: int, codes, gain: int = None) -> list:
+        """
+        Convert raw ADC codes of an analog probe to engineering units.
+
+        Uses a lookup table indexed by raw code, built the first time a channel/gain pair is converted
+        and rebuilt only after the gain or the pH calibration changes.
+
+        :param sensor_pin: The ADC channel of the probe (e.g. PH_SENSOR_PIN).
+        :type sensor_pin: int
+        :param codes: The raw signed 16-bit codes (e.g. from a waveform capture).
+        :param gain: The ADC gain the codes were taken with, the channel's current gain if None.
+        :type gain: int
+
+        :return: The converted values (pH, ORP mV, NTU or lux), in the same order as the codes.
+        """
+        if gain is None:
+            gain = self.ads1115.gains.get(sensor_pin, self.ads1115.gain)
+        values = self.conversion_tables.convert(sensor_pin, gain, codes)
+        if sensor_pin == self.PH_SENSOR_PIN and self.water_temperature is not None:
+            # The pH table is built at 25°C, the temperature compensation is applied on top of it
+            values = [self.ph_helper.compensate_PH(ph, self.water_temperature) for ph in values]
+        return values
+
+    def read_analog(self, sensor_pin: int, code: tuple = None):
+        """
+        Read an analog probe and convert it through its lookup table (see convert_adc_codes).
+
+        :param sensor_pin: The ADC channel of the probe (e.g. PH_SENSOR_PIN).
+        :type sensor_pin: int
+        :param code: (raw code, gain) already read from the probe, read from the ADC if None.
+        :type code: tuple
+
+        :return: The converted value (pH, ORP mV, NTU or lux).
+        """
+        if code is None:
+            code = self.ads1115.read_code(sensor_pin)
+        code, gain = code
+        value = self.conversion_tables.lookup(sensor_pin, gain, code)
+        if sensor_pin == self.PH_SENSOR_PIN and self.water_temperature is not None:
+            # The pH table is built at 25°C, the temperature compensation is applied on top of it
+            value = self.ph_helper.compensate_PH(value, self.water_temperature)
+        elif sensor_pin in (self.ORP_SENSOR_PIN, self.ENV_LIGHT_SENSOR_PIN):
+            value = int(value)  # The tables hold floats, these formulas return whole numbers
+        return value
+
+    def check_analog_sensors(self) -> list:
+        """
+        Check pH, ORP, turbidity and environment light with a single ADC scan.
+
+        Converts the ADC channels back to back and hands each raw code to the matching check method,
+        which avoids re-reading the ADC once per sensor. Each probe keeps its own circuit breaker
+        (see safe_check): a degraded probe is left out of the scan and does not hold back the others.
+        Probes with a fresh on-demand reading (see read_sensor) are left out as well.
+        If the scan itself fails, every probe is read on its own so each breaker sees its own outcome.
+
+        :return: The names of the checks that succeeded.
+        """
+        logging.debug("START check_analog_sensors")
+        checks = [check for check in self.ANALOG_CHECKS
+                  if not self.read_cache.is_fresh(check) and self.sensor_breakers[check].allow()]
+        codes = {}
+        if checks:
+            try:
+                codes = self.ads1115.scan(tuple(self.ANALOG_CHECKS[check] for check in checks)).codes
+            except Exception as e:
+                logging.warning("Analog scan failed (%s: %s), reading the probes one by one", type(e).__name__, e)
+        succeeded = [check for check in checks if self.safe_check(check, code=codes.get(self.ANALOG_CHECKS[check]))]
+        logging.debug("END   check_analog_sensors")
+        return succeeded
+
+    def enable_adaptive_sampling(self) -> None:
+        """
+        Read each analog sensor only as often as its readings require.
+
+        Every sensor gets its own sampling interval, between ADAPTIVE_MIN_INTERVAL and ADAPTIVE_MAX_INTERVAL
+        seconds: it grows while the readings are stable and well inside the acceptable band, and shrinks as
+        soon as they get close to a threshold or change fast. The main loop calls run_adaptive_checks
+        instead of check_analog_sensors.
+
+        :return: None
+        """
+        self.adaptive_sampler = AdaptiveSampler()
+        for check, low, high, value in (
+                ("check_water_ph", self.PH_MIN, self.PH_MAX, lambda: self.water_ph),
+                ("check_orp", self.ORP_MIN, self.ORP_MAX, lambda: self.orp),
+                # The turbidity cannot go below TURBIDITY_MIN, only the upper threshold matters
+                ("check_turbidity", None, self.TURBIDITY_MAX, lambda: self.water_turbidity),
+                ("check_environment_light_level", self.LUX_MIN, self.LUX_MAX, lambda: self.environment_light),
+        ):
+            schedule = SensorSchedule(low, high, self.ADAPTIVE_MIN_INTERVAL, self.ADAPTIVE_MAX_INTERVAL)
+            self.adaptive_sampler.add(check, schedule, value)
+        logging.info("Adaptive sampling enabled")
+
+    def run_adaptive_checks(self) -> list:
+        """
+        Run the checks of the analog sensors that are due, see enable_adaptive_sampling.
+
+        :return: The names of the checks that were run.
+        """
+        checks = self.adaptive_sampler.due()
+        for check in checks:
+            ok = self.safe_check(check)
+            interval = self.adaptive_sampler.sampled(check, ok)
+            logging.debug("%s: next reading in %.1f s", check, interval)
+        return checks
+
+    def time_until_next_adaptive_check(self) -> float:
+        """
+        :return: Seconds before the next analog sensor is due.
+        """
+        return self.adaptive_sampler.time_until_next()
+
+    def enable_ph_alarm(self, callback=None) -> None:
+        """
+        Let the ADC watch the pH on its own.
+
+        Programs the ADC window comparator with the probe voltages matching PH_MAX and PH_MIN
+        (the voltage decreases as the pH rises). When the pH leaves the window, the ALERT/RDY interrupt
+        updates the pH state through check_water_ph and then calls the callback.
+        Only one channel can be watched at a time, so this replaces any other ADC alarm.
+
+        :param callback: Called without arguments after an out-of-range pH has been handled.
+        :type callback: callable
+
+        :return: None
+        """
+        low = self.ph_helper.PH_to_voltage(self.PH_MAX, self.water_temperature)
+        high = self.ph_helper.PH_to_voltage(self.PH_MIN, self.water_temperature)
+        self._enable_adc_alarm(self.PH_SENSOR_PIN, low, high, self.check_water_ph, callback)
+
+    def enable_orp_alarm(self, callback=None) -> None:
+        """
+        Let the ADC watch the ORP on its own.
+
+        Programs the ADC window comparator with the probe voltages matching ORP_MAX and ORP_MIN
+        (the voltage decreases as the ORP rises). When the ORP leaves the window, the ALERT/RDY interrupt
+        updates the ORP state through check_orp and then calls the callback.
+        Only one channel can be watched at a time, so this replaces any other ADC alarm.
+
+        :param callback: Called without arguments after an out-of-range ORP has been handled.
+        :type callback: callable
+
+        :return: None
+        """
+        low = self.orp_to_voltage(self.ORP_MAX)
+        high = self.orp_to_voltage(self.ORP_MIN)
+        self._enable_adc_alarm(self.ORP_SENSOR_PIN, low, high, self.check_orp, callback)
+
+    def disable_adc_alarm(self) -> None:
+        """
+        Stop the ADC window comparator started by enable_ph_alarm or enable_orp_alarm.
+
+        :return: None
+        """
+        self.ads1115.clear_window_alarm()
+
+    def _enable_adc_alarm(self, channel, low, high, check, callback):
+        def on_alert(alert_channel, voltage):
+            # The ADC disarms the comparator after an alert until the value is back in range,
+            # so this runs once per excursion and not on every conversion
+            logging.info("ADC_ALERT (channel %d, voltage = %d mV)", alert_channel, voltage)
+            with self.analog_lock:
+                check(voltage)
+            # The values changed behind the read cache, on-demand readers must not get the pre-alert ones
+            self.read_cache.invalidate(check.__name__)
+            if callback is not None:
+                callback()
+
+        self.ads1115.set_window_alarm(channel, low, high, self.ADC_ALERT_PIN, on_alert)
+
+    def start_noise_capture(self, sensor_pin: int, duration: float = 1.0):
+        """
+        Start a high-rate waveform capture of an analog probe in the background.
 
-        if self.LUX_MIN <= self.environment_light <= self.LUX_MAX:
-            self.is_acceptable_light = True
+        Samples the given ADC channel at 860 SPS for the given duration (e.g. to look for pump-induced noise
+        on the turbidity or ORP probe). The main loop keeps running; its ADC reads show up as gaps in the capture.
+
+        :param sensor_pin: The ADC channel of the probe (e.g. TURBIDITY_SENSOR_PIN or ORP_SENSOR_PIN).
+        :type sensor_pin: int
+        :param duration: Capture length in seconds.
+        :type duration: float
+
+        :return: The running capture; join() it, then read stats() or samples().
+        """
+        logging.info("START noise capture (channel %d, %.1f s)", sensor_pin, duration)
+        return self.ads1115.start_waveform_capture(sensor_pin, duration)
+
+    def safe_check(self, check: str, *args, **kwargs) -> bool:
+        """
+        Run a sensor check through its circuit breaker.
+
+        The check goes through read_sensor, so the main loop and the on-demand readers share a single
+        read of the hardware. Failures are logged instead of raised. After SENSOR_FAILURE_THRESHOLD
+        consecutive failures the sensor is considered degraded and skipped, with an exponential backoff
+        between SENSOR_BACKOFF_BASE and SENSOR_BACKOFF_MAX seconds, before one read probes it again.
+        The values of a skipped sensor keep their last state.
+
+        :param check: The name of the check method, one of CHECK_VALUES, called with args and kwargs.
+        :type check: str
+
+        :return: True if the check ran and succeeded, False if it failed or was skipped.
+        """
+        breaker = self.sensor_breakers.get(check)
+        if breaker is None:
+            breaker = CircuitBreaker(self.SENSOR_FAILURE_THRESHOLD, self.SENSOR_BACKOFF_BASE, self.SENSOR_BACKOFF_MAX)
+            self.sensor_breakers[check] = breaker
+        failures = breaker.failures
+        if breaker.call(self.read_sensor, check, *args, **kwargs):
+            return True
+        if breaker.failures > failures:
+            e = breaker.last_error
+            logging.warning("%s failed (%s: %s), sensor state: %s", check, type(e).__name__, e, breaker.state)
         else:
-            self.is_acceptable_light = False
-        logging.info(
-            "END   check_environment_light_level (value = %d lux, correct = %s)",
-            self.environment_light, self.is_acceptable_light
-        )
+            logging.debug("SKIP  %s (sensor degraded)", check)
+        return False
+
+    def read_sensor(self, check: str, *args, **kwargs) -> dict:
+        """
+        Get a fresh reading of a sensor on demand (e.g. for a local API or a button handler).
+
+        The check runs at most once every READ_CACHE_TTLS seconds, and concurrent callers asking for the
+        same sensor share a single hardware read and all get its result.
+
+        :param check: The name of the check method, one of CHECK_VALUES, called with args and kwargs
+                      if this call does the read.
+        :type check: str
+
+        :return: A dict with the values set by the check (see CHECK_VALUES).
+        :raises Exception: Whatever the check raised, to every caller sharing that read.
+        """
+        def load():
+            getattr(self, check)(*args, **kwargs)
+            return {name: getattr(self, name) for name in self.CHECK_VALUES[check]}
+
+        return self.read_cache.get(check, load)
+
+    def get_sensor_health(self) -> dict:
+        """
+        Get the health of every sensor check.
+
+        :return: A dict with the CircuitBreaker.health() of each check in SENSOR_CHECKS.
+        """
+        return {check: breaker.health() for check, breaker in self.sensor_breakers.items()}
+
+    def are_sensors_healthy(self) -> bool:
+        """
+        :return: True if no sensor is failing.
+        """
+        return all(breaker.state == CLOSED for breaker in self.sensor_breakers.values())
 
     def check_water_level(self):
         """
@@ -308,13 +896,94 @@ class EmbeddedPool:
 
         :return: None
         """
-        logging.info("START check_water_level")
+        if self.is_water_level_interrupt_on:
+            return  # is_water_level_good is kept up to date by water_level_event
+        logging.debug("START check_water_level")
         result = GPIO.input(self.WATER_LEVEL_PIN)
         if result == 1:
             self.is_water_level_good = True
         else:
             self.is_water_level_good = False
-        logging.info("END   check_water_level (is_water_level_good = %s)", self.is_water_level_good)
+        logging.debug("END   check_water_level (is_water_level_good = %s)", self.is_water_level_good)
+
+    def enable_water_level_interrupts(self, debounce: int = WATER_LEVEL_DEBOUNCE,
+                                      settle_time: float = WATER_LEVEL_SETTLE_TIME) -> None:
+        """
+        Track the water level with edge interrupts instead of polling.
+
+        Every edge on the liquid level sensor schedules a check after settle_time seconds, and the
+        new level is accepted only if it still holds then, so waves sloshing around the sensor do not
+        toggle the state. From now on check_water_level does not read the sensor anymore.
+
+        :param debounce: Edges closer than this many ms are ignored.
+        :type debounce: int
+        :param settle_time: Seconds a new level must hold before it is accepted.
+        :type settle_time: float
+
+        :return: None
+        """
+        self.water_level_settle_time = settle_time
+        self.is_water_level_good = GPIO.input(self.WATER_LEVEL_PIN) == 1
+        GPIO.add_event_detect(self.WATER_LEVEL_PIN, GPIO.BOTH, callback=self.water_level_event, bouncetime=debounce)
+        self.is_water_level_interrupt_on = True
+        logging.info("Water level interrupts enabled (is_water_level_good = %s)", self.is_water_level_good)
+
+    def disable_water_level_interrupts(self) -> None:
+        """
+        Go back to polling the water level sensor in check_water_level.
+
+        :return: None
+        """
+        if not self.is_water_level_interrupt_on:
+            return
+        GPIO.remove_event_detect(self.WATER_LEVEL_PIN)
+        with self.water_level_lock:
+            if self.water_level_timer is not None:
+                self.water_level_timer.cancel()
+                self.water_level_timer = None
+        self.is_water_level_interrupt_on = False
+
+    def water_level_event(self, channel):
+        """
+        Handle an edge on the liquid level sensor.
+
+        The level is only accepted after it has held for the settle time, see settle_water_level.
+
+        :param channel: The GPIO pin that triggered the event.
+        :type channel: int
+
+        :return: None
+        """
+        level = GPIO.input(channel) == 1
+        with self.water_level_lock:
+            if self.water_level_timer is not None:
+                self.water_level_timer.cancel()
+                self.water_level_timer = None
+            if level == self.is_water_level_good:
+                return  # Back to the accepted level before settling
+            self.water_level_timer = threading.Timer(self.water_level_settle_time, self.settle_water_level, (level,))
+            self.water_level_timer.daemon = True
+            self.water_level_timer.start()
+
+    def settle_water_level(self, level: bool) -> None:
+        """
+        Accept a new water level if the sensor still reads it.
+
+        Runs in water_level_timer, and does nothing if that timer has been cancelled or replaced since.
+
+        :param level: The level seen when the settle time started.
+        :type level: bool
+
+        :return: None
+        """
+        with self.water_level_lock:
+            if threading.current_thread() is not self.water_level_timer:
+                return  # Cancelled while waiting for the lock, a newer timer may be running
+            self.water_level_timer = None
+            if (GPIO.input(self.WATER_LEVEL_PIN) == 1) != level:
+                return
+            self.is_water_level_good = level
+        logging.info("Water level changed (is_water_level_good = %s)", self.is_water_level_good)
 
     def control_windows(self) -> None:
         """
@@ -329,7 +998,9 @@ class EmbeddedPool:
         :return: None
         """
         logging.info("START control_windows")
-        if (self.humidity > self.HUMIDITY_MAX) and not self.are_windows_open:
+        if self.humidity is None:
+            pass  # The humidity has never been read, leave the windows as they are
+        elif (self.humidity > self.HUMIDITY_MAX) and not self.are_windows_open:
             self.change_servo_angle(self.DC_OPEN)
             self.are_windows_open = True
         elif (self.humidity <= self.HUMIDITY_MAX) and self.are_windows_open:
@@ -366,7 +1037,9 @@ class EmbeddedPool:
         :return: None
         """
         logging.info("START control_led")
-        if self.environment_light < self.LUX_MIN:
+        if self.environment_light is None:
+            pass  # The light level has never been read, leave the LED as it is
+        elif self.environment_light < self.LUX_MIN:
             GPIO.output(self.LED_PIN, GPIO.HIGH)
             self.is_led_on = True
         else:
@@ -386,7 +1059,8 @@ class EmbeddedPool:
         :raises LCDError: If the LCD backlight is already on.
         """
         if not self.is_lcd_backlight_on:
-            self.pcf.output(3, 1)  # Turn on LCD backlight
+            with self.pcf.batch():  # No bus write if the port already has this value
+                self.pcf.output(3, 1)  # Turn on LCD backlight
             self.is_lcd_backlight_on = True
         else:
             raise LCDError("The LCD is already on.")
@@ -403,23 +1077,94 @@ class EmbeddedPool:
         :raises LCDError: If the LCD backlight is already off.
         """
         if self.is_lcd_backlight_on:
-            self.pcf.output(3, 0)  # Turn off LCD backlight
+            with self.pcf.batch():  # No bus write if the port already has this value
+                self.pcf.output(3, 0)  # Turn off LCD backlight
             self.is_lcd_backlight_on = False
         else:
             raise LCDError("The LCD is already off.")
 
+    def wake_lcd_backlight(self):
+        """
+        Turn on the LCD backlight after a user interaction.
+
+        Records the interaction time, so that update_lcd_backlight can turn the backlight off again
+        once LCD_BACKLIGHT_TIMEOUT seconds have passed without interactions.
+
+        :return: None
+        """
+        with self.lcd_backlight_lock:
+            self.last_interaction_time = time.monotonic()
+            if not self.is_lcd_backlight_on:
+                self.turn_on_lcd_backlight()
+
+    def update_lcd_backlight(self):
+        """
+        Turn off the LCD backlight if nobody has interacted with the system for a while.
+
+        :return: None
+        """
+        with self.lcd_backlight_lock:
+            if not self.is_lcd_backlight_on:
+                return
+            if self.last_interaction_time is None or \
+                    time.monotonic() - self.last_interaction_time >= self.LCD_BACKLIGHT_TIMEOUT:
+                self.turn_off_lcd_backlight()
+
+    def enable_low_power_mode(self):
+        """
+        Switch the system to duty-cycled operation.
+
+        The ADC converts in power-down single-shot mode, the LCD backlight is only on after a button press,
+        and the main loop is expected to call idle_until_next_acquisition between two acquisitions.
+
+        :return: None
+        """
+        self.is_low_power_mode_on = True
+        self.ads1115.set_ready_mode(ADS1115_READY_POLL)  # Single-shot: the ADC powers down after each conversion
+        self.update_lcd_backlight()
+        self.duty_cycle_start_time = time.monotonic()
+        self.active_time = 0.0
+        logging.info("Low-power mode enabled")
+
+    def idle_until_next_acquisition(self, acquisition_start_time: float) -> None:
+        """
+        Account for the work done in the current acquisition and sleep until the next one.
+
+        :param acquisition_start_time: The time.monotonic() value taken when the acquisition started.
+        :type acquisition_start_time: float
+
+        :return: None
+        """
+        now = time.monotonic()
+        self.active_time += now - acquisition_start_time
+        self.update_lcd_backlight()
+        logging.info("Duty cycle %.2f%%", self.get_duty_cycle() * 100)
+        time.sleep(max(0.0, acquisition_start_time + self.LOW_POWER_ACQUISITION_INTERVAL - now))
+
+    def get_duty_cycle(self) -> Optional[float]:
+        """
+        Return the measured duty cycle since the low-power mode was enabled.
+
+        :return: The fraction of time spent acquiring and acting, between 0 and 1 (None if the mode is off).
+        """
+        if self.duty_cycle_start_time is None:
+            return None
+        elapsed = time.monotonic() - self.duty_cycle_start_time
+        if elapsed <= 0:
+            return 1.0
+        return min(1.0, self.active_time / elapsed)
+
     def lcd_print(self, message):
         """
         Print a message on the LCD.
 
-        This method sets the cursor to the top-left corner of the LCD and prints the provided message.
+        Only the characters that differ from what is already on the LCD are sent.
 
         :param str message: The message to be displayed on the LCD.
 
         :return: None
         """
-        self.lcd.setCursor(0, 0)
-        self.lcd.message(message)
+        self.lcd.update(message)
 
     def lcd_clear(self):
         """
@@ -435,70 +1180,261 @@ class EmbeddedPool:
         """
         Update the text content for the current LCD screen.
 
-        This method updates the text content based on the current screen index and sensor readings.
-        It includes warning symbols (#) for parameters outside the optimal range.
+        This method updates the text content based on the current screen index and sensor readings
+        (see screen_text).
 
         :return: None
         """
-        if self.current_screen == 0:
+        self.current_lcd_text = self.screen_text(self.current_screen)
+
+    def screen_text(self, screen: int) -> str:
+        """
+        Format the text content of an LCD screen.
+
+        The text is based on the screen index and sensor readings.
+        It includes warning symbols (#) for parameters outside the optimal range,
+        and dashes for values that have never been read.
+
+        :param screen: The screen index (FIRST_SCREEN to LAST_SCREEN).
+        :type screen: int
+
+        :return: The screen text, one line per LCD row.
+        """
+        def lcd_value(value, spec):
+            # Same width as the value, so the layout does not move
+            return format(value, spec) if value is not None else format("-", spec.split(".")[0])
+
+        if screen == 0:
             warning_1 = " " if self.correct_environment_temperature else "#"
             warning_2 = " " if self.correct_humidity else "#"
-            self.current_lcd_text = f"EnvTmp {self.environment_temperature: >5.2f}{chr(223)}C " + warning_1 + "\n" \
-                                    f"Hum {self.humidity: >9.2f}% " + warning_2
-        elif self.current_screen == 1:
+            return f"EnvTmp {lcd_value(self.environment_temperature, '>5.2f')}{chr(223)}C " \
+                   + warning_1 + "\n" \
+                   f"Hum {lcd_value(self.humidity, '>9.2f')}% " + warning_2
+        elif screen == 1:
             warning_1 = " " if self.correct_water_temperature else "#"
             water_level_text = "Water Level:  OK" if self.is_water_level_good else "Water Level: BAD"
-            self.current_lcd_text = (f"WatTmp {self.water_temperature: >5.2f}{chr(223)}C " + warning_1 + "\n"
-                                     + water_level_text)
-        elif self.current_screen == 2:
+            return (f"WatTmp {lcd_value(self.water_temperature, '>5.2f')}{chr(223)}C " + warning_1
+                    + "\n" + water_level_text)
+        elif screen == 2:
             warning_1 = " " if self.is_acceptable_ph else "#"
             warning_2 = " " if self.is_acceptable_orp else "#"
-            self.current_lcd_text = f"pH {self.water_ph: >11.2f} " + warning_1 + "\n" \
-                                    f"ORP {self.orp: >7} mV " + warning_2
-        elif self.current_screen == 3:
+            return f"pH {lcd_value(self.water_ph, '>11.2f')} " + warning_1 + "\n" \
+                   f"ORP {lcd_value(self.orp, '>7')} mV " + warning_2
+        elif screen == 3:
             warning = " " if self.is_acceptable_light else "#"
-            self.current_lcd_text = f"Env. Light      \n{self.environment_light: >10} lux " + warning
-        elif self.current_screen == 4:
+            return f"Env. Light      \n{lcd_value(self.environment_light, '>10')} lux " + warning
+        elif screen == 4:
             warning = " " if self.is_acceptable_turbidity else "#"
-            self.current_lcd_text = f"Water Turbidity \n{self.water_turbidity: >10.2f} NTU " + warning
+            return f"Water Turbidity \n{lcd_value(self.water_turbidity, '>10.2f')} NTU " + warning
+
+    def render_screens(self, changed: set = None):
+        """
+        Format and pre-encode the LCD screens that show a changed value.
+
+        The screens are kept in screen_cache, so that switching screen is a single burst write.
+        Screens that are not cached yet are rendered when they are first shown (see show_screen).
+
+        :param changed: The changed values (see detect_changes), every screen is rendered if None.
+        :type changed: set
+
+        :return: None
+        """
+        for screen, values in self.SCREEN_VALUES.items():
+            if changed is None or changed.intersection(values):
+                text = self.screen_text(screen)
+                self.screen_cache[screen] = (text, self.lcd.encode(text))
 
-    def lcd_update(self):
+    def show_screen(self, screen: int):
+        """
+        Show an LCD screen from screen_cache, without clearing the LCD first.
+
+        :param screen: The screen index (FIRST_SCREEN to LAST_SCREEN).
+        :type screen: int
+
+        :return: None
+        """
+        if screen not in self.screen_cache:
+            text = self.screen_text(screen)
+            self.screen_cache[screen] = (text, self.lcd.encode(text))
+        self.current_lcd_text, encoded = self.screen_cache[screen]
+        self.lcd.show(self.current_lcd_text, encoded)
+
+    def detect_changes(self) -> set:
+        """
+        Find the sensor values that changed since they were last reported.
+
+        A value changed if it moved more than its REPORT_DEADBANDS entry away from the last reported
+        value, or if it crossed one of its thresholds. Only changed values need to be acted upon
+        (actuators, LCD), which keeps the I/O low while the pool is quiet.
+
+        :return: The names of the changed values (see SENSOR_VALUES).
+        """
+        changed = set()
+        for name, flag in self.SENSOR_VALUES:
+            value = getattr(self, name)
+            if self.change_detector.update(name, value, getattr(self, flag) if flag is not None else None):
+                changed.add(name)
+                logging.info("CHANGED %s = %s", name, value)
+        return changed
+
+    def lcd_update(self, changed: set = None):
         """
         Update the LCD screen with the current sensor readings.
 
-        This method locks the current screen to prevent concurrent updates and updates the LCD
-        screen content with the information from the current sensor readings.
+        This method renders the screens showing a changed value (see render_screens) and updates
+        the LCD screen content with the information from the current sensor readings.
+
+        If the LCD render thread is running, the update is only posted to it (see post_lcd_request).
+
+        :param changed: The changed values (see detect_changes), the screen is only redrawn if it shows
+                        one of them. Always redrawn if None, nothing to do if empty.
+        :type changed: set
 
         :return: None
         """
-        logging.info("START lcd_update")
+        if changed is not None and not changed:
+            return
+        if self.is_lcd_renderer_running():
+            self.post_lcd_request(changed=changed)
+        else:
+            self.draw_lcd(changed)
+
+    def draw_lcd(self, changed: set = None, screen: int = None):
+        """
+        Render the screens showing a changed value and draw the current screen.
+
+        The screen index is only locked while it is read, never while the LCD is written, so the
+        button handlers are not held back by a draw in progress.
+
+        :param changed: The changed values (see render_screens), the current screen is only redrawn
+                        if it shows one of them. Always redrawn if None.
+        :type changed: set
+        :param screen: The screen to show even if none of its values changed, after a screen switch.
+                       None to redraw the current screen.
+        :type screen: int
+
+        :return: None
+        """
+        self.render_screens(changed)
+        if screen is not None:
+            self.show_screen(screen)
+            return
         with self.current_screen_lock:
-            self.update_current_screen_text()
-            self.lcd_print(self.current_lcd_text)
+            screen = self.current_screen
+        if changed is not None and not changed.intersection(self.SCREEN_VALUES[screen]):
+            return
+        logging.info("START lcd_update")
+        self.current_lcd_text = self.screen_cache[screen][0]
+        self.lcd_print(self.current_lcd_text)
+        if not self.is_lcd_renderer_running():
+            # Without the render thread, a button may have switched screen while this one was drawn
+            with self.current_screen_lock:
+                screen_now = self.current_screen
+            if screen_now != screen:
+                self.show_screen(screen_now)
         logging.info("END   lcd_update")
 
+    def start_lcd_renderer(self) -> None:
+        """
+        Start the LCD render thread.
+
+        From now on only the render thread writes to the LCD: lcd_update and the button handlers
+        post a request, and several requests posted while the LCD is busy are drawn at once.
+
+        :return: None
+        """
+        if self.is_lcd_renderer_running():
+            return
+        self.is_lcd_renderer_stopping = False
+        self.lcd_renderer = threading.Thread(target=self.lcd_render_loop, daemon=True)
+        self.lcd_renderer.start()
+
+    def stop_lcd_renderer(self) -> None:
+        """
+        Stop the LCD render thread, after it has drawn the request it is working on.
+
+        :return: None
+        """
+        with self.lcd_request_condition:
+            self.is_lcd_renderer_stopping = True
+            self.lcd_request_condition.notify()
+        if self.lcd_renderer is not None:
+            self.lcd_renderer.join()
+            self.lcd_renderer = None
+
+    def is_lcd_renderer_running(self) -> bool:
+        return self.lcd_renderer is not None and self.lcd_renderer.is_alive()
+
+    def post_lcd_request(self, changed: set = frozenset(), screen: int = None) -> None:
+        """
+        Post a request to the LCD render thread without waiting for it to be drawn.
+
+        A request still pending is merged with the new one: the changed values are joined and the latest
+        screen switch wins, so the render thread only draws the latest state.
+
+        :param changed: The changed values (see draw_lcd), None for all of them.
+        :type changed: set
+        :param screen: The screen to show after a screen switch, None otherwise.
+        :type screen: int
+
+        :return: None
+        """
+        with self.lcd_request_condition:
+            if self.lcd_request is not None:
+                pending_changed, pending_screen = self.lcd_request
+                changed = None if changed is None or pending_changed is None else pending_changed | changed
+                if screen is None:
+                    screen = pending_screen
+            self.lcd_request = (changed, screen)
+            self.lcd_request_condition.notify()
+
+    def lcd_render_loop(self) -> None:
+        """
+        Body of the LCD render thread: draw the latest posted request until stop_lcd_renderer is called.
+
+        :return: None
+        """
+        while True:
+            with self.lcd_request_condition:
+                while self.lcd_request is None and not self.is_lcd_renderer_stopping:
+                    self.lcd_request_condition.wait()
+                if self.is_lcd_renderer_stopping:
+                    return
+                changed, screen = self.lcd_request
+                self.lcd_request = None
+            try:
+                self.draw_lcd(changed, screen)
+            except Exception as e:
+                # A failed write must not stop the thread, the next request redraws
+                logging.warning("LCD render failed (%s: %s)", type(e).__name__, e)
+
     def button_prev_event(self, channel):
         """
         Event handler for the button press to navigate to the previous screen.
 
         This method is triggered when the button connected to the specified GPIO channel
         for the 'previous' action is pressed. It updates the current screen index, ensuring
-        it wraps around to the last screen if the first screen is exceeded. Then, it updates
-        the LCD screen with the new content based on the updated screen index.
+        it wraps around to the last screen if the first screen is exceeded. Then, it shows
+        the pre-rendered content of the new screen (see show_screen), or only posts the
+        new screen to the LCD render thread if it is running. The screen index is locked while
+        it is updated, not while the LCD is written.
 
         :param channel: The GPIO channel to which the button for the 'previous' action is connected.
         :type channel: int
         :return: None
         """
         logging.info("BUTTON_PREV (GPIO %d)", channel)
+        if self.is_low_power_mode_on:
+            self.wake_lcd_backlight()
         with self.current_screen_lock:
             self.current_screen = self.current_screen - 1
             if self.current_screen < self.FIRST_SCREEN:
                 self.current_screen = self.LAST_SCREEN
-
-            self.update_current_screen_text()
-            self.lcd_clear()
-            self.lcd_print(self.current_lcd_text)
+            screen = self.current_screen
+        if self.is_lcd_renderer_running():
+            self.post_lcd_request(screen=screen)
+        else:
+            self.show_screen(screen)
 
     def button_next_event(self, channel):
         """
@@ -506,36 +1442,48 @@ class EmbeddedPool:
 
         This method is triggered when the button connected to the specified GPIO channel
         for the 'next' action is pressed. It updates the current screen index, ensuring
-        it wraps around to the first screen if the last screen is exceeded. Then, it updates
-        the LCD screen with the new content based on the updated screen index.
+        it wraps around to the first screen if the last screen is exceeded. Then, it shows
+        the pre-rendered content of the new screen (see show_screen), or only posts the
+        new screen to the LCD render thread if it is running. The screen index is locked while
+        it is updated, not while the LCD is written.
 
         :param channel: The GPIO channel to which the button for the 'next' action is connected.
         :type channel: int
         :return: None
         """
         logging.info("BUTTON_NEXT (GPIO %d)", channel)
+        if self.is_low_power_mode_on:
+            self.wake_lcd_backlight()
         with self.current_screen_lock:
             self.current_screen = self.current_screen + 1
             if self.current_screen > self.LAST_SCREEN:
                 self.current_screen = self.FIRST_SCREEN
-
-            self.update_current_screen_text()
-            self.lcd_clear()
-            self.lcd_print(self.current_lcd_text)
+            screen = self.current_screen
+        if self.is_lcd_renderer_running():
+            self.post_lcd_request(screen=screen)
+        else:
+            self.show_screen(screen)
 
     def turn_off(self):
         """
         Perform cleanup and shutdown procedures for the embedded system.
 
         This method is called when the system is being turned off. It ensures that the
-        windows are closed, clears the LCD screen, turns off the LCD backlight, stops the
-        servo motor, and cleans up GPIO resources.
+        windows are closed, stops the LCD render thread, clears the LCD screen, turns off the LCD backlight,
+        stops the servo motor, the water temperature sampler and the DHT worker, and cleans up GPIO resources.
 
         :return: None
         """
         if self.are_windows_open:
             self.change_servo_angle(self.DC_CLOSED)
+        self.stop_lcd_renderer()
         self.lcd_clear()
-        self.turn_off_lcd_backlight()
+        with self.lcd_backlight_lock:
+            if self.is_lcd_backlight_on:
+                self.turn_off_lcd_backlight()
         self.p.stop()
+        self.ds18b20.stop_sampler()
+        self.ds18b20.close()
+        self.dht_worker.stop()
+        self.disable_water_level_interrupts()
         GPIO.cleanup()
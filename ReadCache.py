@@ -0,0 +1,93 @@
+import threading
+import time
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ReadCache:
+    """
+    TTL cache with single-flight loading.
+
+    A value is loaded at most once per TTL. While a load is in progress, other callers asking for the
+    same key wait for it and share its result (or its exception) instead of starting their own load.
+    """
+
+    def __init__(self, ttls: dict = None, default_ttl: float = 0, clock=None):
+        """
+        :param ttls: Time to live of each key, in seconds.
+        :type ttls: dict
+        :param default_ttl: Time to live of the keys missing from ttls.
+        :type default_ttl: float
+        :param clock: Function returning the current time in seconds, time.monotonic if None.
+        :type clock: callable
+        """
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.clock = clock if clock is not None else time.monotonic
+        self.values = {}
+        self.flights = {}
+        self.lock = threading.Lock()
+
+    def get(self, key, load):
+        """
+        Get the value of a key, loading it if it is missing or expired.
+
+        :param key: The key.
+        :param load: Function returning the value, called without arguments.
+        :type load: callable
+
+        :return: The cached or loaded value.
+        :raises Exception: Whatever load raised, to every caller sharing that load.
+        """
+        with self.lock:
+            cached = self.values.get(key)
+            if cached is not None and self.clock() < cached[1]:
+                return cached[0]
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = load()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                if flight.error is None:
+                    self.values[key] = (flight.result, self.clock() + self.ttls.get(key, self.default_ttl))
+                del self.flights[key]
+            flight.done.set()
+        return flight.result
+
+    def is_fresh(self, key) -> bool:
+        """
+        :return: True if get() would return the cached value of a key without loading it.
+        """
+        with self.lock:
+            cached = self.values.get(key)
+            return cached is not None and self.clock() < cached[1]
+
+    def invalidate(self, key=None) -> None:
+        """
+        Drop the cached value of a key (all keys if None), in-flight loads are not affected.
+
+        :return: None
+        """
+        with self.lock:
+            if key is None:
+                self.values.clear()
+            else:
+                self.values.pop(key, None)
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from time import sleep
 
 
@@ -45,6 +46,9 @@ class Adafruit_CharLCD(object):
     LCD_5x10DOTS            = 0x04
     LCD_5x8DOTS             = 0x00
 
+    # DDRAM addresses per line in 2 line mode (only the first columns are visible)
+    DDRAM_LINE_LENGTH       = 40
+
     def __init__(self, pin_rs=25, pin_e=24, pins_db=[23, 17, 21, 22], GPIO=None):
         # Emulate the old behavior of using RPi.GPIO if we haven't been given
         # an explicit GPIO interface to use
@@ -63,6 +67,27 @@ class Adafruit_CharLCD(object):
         for pin in self.pins_db:
             self.GPIO.setup(pin, GPIO.OUT)
 
+        self.numcols = 16
+        self.numlines = 2
+        self.row_offsets = [0x00, 0x40, 0x14, 0x54]
+
+        # Expanders that can stream port values (PCF8574_GPIO) get a whole byte in one bus burst
+        self.fastpath = hasattr(self.GPIO, 'outputSequence')
+        # Expanders that can gather port changes (PCF8574_GPIO) flush a whole update at once
+        self.batch = getattr(self.GPIO, 'batch', nullcontext)
+        self.settleMicroseconds = 1000  # wait before each write, generous during initialization
+        # Port bits of each nibble value: bit k of the nibble drives pins_db[k]
+        nibbleBits = [sum(1 << self.pins_db[k] for k in range(4) if n >> k & 1) for n in range(16)]
+        self.byteBits = [(nibbleBits[b >> 4], nibbleBits[b & 0x0F]) for b in range(256)]
+        self.rsBit = 1 << self.pin_rs
+        self.eBit = 1 << self.pin_e
+        self.lcdMask = self.rsBit | self.eBit | nibbleBits[0x0F]
+
+        # Shadow copy of the DDRAM and cursor position, None where unknown
+        self.ddram = None
+        self.cursor_position = None
+        self.invalidate()
+
         self.write4bits(0x33)  # initialization
         self.write4bits(0x32)  # initialization
         self.write4bits(0x28)  # 2 line 5x7 matrix
@@ -78,9 +103,14 @@ class Adafruit_CharLCD(object):
         self.displaymode = self.LCD_ENTRYLEFT | self.LCD_ENTRYSHIFTDECREMENT
         self.write4bits(self.LCD_ENTRYMODESET | self.displaymode)  # set the entry mode
 
+        if self.fastpath:
+            # Initialized: the I2C transfer of the next write outlasts the 37 us execution time of a write
+            self.settleMicroseconds = 0
+
         self.clear()
 
     def begin(self, cols, lines):
+        self.numcols = cols
         if (lines > 1):
             self.numlines = lines
             self.displayfunction |= self.LCD_2LINE
@@ -88,16 +118,26 @@ class Adafruit_CharLCD(object):
     def home(self):
         self.write4bits(self.LCD_RETURNHOME)  # set cursor position to zero
         self.delayMicroseconds(3000)  # this command takes a long time!
+        self.cursor_position = (0, 0)
 
     def clear(self):
         self.write4bits(self.LCD_CLEARDISPLAY)  # command to clear display
         self.delayMicroseconds(3000)  # 3000 microsecond sleep, clearing the display takes a long time
+        self.ddram = [[' '] * self.DDRAM_LINE_LENGTH for _ in range(2)]
+        self.cursor_position = (0, 0)
+
+    def invalidate(self):
+        """ Forget the shadow DDRAM, the next update() rewrites every character """
+        self.ddram = [[None] * self.DDRAM_LINE_LENGTH for _ in range(2)]
+        self.cursor_position = None
 
     def setCursor(self, col, row):
         self.row_offsets = [0x00, 0x40, 0x14, 0x54]
         if row > self.numlines:
             row = self.numlines - 1  # we count rows starting w/0
         self.write4bits(self.LCD_SETDDRAMADDR | (col + self.row_offsets[row]))
+        # Rows 2 and 3 of 4 line displays continue rows 0 and 1 in DDRAM, they are not tracked
+        self.cursor_position = (col, row) if row < 2 and col < self.DDRAM_LINE_LENGTH else None
 
     def noDisplay(self):
         """ Turn the display off (quickly) """
@@ -146,11 +186,13 @@ class Adafruit_CharLCD(object):
         """ This is for text that flows Right to Left """
         self.displaymode &= ~self.LCD_ENTRYLEFT
         self.write4bits(self.LCD_ENTRYMODESET | self.displaymode)
+        self.invalidate()
 
     def autoscroll(self):
         """ This will 'right justify' text from the cursor """
         self.displaymode |= self.LCD_ENTRYSHIFTINCREMENT
         self.write4bits(self.LCD_ENTRYMODESET | self.displaymode)
+        self.invalidate()
 
     def noAutoscroll(self):
         """ This will 'left justify' text from the cursor """
@@ -159,7 +201,15 @@ class Adafruit_CharLCD(object):
 
     def write4bits(self, bits, char_mode=False):
         """ Send command to LCD """
-        self.delayMicroseconds(1000)  # 1000 microsecond sleep
+        if self.settleMicroseconds:
+            self.delayMicroseconds(self.settleMicroseconds)
+        if self.fastpath:
+            # Both nibbles with their enable pulses as one burst of 6 port values, in a batch so that
+            # other port bits (backlight) changed by another thread are not overwritten
+            with self.batch():
+                base = self.GPIO.readPort() & ~self.lcdMask
+                self.GPIO.outputSequence([value | base for value in self.encodeByte(bits, char_mode)])
+            return
         bits = bin(bits)[2:].zfill(8)
         self.GPIO.output(self.pin_rs, char_mode)
         for pin in self.pins_db:
@@ -175,6 +225,14 @@ class Adafruit_CharLCD(object):
                 self.GPIO.output(self.pins_db[::-1][i-4], True)
         self.pulseEnable()
 
+    def encodeByte(self, bits, char_mode=False):
+        """ Port values that send a byte (both nibbles with their enable pulses), other port bits clear """
+        high, low = self.byteBits[bits]
+        if char_mode:
+            high |= self.rsBit
+            low |= self.rsBit
+        return [high, high | self.eBit, high, low, low | self.eBit, low]
+
     def delayMicroseconds(self, microseconds):
         seconds = microseconds / float(1000000)  # divide microseconds by 1 million for seconds
         sleep(seconds)
@@ -192,8 +250,85 @@ class Adafruit_CharLCD(object):
         for char in text:
             if char == '\n':
                 self.write4bits(0xC0)  # next line
+                self.cursor_position = (0, 1)
             else:
-                self.write4bits(ord(char), True)
+                self.writeChar(char)
+
+    def writeChar(self, char):
+        """ Write one character at the cursor, keeping the shadow DDRAM up to date """
+        self.write4bits(ord(char), True)
+        if self.cursor_position is None:
+            return
+        if not self.isTracking():
+            self.invalidate()
+            return
+        col, row = self.cursor_position
+        self.ddram[row][col] = char
+        # Left to right entry: the address counter moves to the next cell, line 0 continues on line 1
+        col += 1
+        if col == self.DDRAM_LINE_LENGTH:
+            col, row = 0, (row + 1) % 2
+        self.cursor_position = (col, row)
+
+    def isTracking(self):
+        """ The shadow DDRAM follows the display in the default entry mode only """
+        return self.displaymode == self.LCD_ENTRYLEFT | self.LCD_ENTRYSHIFTDECREMENT
+
+    def update(self, text):
+        """
+        Show text (newline separated lines, padded with spaces to the display width) sending only the
+        characters that differ from the shadow DDRAM, with a cursor move only before a skipped gap.
+        The writes are gathered in one batch when the GPIO interface supports it.
+        Returns the number of characters written.
+        """
+        written = 0
+        with self.batch():
+            for row, line in enumerate(self.frameLines(text)):
+                for col, char in enumerate(line):
+                    if self.isTracking() and self.ddram[row][col] == char:
+                        continue
+                    if self.cursor_position != (col, row):
+                        self.setCursor(col, row)
+                    self.writeChar(char)
+                    written += 1
+        return written
+
+    def frameLines(self, text):
+        """ The lines of text as shown by update(), cut or padded with spaces to the display width """
+        return [line[:self.numcols].ljust(self.numcols) for line in text.split('\n')[:min(self.numlines, 2)]]
+
+    def encode(self, text):
+        """
+        Pre-encode the whole text (see update) as port values for show(), so that a cached screen
+        can be drawn without formatting it again. None if the GPIO interface cannot stream port values.
+        """
+        if not self.fastpath:
+            return None
+        values = []
+        for row, line in enumerate(self.frameLines(text)):
+            values += self.encodeByte(self.LCD_SETDDRAMADDR | self.row_offsets[row])
+            for char in line:
+                values += self.encodeByte(ord(char), True)
+        return values
+
+    def show(self, text, values):
+        """
+        Draw text pre-encoded by encode() as a single burst, with no clear.
+        Falls back to update() when there are no pre-encoded values or the entry mode is not the default.
+        Returns the number of characters written.
+        """
+        if values is None or not self.isTracking():
+            return self.update(text)
+        lines = self.frameLines(text)
+        with self.batch():
+            base = self.GPIO.readPort() & ~self.lcdMask
+            self.GPIO.outputSequence([value | base for value in values])
+            # Under the same lock as the writes, so a concurrent update() diffs against what is on the glass
+            for row, line in enumerate(lines):
+                self.ddram[row][:len(line)] = list(line)
+            col = len(lines[-1]) if lines else 0
+            self.cursor_position = (col, len(lines) - 1) if lines and col < self.DDRAM_LINE_LENGTH else None
+        return sum(len(line) for line in lines)
 
 
 if __name__ == '__main__':
@@ -13,14 +13,27 @@ try:
     import smbus
 except ImportError:
     import mock.smbus as smbus
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    import mock.GPIO as GPIO
+import math
+import statistics
+import threading
 import time
+from array import array
+from collections import namedtuple
 
-## Get I2C bus
-bus = smbus.SMBus(1)
+## I2C buses opened so far and the lock serializing transactions on each, keyed by bus number
+_buses = {}
+_bus_locks = {}
+_buses_lock = threading.Lock()
 
 ## I2C address of the device
 ADS1115_IIC_ADDRESS0				= 0x48
 ADS1115_IIC_ADDRESS1				= 0x49
+ADS1115_IIC_ADDRESS2				= 0x4A
+ADS1115_IIC_ADDRESS3				= 0x4B
 
 ## ADS1115 Register Map
 ## Conversion register
@@ -106,10 +119,102 @@ ADS1115_REG_CONFIG_CQUE_4CONV		= 0x02
 ## Disable the comparator and put ALERT/RDY in high state (default)
 ADS1115_REG_CONFIG_CQUE_NONE		= 0x03
 
-mygain=0x02
-coefficient=0.125
-addr_G=ADS1115_IIC_ADDRESS0
+## Conversion-ready strategies used before reading a result
+## Fixed 100 ms sleep (default)
+ADS1115_READY_SLEEP					= 0
+## Poll the OS bit of the config register
+ADS1115_READY_POLL					= 1
+## Wait for the ALERT/RDY pin to assert
+ADS1115_READY_ALERT					= 2
+
+## Samples per second for each data rate setting
+ADS1115_DATA_RATES = {
+	ADS1115_REG_CONFIG_DR_8SPS: 8,
+	ADS1115_REG_CONFIG_DR_16SPS: 16,
+	ADS1115_REG_CONFIG_DR_32SPS: 32,
+	ADS1115_REG_CONFIG_DR_64SPS: 64,
+	ADS1115_REG_CONFIG_DR_128SPS: 128,
+	ADS1115_REG_CONFIG_DR_250SPS: 250,
+	ADS1115_REG_CONFIG_DR_475SPS: 475,
+	ADS1115_REG_CONFIG_DR_860SPS: 860,
+}
+
+## mV per code for each programmable gain setting
+ADS1115_PGA_COEFFICIENTS = {
+	ADS1115_REG_CONFIG_PGA_6_144V: 0.1875,
+	ADS1115_REG_CONFIG_PGA_4_096V: 0.125,
+	ADS1115_REG_CONFIG_PGA_2_048V: 0.0625,
+	ADS1115_REG_CONFIG_PGA_1_024V: 0.03125,
+	ADS1115_REG_CONFIG_PGA_0_512V: 0.015625,
+	ADS1115_REG_CONFIG_PGA_0_256V: 0.0078125,
+}
+## Gain settings from the widest to the narrowest input range
+ADS1115_PGA_ORDER = [ADS1115_REG_CONFIG_PGA_6_144V, ADS1115_REG_CONFIG_PGA_4_096V, ADS1115_REG_CONFIG_PGA_2_048V,
+	ADS1115_REG_CONFIG_PGA_1_024V, ADS1115_REG_CONFIG_PGA_0_512V, ADS1115_REG_CONFIG_PGA_0_256V]
+## Autoranging widens the range once a code reaches this fraction of full scale
+ADS1115_AUTORANGE_HIGH				= 0.95
+## Autoranging narrows the range when the reading fits in this fraction of a narrower full scale
+ADS1115_AUTORANGE_LOW				= 0.8
+
+## Reductions applied to an oversampled burst
+## Arithmetic mean of the samples
+ADS1115_REDUCE_MEAN					= 'mean'
+## Median of the samples
+ADS1115_REDUCE_MEDIAN				= 'median'
+## Mean after dropping ADS1115_TRIM_FRACTION of the samples at each end
+ADS1115_REDUCE_TRIMMED_MEAN			= 'trimmed_mean'
+## Fraction of samples dropped at each end by the trimmed mean
+ADS1115_TRIM_FRACTION				= 0.2
+
+## Input multiplexer setting for each single-ended channel
+ADS1115_SINGLE_MUX = [ADS1115_REG_CONFIG_MUX_SINGLE_0, ADS1115_REG_CONFIG_MUX_SINGLE_1,
+	ADS1115_REG_CONFIG_MUX_SINGLE_2, ADS1115_REG_CONFIG_MUX_SINGLE_3]
+## Input multiplexer setting for each differential channel
+ADS1115_DIFF_MUX = [ADS1115_REG_CONFIG_MUX_DIFF_0_1, ADS1115_REG_CONFIG_MUX_DIFF_0_3,
+	ADS1115_REG_CONFIG_MUX_DIFF_1_3, ADS1115_REG_CONFIG_MUX_DIFF_2_3]
+
+## Result of ADS1115.scan: time the scan started, the voltage (mV) and the (raw code, gain) of each channel
+ScanResult = namedtuple('ScanResult', ['timestamp', 'voltages', 'codes'], defaults=(None,))
+
+def open_bus(busnum):
+	'''!
+	  @brief Returns the SMBus shared by every ADS1115 on a bus, opening it on first use.
+	  @param busnum  I2C bus number
+	  @return (bus, lock) where lock must be held around each transaction
+	'''
+	with _buses_lock:
+		if busnum not in _buses:
+			_buses[busnum] = smbus.SMBus(busnum)
+			_bus_locks[busnum] = threading.Lock()
+		return _buses[busnum], _bus_locks[busnum]
+
 class ADS1115():
+	def __init__(self,addr=ADS1115_IIC_ADDRESS0,busnum=1):
+		'''!
+		  @brief Each instance owns its address, gain and settings, so several ADCs can share one bus.
+		  @param addr  7 bits I2C address, 0x48~0x4B depending on the ADDR pin
+		  @param busnum  I2C bus number
+		'''
+		self.addr = addr
+		self.gain = ADS1115_REG_CONFIG_PGA_4_096V
+		self.coefficient = 0.125
+		self.bus, self.bus_lock = open_bus(busnum)
+		self._lock = threading.RLock()
+		self.channel = 0
+		self.ready_mode = ADS1115_READY_SLEEP
+		self.ready_timeout = 0.1
+		self.alert_pin = None
+		self._ready = threading.Event()
+		self.data_rates = {}
+		self.oversampling = {}
+		self._window = None
+		self._window_bounds = None
+		self._window_tripped = False
+		self.gains = {}
+		self.autorange = {}
+		self._config_cache = {}
+		self._last_config = None
+
 	def set_gain(self,gain):
 		'''!
 		  @brief Sets the gain and input voltage range.
@@ -122,30 +227,15 @@ class ADS1115():
 		  @n ADS1115_REG_CONFIG_PGA_0_512V     = 0x08 # 0.512V range = Gain 8
 		  @n ADS1115_REG_CONFIG_PGA_0_256V     = 0x0A # 0.256V range = Gain 16
 		'''
-		global mygain
-		global coefficient
-		mygain=gain
-		if mygain == ADS1115_REG_CONFIG_PGA_6_144V:
-			coefficient = 0.1875
-		elif mygain == ADS1115_REG_CONFIG_PGA_4_096V:
-			coefficient = 0.125
-		elif mygain == ADS1115_REG_CONFIG_PGA_2_048V:
-			coefficient = 0.0625
-		elif mygain == ADS1115_REG_CONFIG_PGA_1_024V:
-			coefficient = 0.03125
-		elif mygain == ADS1115_REG_CONFIG_PGA_0_512V:
-			coefficient = 0.015625
-		elif  mygain == ADS1115_REG_CONFIG_PGA_0_256V:
-			coefficient = 0.0078125
-		else:
-			coefficient = 0.125
+		self.gain=gain
+		self.coefficient = ADS1115_PGA_COEFFICIENTS.get(gain, 0.125)
+		self._config_cache.clear()
 	def set_addr_ADS1115(self,addr):
 		'''!
 		  @brief Sets the IIC address.
 		  @param addr  7 bits I2C address, the range is 1~127.
 		'''
-		global addr_G
-		addr_G=addr
+		self.addr=addr
 	def set_channel(self,channel):
 		'''!
 		  @brief Select the Channel user want to use from 0-3.
@@ -162,7 +252,6 @@ class ADS1115():
 		  @n    3 : AINP = AIN2 and AINN = AIN3
 		  @return channel
 		'''
-		global mygain
 		self.channel = channel
 		while self.channel > 3 :
 			self.channel = 0
@@ -173,49 +262,36 @@ class ADS1115():
 		'''!
 		  @brief Configuration using a single read.
 		'''
-		global addr_G
-		if self.channel == 0:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_SINGLE_0 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 1:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_SINGLE_1 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 2:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_SINGLE_2 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 3:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_SINGLE_3 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-
-		bus.write_i2c_block_data(addr_G, ADS1115_REG_POINTER_CONFIG, CONFIG_REG)
+		CONFIG_REG = self._config_word(self.channel, ADS1115_SINGLE_MUX[self.channel])
+		self._write_config(CONFIG_REG)
 
 	def set_differential(self):
 		'''!
 		  @brief Configure as comparator output.
 		'''
-		global addr_G
-		if self.channel == 0:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_DIFF_0_1 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 1:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_DIFF_0_3 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 2:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_DIFF_1_3 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-		elif self.channel == 3:
-			CONFIG_REG = [ADS1115_REG_CONFIG_OS_SINGLE | ADS1115_REG_CONFIG_MUX_DIFF_2_3 | mygain | ADS1115_REG_CONFIG_MODE_CONTIN, ADS1115_REG_CONFIG_DR_128SPS | ADS1115_REG_CONFIG_CQUE_NONE]
-
-		bus.write_i2c_block_data(addr_G, ADS1115_REG_POINTER_CONFIG, CONFIG_REG)
+		CONFIG_REG = self._config_word(self.channel, ADS1115_DIFF_MUX[self.channel])
+		self._write_config(CONFIG_REG)
 
-	def read_value(self):
+	def read_raw(self):
 		'''!
-		  @brief  Read ADC value.
-		  @return raw  adc
+		  @brief  Read the conversion register.
+		  @return signed raw code
 		'''
-		global coefficient
-		global addr_G
-		data = bus.read_i2c_block_data(addr_G, ADS1115_REG_POINTER_CONVERT, 2)
+		data = self._read(ADS1115_REG_POINTER_CONVERT, 2)
 
 		# Convert the data
 		raw_adc = data[0] * 256 + data[1]
 
 		if raw_adc > 32767:
-			raw_adc -= 65535
-		raw_adc = int(float(raw_adc)*coefficient)
+			raw_adc -= 65536
+		return raw_adc
+
+	def read_value(self):
+		'''!
+		  @brief  Read ADC value.
+		  @return raw  adc
+		'''
+		raw_adc = int(float(self.read_raw())*self.coefficient)
 		# return {'r' : raw_adc}
 		return raw_adc
 
@@ -235,10 +311,25 @@ class ADS1115():
 		  @n    3 : AINP = AIN2 and AINN = AIN3
 		  @return Voltage
 		'''
-		self.set_channel(channel)
-		self.set_single()
-		time.sleep(0.1)
-		return self.read_value()
+		with self._lock:
+			self.set_channel(channel)
+			voltage = self._read_millivolts(self.channel, ADS1115_SINGLE_MUX)
+			self._rearm_window({self.channel: voltage})
+			return voltage
+
+	def read_code(self,channel):
+		'''!
+		  @brief Reads a single-ended channel as a raw code, e.g. for a code-indexed lookup table.
+		  @n Same acquisition as read_voltage (oversampling, autoranging), without the conversion to mV.
+		  @param channel  the Channel: 0-3
+		  @return (code, gain), the signed raw code (an oversampled code is rounded to the nearest integer)
+		  @n and the ADS1115_REG_CONFIG_PGA_* gain it was taken with
+		'''
+		with self._lock:
+			self.set_channel(channel)
+			code, gain = self._read_code(self.channel, ADS1115_SINGLE_MUX)
+			self._rearm_window({self.channel: int(float(code)*ADS1115_PGA_COEFFICIENTS.get(gain, 0.125))})
+			return int(round(code)), gain
 
 	def comparator_voltage(self,channel):
 		'''!
@@ -256,7 +347,469 @@ class ADS1115():
 		  @n    3 : AINP = AIN2 and AINN = AIN3
 		  @return Voltage
 		'''
-		self.set_channel(channel)
-		self.set_differential()
-		time.sleep(0.1)
-		return self.read_value()
\ No newline at end of file
+		with self._lock:
+			self.set_channel(channel)
+			voltage = self._read_millivolts(self.channel, ADS1115_DIFF_MUX)
+			self._rearm_window()
+			return voltage
+
+	def set_ready_mode(self,mode,timeout=0.1,alert_pin=None):
+		'''!
+		  @brief Selects how a read waits for the conversion to finish.
+		  @param mode  the conversion-ready strategy
+		  @n ADS1115_READY_SLEEP : fixed 100 ms sleep (default)
+		  @n ADS1115_READY_POLL  : poll the OS bit of the config register
+		  @n ADS1115_READY_ALERT : wait for a falling edge on the ALERT/RDY pin
+		  @param timeout    seconds to wait for a conversion before giving up
+		  @param alert_pin  BCM GPIO wired to ALERT/RDY, required by ADS1115_READY_ALERT
+		'''
+		if mode == ADS1115_READY_ALERT and alert_pin is None:
+			raise ValueError("ADS1115_READY_ALERT needs the GPIO wired to ALERT/RDY")
+		if mode == ADS1115_READY_ALERT and self._window is not None:
+			raise ValueError("ALERT/RDY is already used by the window comparator")
+		if self.alert_pin is not None:
+			GPIO.remove_event_detect(self.alert_pin)
+		if mode == ADS1115_READY_ALERT:
+			# Hi_thresh MSB = 1 and Lo_thresh MSB = 0 turn ALERT/RDY into a conversion-ready output
+			self._write(ADS1115_REG_POINTER_HITHRESH, [0x80, 0x00])
+			self._write(ADS1115_REG_POINTER_LOWTHRESH, [0x00, 0x00])
+			GPIO.setup(alert_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+			GPIO.add_event_detect(alert_pin, GPIO.FALLING, callback=self._on_alert)
+		else:
+			alert_pin = None
+		self.ready_mode = mode
+		self.ready_timeout = timeout
+		self.alert_pin = alert_pin
+		self._config_cache.clear()
+
+	def conversion_ready(self):
+		'''!
+		  @brief Checks the OS bit of the config register.
+		  @return True when the device is not performing a conversion
+		'''
+		data = self._read(ADS1115_REG_POINTER_CONFIG, 2)
+		return bool(data[0] & ADS1115_REG_CONFIG_OS_SINGLE)
+
+	def wait_conversion(self,timeout=None):
+		'''!
+		  @brief Blocks until the conversion started by set_single/set_differential is done.
+		  @param timeout  seconds to wait, defaults to the timeout given to set_ready_mode
+		  @exception TimeoutError  the conversion did not complete in time
+		'''
+		if self.ready_mode == ADS1115_READY_SLEEP:
+			time.sleep(0.1)
+			return
+		if timeout is None:
+			timeout = self.ready_timeout
+		if self.ready_mode == ADS1115_READY_ALERT:
+			if not self._ready.wait(timeout):
+				raise TimeoutError("ADS1115 ALERT/RDY did not assert within %.3f s" % timeout)
+			return
+		deadline = time.monotonic() + timeout
+		period = 1.0 / ADS1115_DATA_RATES[self._data_rate(self.channel)]
+		# Nothing to poll for until the nominal conversion time has elapsed
+		time.sleep(period)
+		while not self.conversion_ready():
+			if time.monotonic() > deadline:
+				raise TimeoutError("ADS1115 conversion did not complete within %.3f s" % timeout)
+			time.sleep(period / 8)
+
+	def scan(self,channels=(0, 1, 2, 3)):
+		'''!
+		  @brief Converts several single-ended channels back to back.
+		  @n The config words come from the per-channel cache, and each conversion starts as soon as
+		  @n the previous result has been read.
+		  @param channels  the channels to convert, 0-3
+		  @return ScanResult(timestamp, voltages, codes), voltages maps each channel to mV and codes to
+		  @n (raw code, gain) for a lookup table (an oversampled code is rounded to the nearest integer)
+		'''
+		with self._lock:
+			voltages = {}
+			codes = {}
+			timestamp = time.time()
+			for channel in channels:
+				self.channel = channel
+				code, gain = self._read_code(channel, ADS1115_SINGLE_MUX)
+				voltages[channel] = int(float(code)*ADS1115_PGA_COEFFICIENTS.get(gain, 0.125))
+				codes[channel] = (int(round(code)), gain)
+			self._rearm_window(voltages)
+			return ScanResult(timestamp, voltages, codes)
+
+	def set_data_rate(self,channel,rate):
+		'''!
+		  @brief Sets the data rate used to convert a channel.
+		  @param channel  the Channel: 0-3
+		  @param rate  one of the ADS1115_REG_CONFIG_DR_* values (8 to 860 SPS)
+		'''
+		if rate not in ADS1115_DATA_RATES:
+			raise ValueError("Unknown ADS1115 data rate: 0x%02X" % rate)
+		self.data_rates[channel] = rate
+		self._config_cache.clear()
+
+	def set_channel_gain(self,channel,gain):
+		'''!
+		  @brief Sets the gain of one channel, overriding set_gain for it.
+		  @param channel  the Channel: 0-3
+		  @param gain  one of the ADS1115_REG_CONFIG_PGA_* values
+		'''
+		if gain not in ADS1115_PGA_COEFFICIENTS:
+			raise ValueError("Unknown ADS1115 gain: 0x%02X" % gain)
+		self.gains[channel] = gain
+		self._config_cache.clear()
+
+	def set_autorange(self,channel,enabled=True,gains=None):
+		'''!
+		  @brief Lets a channel pick its own gain.
+		  @n A reading that reaches ADS1115_AUTORANGE_HIGH of full scale is repeated with a wider range,
+		  @n and a reading that fits in ADS1115_AUTORANGE_LOW of a narrower range selects it for the next read.
+		  @param channel  the Channel: 0-3
+		  @param enabled  True to autorange, False to keep the current gain
+		  @param gains  the ADS1115_REG_CONFIG_PGA_* values the channel may use, all of them if None
+		'''
+		if enabled:
+			gains = ADS1115_PGA_ORDER if gains is None else gains
+			if any(gain not in ADS1115_PGA_COEFFICIENTS for gain in gains):
+				raise ValueError("Unknown ADS1115 gain in %s" % (gains,))
+			self.autorange[channel] = [gain for gain in ADS1115_PGA_ORDER if gain in gains]
+		else:
+			self.autorange.pop(channel, None)
+
+	def set_oversampling(self,channel,count,reduction=ADS1115_REDUCE_MEAN):
+		'''!
+		  @brief Averages several back-to-back conversions into each reading of a channel.
+		  @n The burst runs at the channel data rate, so pair it with a fast rate such as 860 SPS.
+		  @param channel  the Channel: 0-3
+		  @param count  number of conversions per reading, 1 disables oversampling
+		  @param reduction  ADS1115_REDUCE_MEAN, ADS1115_REDUCE_MEDIAN or ADS1115_REDUCE_TRIMMED_MEAN
+		'''
+		if count < 1:
+			raise ValueError("The oversampling count must be at least 1")
+		if reduction not in (ADS1115_REDUCE_MEAN, ADS1115_REDUCE_MEDIAN, ADS1115_REDUCE_TRIMMED_MEAN):
+			raise ValueError("Unknown reduction: %s" % reduction)
+		self.oversampling[channel] = (count, reduction)
+
+	def set_window_alarm(self,channel,low,high,alert_pin,callback,queue=ADS1115_REG_CONFIG_CQUE_1CONV,latch=True):
+		'''!
+		  @brief Arms the window comparator on a single-ended channel.
+		  @n The channel is converted continuously and ALERT/RDY asserts when the voltage leaves [low, high].
+		  @n Reads of any channel re-arm the comparator once they are done.
+		  @n After an alert the comparator stays disarmed, so an out-of-range value does not assert ALERT/RDY
+		  @n on every conversion, until a read of the channel finds it back in [low, high].
+		  @param channel  the Channel: 0-3
+		  @param low  lower bound of the window in mV
+		  @param high  upper bound of the window in mV
+		  @param alert_pin  BCM GPIO wired to ALERT/RDY
+		  @param callback  called as callback(channel, voltage) from the GPIO thread, voltage in mV
+		  @param queue  ADS1115_REG_CONFIG_CQUE_1CONV, _2CONV or _4CONV out-of-window conversions before asserting
+		  @param latch  keep ALERT/RDY asserted until the conversion register is read
+		'''
+		if queue == ADS1115_REG_CONFIG_CQUE_NONE:
+			raise ValueError("The window comparator needs an enabled comparator queue")
+		if low > high:
+			raise ValueError("The window lower bound is above the upper bound")
+		with self._lock:
+			if self.ready_mode == ADS1115_READY_ALERT:
+				raise ValueError("ALERT/RDY is already used to signal conversion-ready")
+			self.clear_window_alarm()
+			gain = self._channel_gain(channel)
+			coefficient = ADS1115_PGA_COEFFICIENTS.get(gain, 0.125)
+			self._write(ADS1115_REG_POINTER_LOWTHRESH, self._threshold_word(low, coefficient))
+			self._write(ADS1115_REG_POINTER_HITHRESH, self._threshold_word(high, coefficient))
+			clat = ADS1115_REG_CONFIG_CLAT_LATCH if latch else ADS1115_REG_CONFIG_CLAT_NONLAT
+			config = [ADS1115_SINGLE_MUX[channel] | gain | ADS1115_REG_CONFIG_MODE_CONTIN,
+				self._data_rate(channel) | ADS1115_REG_CONFIG_CMODE_WINDOW | ADS1115_REG_CONFIG_CPOL_ACTVLOW | clat | queue]
+			self._window = (channel, config, coefficient, alert_pin, callback)
+			self._window_bounds = (low, high)
+			self._window_tripped = False
+			GPIO.setup(alert_pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+			GPIO.add_event_detect(alert_pin, GPIO.FALLING, callback=self._on_window_alert)
+			self._rearm_window()
+
+	def clear_window_alarm(self):
+		'''!
+		  @brief Disarms the window comparator and powers the ADC down.
+		'''
+		with self._lock:
+			if self._window is None:
+				return
+			channel, config, coefficient, alert_pin, callback = self._window
+			self._window = None
+			GPIO.remove_event_detect(alert_pin)
+			self._write_config([config[0] | ADS1115_REG_CONFIG_MODE_SINGLE,
+				self._data_rate(channel) | ADS1115_REG_CONFIG_CQUE_NONE])
+
+	def _rearm_window(self,voltages=None):
+		# Reads reprogram the config register, so put the comparator back on its channel afterwards.
+		# voltages maps the channels just read to mV, a tripped comparator waits for its channel to be in range
+		if self._window is None:
+			return
+		channel = self._window[0]
+		if self._window_tripped:
+			low, high = self._window_bounds
+			if voltages is None or channel not in voltages or not low <= voltages[channel] <= high:
+				return
+			self._window_tripped = False
+		self.channel = channel
+		self._write_config(self._window[1])
+
+	def _threshold_word(self,voltage,coefficient):
+		code = max(-32768, min(32767, int(round(voltage / coefficient))))
+		return [(code >> 8) & 0xFF, code & 0xFF]
+
+	def _on_window_alert(self,pin):
+		with self._lock:
+			if self._window is None:
+				return
+			if self._window_tripped:
+				return
+			channel, config, coefficient, alert_pin, callback = self._window
+			# Reading the conversion register also releases a latched ALERT/RDY
+			voltage = int(float(self.read_raw())*coefficient)
+			# Disarm until the value is back in range (see _rearm_window), not one alert per conversion
+			self._window_tripped = True
+			self._write_config([config[0] | ADS1115_REG_CONFIG_MODE_SINGLE,
+				self._data_rate(channel) | ADS1115_REG_CONFIG_CQUE_NONE])
+		callback(channel, voltage)
+
+	def capture_waveform(self,channel,duration,rate=ADS1115_REG_CONFIG_DR_860SPS,size=None,raw=False):
+		'''!
+		  @brief Samples one single-ended channel in continuous mode and blocks until done.
+		  @param channel  the Channel: 0-3
+		  @param duration  capture length in seconds
+		  @param rate  one of the ADS1115_REG_CONFIG_DR_* values, 860 SPS by default
+		  @param size  ring buffer length in samples, defaults to the whole capture
+		  @param raw  True to return the buffered codes instead of the summary
+		  @return WaveformCapture.stats() or, with raw, WaveformCapture.samples()
+		'''
+		capture = WaveformCapture(self, channel, duration, rate, size)
+		capture.run()
+		return capture.samples() if raw else capture.stats()
+
+	def start_waveform_capture(self,channel,duration,rate=ADS1115_REG_CONFIG_DR_860SPS,size=None):
+		'''!
+		  @brief Same as capture_waveform, but samples from a background thread.
+		  @n Reads from other threads still work during the capture, each one leaving a gap in the waveform.
+		  @return the running WaveformCapture, join() it before reading the results
+		'''
+		capture = WaveformCapture(self, channel, duration, rate, size)
+		capture.start()
+		return capture
+
+	def _read_millivolts(self,channel,muxes):
+		# One reading of a channel in mV
+		code, gain = self._read_code(channel, muxes)
+		return int(float(code)*ADS1115_PGA_COEFFICIENTS.get(gain, 0.125))
+
+	def _read_code(self,channel,muxes):
+		# One (reduced) raw code of a channel and the gain it was taken with, moving to a wider range first
+		# if the code saturates
+		while True:
+			gain = self._channel_gain(channel)
+			gains = self.autorange.get(channel)
+			if gains is not None and gain not in gains:
+				self.set_channel_gain(channel, gains[0])
+				continue
+			code = self._acquire(self._config_word(channel, muxes[channel]))
+			if gains is None:
+				break
+			index = gains.index(gain)
+			if abs(code) >= ADS1115_AUTORANGE_HIGH * 32767 and index > 0:
+				self.set_channel_gain(channel, gains[index - 1])
+				continue
+			voltage = abs(code) * ADS1115_PGA_COEFFICIENTS[gain]
+			for narrower in reversed(gains[index + 1:]):
+				if voltage < ADS1115_AUTORANGE_LOW * 32767 * ADS1115_PGA_COEFFICIENTS[narrower]:
+					self.set_channel_gain(channel, narrower)
+					break
+			break
+		return code, gain
+
+	def _acquire(self,config):
+		# Runs the configured burst of conversions on the current channel and reduces it to one raw code
+		count, reduction = self.oversampling.get(self.channel, (1, ADS1115_REDUCE_MEAN))
+		codes = []
+		for i in range(count):
+			if self._write_config(config):
+				self.wait_conversion()
+			elif i > 0:
+				# Unchanged continuous conversion: the next result is one conversion period away
+				time.sleep(1.0 / ADS1115_DATA_RATES[self._data_rate(self.channel)])
+			codes.append(self.read_raw())
+		if count == 1:
+			return codes[0]
+		if reduction == ADS1115_REDUCE_MEDIAN:
+			return statistics.median(codes)
+		if reduction == ADS1115_REDUCE_TRIMMED_MEAN:
+			trim = int(count * ADS1115_TRIM_FRACTION)
+			codes = sorted(codes)[trim:count - trim]
+		return statistics.fmean(codes)
+
+	def _write(self,register,data):
+		# The bus lock is only held per transaction, so other ADCs can use the bus during a conversion
+		with self.bus_lock:
+			self.bus.write_i2c_block_data(self.addr, register, data)
+
+	def _read(self,register,length):
+		with self.bus_lock:
+			return self.bus.read_i2c_block_data(self.addr, register, length)
+
+	def _write_config(self,config):
+		# Single-shot conversions are started by writing the OS bit, but in continuous mode the
+		# device keeps converting with the last config, so writing the same word again is skipped
+		if config == self._last_config and self._conversion_mode() == ADS1115_REG_CONFIG_MODE_CONTIN:
+			return False
+		self._ready.clear()
+		self._write(ADS1115_REG_POINTER_CONFIG, config)
+		self._last_config = config
+		return True
+
+	def _data_rate(self,channel):
+		return self.data_rates.get(channel, ADS1115_REG_CONFIG_DR_128SPS)
+
+	def _channel_gain(self,channel):
+		return self.gains.get(channel, self.gain)
+
+	def _config_word(self,channel,mux):
+		key = (channel, mux)
+		if key not in self._config_cache:
+			self._config_cache[key] = [ADS1115_REG_CONFIG_OS_SINGLE | mux | self._channel_gain(channel) | self._conversion_mode(),
+				self._data_rate(channel) | self._comparator_queue()]
+		return self._config_cache[key]
+
+	def _conversion_mode(self):
+		# The OS bit only reports completion in power-down single-shot mode
+		if self.ready_mode == ADS1115_READY_SLEEP:
+			return ADS1115_REG_CONFIG_MODE_CONTIN
+		return ADS1115_REG_CONFIG_MODE_SINGLE
+
+	def _comparator_queue(self):
+		# ALERT/RDY stays high unless the comparator queue is enabled
+		if self.ready_mode == ADS1115_READY_ALERT:
+			return ADS1115_REG_CONFIG_CQUE_1CONV
+		return ADS1115_REG_CONFIG_CQUE_NONE
+
+	def _on_alert(self,channel):
+		self._ready.set()
+
+
+class WaveformCapture():
+	'''!
+	  @brief Continuous-conversion capture of one ADS1115 channel into a preallocated ring buffer.
+	'''
+	def __init__(self,adc,channel,duration,rate=ADS1115_REG_CONFIG_DR_860SPS,size=None):
+		if rate not in ADS1115_DATA_RATES:
+			raise ValueError("Unknown ADS1115 data rate: 0x%02X" % rate)
+		self.adc = adc
+		self.channel = channel
+		self.period = 1.0 / ADS1115_DATA_RATES[rate]
+		self.total = max(1, int(round(duration * ADS1115_DATA_RATES[rate])))
+		self.size = min(size or self.total, self.total)
+		gain = adc._channel_gain(channel)
+		self.coefficient = ADS1115_PGA_COEFFICIENTS.get(gain, 0.125)
+		self.config = [ADS1115_SINGLE_MUX[channel] | gain | ADS1115_REG_CONFIG_MODE_CONTIN,
+			rate | ADS1115_REG_CONFIG_CQUE_NONE]
+		self.buffer = array('h', bytes(2 * self.size))
+		## Samples taken so far
+		self.count = 0
+		## Times another read re-muxed the ADC, so the capture had to reprogram it
+		self.gaps = 0
+		## Sample periods skipped because the loop fell behind
+		self.missed = 0
+		self._min = 32767
+		self._max = -32768
+		self._sum = 0
+		self._sum_squares = 0
+		self._thread = None
+		self._stop = threading.Event()
+
+	def start(self):
+		'''!
+		  @brief Runs the capture in a daemon thread.
+		'''
+		self._thread = threading.Thread(target=self.run, daemon=True)
+		self._thread.start()
+
+	def stop(self):
+		'''!
+		  @brief Ends a running capture early.
+		'''
+		self._stop.set()
+
+	def join(self,timeout=None):
+		'''!
+		  @brief Waits for a capture started with start().
+		  @return True if the capture has finished
+		'''
+		if self._thread is not None:
+			self._thread.join(timeout)
+			return not self._thread.is_alive()
+		return True
+
+	def run(self):
+		'''!
+		  @brief Captures in the calling thread until the duration is covered or stop() is called.
+		'''
+		adc = self.adc
+		deadline = time.perf_counter()
+		while self.count < self.total and not self._stop.is_set():
+			with adc._lock:
+				if adc._last_config != self.config:
+					if self.count:
+						self.gaps += 1
+					adc._ready.clear()
+					adc._write(ADS1115_REG_POINTER_CONFIG, self.config)
+					adc._last_config = self.config
+					# The first result with the new mux is one conversion away
+					time.sleep(self.period)
+					deadline = time.perf_counter()
+				code = adc.read_raw()
+			self._add(code)
+			deadline += self.period
+			delay = deadline - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+			elif delay < -self.period:
+				self.missed += int(-delay / self.period)
+				deadline = time.perf_counter()
+		with adc._lock:
+			adc._rearm_window()
+
+	def samples(self):
+		'''!
+		  @brief The buffered codes in chronological order, the last size samples of the capture.
+		  @return array of signed 16-bit codes
+		'''
+		if self.count <= self.size:
+			return self.buffer[:self.count]
+		start = self.count % self.size
+		return self.buffer[start:] + self.buffer[:start]
+
+	def stats(self):
+		'''!
+		  @brief Summary of every sample taken, in mV.
+		  @return dict with count, mean, min, max, peak_to_peak, stdev, gaps and missed
+		'''
+		if not self.count:
+			return {'count': 0, 'mean': None, 'min': None, 'max': None, 'peak_to_peak': None,
+				'stdev': None, 'gaps': self.gaps, 'missed': self.missed}
+		mean = self._sum / self.count
+		variance = max(0.0, self._sum_squares / self.count - mean * mean)
+		return {
+			'count': self.count,
+			'mean': mean * self.coefficient,
+			'min': self._min * self.coefficient,
+			'max': self._max * self.coefficient,
+			'peak_to_peak': (self._max - self._min) * self.coefficient,
+			'stdev': math.sqrt(variance) * self.coefficient,
+			'gaps': self.gaps,
+			'missed': self.missed,
+		}
+
+	def _add(self,code):
+		code = max(-32768, min(32767, code))
+		self.buffer[self.count % self.size] = code
+		self.count += 1
+		self._min = min(self._min, code)
+		self._max = max(self._max, code)
+		self._sum += code
+		self._sum_squares += code * code
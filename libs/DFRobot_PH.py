@@ -8,28 +8,139 @@
   @url https://github.com/DFRobot/DFRobot_PH
 '''
 
-import time
+import os
 import sys
+import tempfile
+
+## Temperature (Celsius) the buffer solutions are calibrated at
+PH_CALIBRATION_TEMPERATURE	= 25.0
+## Absolute zero (Celsius)
+PH_ABSOLUTE_ZERO	= -273.15
+## Isopotential point of the electrode: its voltage does not depend on the temperature at this pH
+PH_ISOPOTENTIAL	= 7.0
+## Default calibration data (mV)
+PH_DEFAULT_NEUTRAL_VOLTAGE	= 1500.0
+PH_DEFAULT_ACID_VOLTAGE	= 2032.44
+
+class PHCalibration():
+	'''!
+	  @brief   Two point (pH 7.0 and pH 4.0) calibration of the pH probe.
+	  @note Slope and intercept are computed once, when the calibration data changes.
+	'''
+	def __init__(self,neutralVoltage=PH_DEFAULT_NEUTRAL_VOLTAGE,acidVoltage=PH_DEFAULT_ACID_VOLTAGE):
+		self.set(neutralVoltage,acidVoltage)
+
+	def set(self,neutralVoltage,acidVoltage):
+		'''!
+		  @brief   Set the calibration data and precompute the conversion coefficients.
+		  @param neutralVoltage   Probe voltage in the pH 7.0 buffer solution
+		  @param acidVoltage      Probe voltage in the pH 4.0 buffer solution
+		'''
+		if neutralVoltage == acidVoltage:
+			raise ValueError("neutralVoltage and acidVoltage must differ")
+		self.neutralVoltage = float(neutralVoltage)
+		self.acidVoltage    = float(acidVoltage)
+		# pH = slope*(voltage-1500.0)/3.0+intercept, folded into pH = _gain*voltage+_offset
+		slope        = (7.0-4.0)/((self.neutralVoltage-1500.0)/3.0 - (self.acidVoltage-1500.0)/3.0)
+		intercept    = 7.0 - slope*(self.neutralVoltage-1500.0)/3.0
+		self._gain   = slope/3.0
+		self._offset = intercept - slope*1500.0/3.0
+
+	def get(self):
+		'''!
+		  @brief   Get the calibration data.
+		  @return  (neutralVoltage, acidVoltage)
+		'''
+		return (self.neutralVoltage, self.acidVoltage)
+
+	def temperature_factor(self,temperature):
+		'''!
+		  @brief   Nernst compensation factor: the electrode slope is proportional to the absolute temperature.
+		  @param temperature   Solution temperature (Celsius), None for the calibration temperature
+		  @return  Factor applied to the distance from the isopotential point
+		'''
+		if temperature is None:
+			return 1.0
+		return (PH_CALIBRATION_TEMPERATURE-PH_ABSOLUTE_ZERO)/(temperature-PH_ABSOLUTE_ZERO)
+
+	def compensate(self,ph,temperature):
+		'''!
+		  @brief   Compensate a pH value computed at the calibration temperature.
+		  @param ph            PH value at the calibration temperature
+		  @param temperature   Solution temperature (Celsius), None for the calibration temperature
+		  @return  The PH value at temperature
+		'''
+		if temperature is None:
+			return ph
+		return PH_ISOPOTENTIAL + (ph-PH_ISOPOTENTIAL)*self.temperature_factor(temperature)
+
+	def to_PH(self,voltage,temperature=None):
+		'''!
+		  @brief   Convert voltage to PH with temperature compensation.
+		  @param voltage       Voltage value
+		  @param temperature   Solution temperature (Celsius), None for the calibration temperature
+		  @return  The PH value
+		'''
+		return self.compensate(self._gain*voltage+self._offset,temperature)
+
+	def to_voltage(self,ph,temperature=None):
+		'''!
+		  @brief   Convert a PH value back to the probe voltage, the inverse of to_PH.
+		  @param ph            PH value
+		  @param temperature   Solution temperature (Celsius), None for the calibration temperature
+		  @return  Voltage value
+		'''
+		ph = PH_ISOPOTENTIAL + (ph-PH_ISOPOTENTIAL)/self.temperature_factor(temperature)
+		return (ph-self._offset)/self._gain
+
+	@classmethod
+	def load(cls,path):
+		'''!
+		  @brief   Read the calibration data from a file of key=value lines.
+		  @param path   File path
+		  @return  The calibration
+		'''
+		values = {}
+		with open(path,'r') as f:
+			for line in f:
+				key,sep,value = line.partition('=')
+				if sep:
+					values[key.strip()] = value.strip()
+		try:
+			return cls(float(values['neutralVoltage']),float(values['acidVoltage']))
+		except KeyError as e:
+			raise ValueError("%s: missing %s" % (path,e)) from e
+
+	def save(self,path):
+		'''!
+		  @brief   Write the calibration data to a file, atomically: readers see the old or the new data, never a mix.
+		  @param path   File path
+		'''
+		directory = os.path.dirname(os.path.abspath(path))
+		fd,tmp_path = tempfile.mkstemp(dir=directory,prefix='.phdata.',suffix='.tmp')
+		try:
+			with os.fdopen(fd,'w') as f:
+				f.write('neutralVoltage='+ str(self.neutralVoltage) + '\n')
+				f.write('acidVoltage='+ str(self.acidVoltage) + '\n')
+				f.flush()
+				os.fsync(f.fileno())
+			os.replace(tmp_path,path)
+		except BaseException:
+			os.unlink(tmp_path)
+			raise
 
-_temperature      = 25.0
-_acidVoltage      = 2032.44
-_neutralVoltage   = 1500.0
 class DFRobot_PH():
+	def __init__(self,path='phdata.txt'):
+		self.path = path
+		# PHCalibration of this sensor, loaded from path by begin() (calibration() is the buffer procedure)
+		self._calibration = PHCalibration()
 	def begin(self):
 		'''!
           @brief   Initialization The Analog pH Sensor.
         '''
-		global _acidVoltage
-		global _neutralVoltage
 		try:
-			with open('phdata.txt','r') as f:
-				neutralVoltageLine = f.readline()
-				neutralVoltageLine = neutralVoltageLine.strip('neutralVoltage=')
-				_neutralVoltage    = float(neutralVoltageLine)
-				acidVoltageLine    = f.readline()
-				acidVoltageLine    = acidVoltageLine.strip('acidVoltage=')
-				_acidVoltage       = float(acidVoltageLine)
-		except :
+			self._calibration = PHCalibration.load(self.path)
+		except (OSError,ValueError):
 			print("phdata.txt ERROR ! Please run DFRobot_PH_Reset")
 			sys.exit(1)
 	def read_PH(self,voltage,temperature):
@@ -37,65 +148,55 @@ class DFRobot_PH():
           @brief   Convert voltage to PH with temperature compensation.
 		  @note voltage to pH value, with temperature compensation
           @param voltage       Voltage value
-		  @param temperature   Ambient temperature
+		  @param temperature   Solution temperature (Celsius), None for 25.0
+          @return  The PH value
+        '''
+		return self._calibration.to_PH(voltage,temperature)
+	def PH_to_voltage(self,ph,temperature=None):
+		'''!
+          @brief   Convert a PH value back to the probe voltage, the inverse of read_PH.
+          @param ph   PH value
+		  @param temperature   Solution temperature (Celsius), None for 25.0
+          @return  Voltage value
+        '''
+		return self._calibration.to_voltage(ph,temperature)
+	def compensate_PH(self,ph,temperature):
+		'''!
+          @brief   Apply the temperature compensation to a PH value read at 25.0.
+          @param ph            PH value from read_PH(voltage, None)
+		  @param temperature   Solution temperature (Celsius), None for 25.0
           @return  The PH value
         '''
-		global _acidVoltage
-		global _neutralVoltage
-		slope     = (7.0-4.0)/((_neutralVoltage-1500.0)/3.0 - (_acidVoltage-1500.0)/3.0)
-		intercept = 7.0 - slope*(_neutralVoltage-1500.0)/3.0
-		_phValue  = slope*(voltage-1500.0)/3.0+intercept
-		round(_phValue,2)
-		return _phValue
+		return self._calibration.compensate(ph,temperature)
+	def get_calibration(self):
+		'''!
+          @brief   Get the calibration data in use.
+          @return  (neutralVoltage, acidVoltage)
+        '''
+		return self._calibration.get()
 	def calibration(self,voltage):
 		'''!
           @brief   Calibrate the calibration data.
           @param voltage       Voltage value
         '''
+		neutralVoltage,acidVoltage = self._calibration.get()
 		if (voltage>1322 and voltage<1678):
 			print(">>>Buffer Solution:7.0")
-			f=open('phdata.txt','r+')
-			flist=f.readlines()
-			flist[0]='neutralVoltage='+ str(voltage) + '\n'
-			f=open('phdata.txt','w+')
-			f.writelines(flist)
-			f.close()
-			print(">>>PH:7.0 Calibration completed,Please enter Ctrl+C exit calibration in 5 seconds")
-			time.sleep(5.0)
+			self._save(voltage,acidVoltage)
+			print(">>>PH:7.0 Calibration completed,Please enter Ctrl+C exit calibration")
 		elif (voltage>1854 and voltage<2210):
 			print(">>>Buffer Solution:4.0")
-			f=open('phdata.txt','r+')
-			flist=f.readlines()
-			flist[1]='acidVoltage='+ str(voltage) + '\n'
-			f=open('phdata.txt','w+')
-			f.writelines(flist)
-			f.close()
-			print(">>>PH:4.0 Calibration completed,Please enter Ctrl+C exit calibration in 5 seconds")
-			time.sleep(5.0)
+			self._save(neutralVoltage,voltage)
+			print(">>>PH:4.0 Calibration completed,Please enter Ctrl+C exit calibration")
 		else:
 			print(">>>Buffer Solution Error Try Again<<<")
 	def reset(self):
 		'''!
           @brief   Reset the calibration data to default value.
         '''
-		
-		_acidVoltage    = 2032.44
-		_neutralVoltage = 1500.0
-		try:
-			f=open('phdata.txt','r+')
-			flist=f.readlines()
-			flist[0]='neutralVoltage='+ str(_neutralVoltage) + '\n'
-			flist[1]='acidVoltage='+ str(_acidVoltage) + '\n'
-			f=open('phdata.txt','w+')
-			f.writelines(flist)
-			f.close()
-			print(">>>Reset to default parameters<<<")
-		except:
-			f=open('phdata.txt','w')
-			#flist=f.readlines()
-			flist   ='neutralVoltage='+ str(_neutralVoltage) + '\n'
-			flist  +='acidVoltage='+ str(_acidVoltage) + '\n'
-			#f=open('data.txt','w+')
-			f.writelines(flist)
-			f.close()
-			print(">>>Reset to default parameters<<<")
\ No newline at end of file
+		self._save(PH_DEFAULT_NEUTRAL_VOLTAGE,PH_DEFAULT_ACID_VOLTAGE)
+		print(">>>Reset to default parameters<<<")
+	def _save(self,neutralVoltage,acidVoltage):
+		calibration = PHCalibration(neutralVoltage,acidVoltage)
+		calibration.save(self.path)
+		self._calibration = calibration
@@ -0,0 +1,78 @@
+import glob
+import os
+import threading
+import time
+
+
+# See https://www.kernel.org/doc/Documentation/devicetree/bindings/iio/humidity/dht11.txt
+# Enable the driver with "dtoverlay=dht11,gpiopin=26" in /boot/config.txt
+class DHT11_IIO:
+	# The DHT11 must not be read more than once every 2 seconds
+	MIN_INTERVAL = 2.0
+
+	def __init__(self, base_dir='/sys/bus/iio/devices/', min_interval=MIN_INTERVAL, max_age=10.0):
+		self.device_dir = None
+		self.min_interval = min_interval
+		self.max_age = max_age
+		self._last_valid_result = (None, None)
+		self._lock = threading.Lock()
+		self._last_read_time = None
+		self._last_result = (None, None)
+		self._last_valid_time = None
+
+		for device_dir in sorted(glob.glob(os.path.join(base_dir, 'iio:device*'))):
+			try:
+				with open(os.path.join(device_dir, 'name'), 'r') as f:
+					if f.read().strip() == 'dht11':
+						self.device_dir = device_dir
+						break
+			except OSError:
+				continue
+
+	def is_available(self) -> bool:
+		return self.device_dir is not None
+
+	def __read_attribute(self, attribute) -> float:
+		# Values are exported in milli-units: milli-percent and milli-degrees Celsius
+		with open(os.path.join(self.device_dir, attribute), 'r') as f:
+			return int(f.read()) / 1000.0
+
+	def read(self) -> tuple:
+		"""
+		Read humidity and temperature, returning the cached values if the sensor was read less
+		than min_interval seconds ago.
+
+		If the sensor fails, the last valid reading is returned as long as it is not older than
+		max_age seconds.
+
+		:return: (humidity, temperature), like Adafruit_DHT.read_retry. (None, None) if the sensor
+		         could not be read and there is no recent enough valid reading.
+		"""
+		if self.device_dir is None:
+			return None, None
+		with self._lock:
+			now = time.monotonic()
+			if self._last_read_time is not None and now - self._last_read_time < self.min_interval:
+				return self._last_result
+			self._last_read_time = now
+			try:
+				# The driver fails with EIO on checksum errors and ETIMEDOUT if the sensor does not answer
+				humidity = self.__read_attribute('in_humidityrelative_input')
+				temperature = self.__read_attribute('in_temp_input')
+			except (OSError, ValueError):
+				if self._last_valid_time is not None and now - self._last_valid_time <= self.max_age:
+					self._last_result = self._last_valid_result
+				else:
+					self._last_result = (None, None)
+				return self._last_result
+			self._last_result = self._last_valid_result = (humidity, temperature)
+			self._last_valid_time = now
+			return self._last_result
+
+	def get_age(self) -> float:
+		"""
+		:return: Seconds since the last valid reading, None if there is none.
+		"""
+		if self._last_valid_time is None:
+			return None
+		return time.monotonic() - self._last_valid_time
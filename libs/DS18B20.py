@@ -1,30 +1,75 @@
 import glob
+import os
+import threading
 import time
+from DS18B20Error import DS18B20Error
+
+## Supported resolutions (bits) and their conversion time (s)
+DS18B20_CONVERSION_TIMES = {9: 0.094, 10: 0.188, 11: 0.375, 12: 0.75}
 
 
 # See https://learn.adafruit.com/adafruits-raspberry-pi-lesson-11-ds18b20-temperature-sensing/software
 class DS18B20:
-	def __init__(self):
+	def __init__(self, base_dir='/sys/bus/w1/devices/', max_retries=10, timeout=2.0, master='w1_bus_master1'):
+		self.base_dir = base_dir
+		self.bulk_read_file = os.path.join(base_dir, master, 'therm_bulk_read')
+		self.device_file = None
+		self.max_retries = max_retries
+		self.timeout = timeout
+		self._files = {}
+		# The sampler thread and the callers of read_temp() share the open files
+		self._files_lock = threading.RLock()
+
+		# Background sampler state
+		self._latest = {}
+		self._latest_lock = threading.Lock()
+		self._sampler = None
+		self._stop_sampler = threading.Event()
+
+		# Every probe on the bus, the first one is the default
+		self.device_ids = sorted(os.path.basename(folder) for folder in glob.glob(base_dir + '28*'))
 		# This will only work on Raspberry Pi (that's why I'm using this try block)
 		try:
-			base_dir = '/sys/bus/w1/devices/'
-			device_folder = glob.glob(base_dir + '28*')[0]
-			self.device_file = device_folder + '/w1_slave'
+			self.device_file = self.__device_file(self.device_ids[0])
 		except IndexError:
 			pass
 			# print("No DS18B20 found")
 
-	def __read_temp_raw(self) -> list[str]:
-		f = open(self.device_file, 'r')
-		lines = f.readlines()
-		f.close()
-		return lines
+	def __device_file(self, device_id) -> str:
+		return os.path.join(self.base_dir, device_id, 'w1_slave')
 
-	def read_temp(self) -> float:
-		lines = self.__read_temp_raw()
-		while lines[0].strip()[-3:] != 'YES':
+	def __read_temp_raw(self, device_id) -> list[str]:
+		if device_id is None:
+			raise DS18B20Error("No DS18B20 found")
+		# Keep the sysfs file open: seeking back to the start makes the driver take a new reading
+		with self._files_lock:
+			try:
+				if device_id not in self._files:
+					self._files[device_id] = open(self.__device_file(device_id), 'r')
+				f = self._files[device_id]
+				f.seek(0)
+				return f.readlines()
+			except OSError as e:
+				self.__close_file(device_id)
+				raise DS18B20Error("Failed to read from DS18B20 %s: %s" % (device_id, e)) from e
+
+	def read_temp(self, device_id=None) -> float:
+		'''
+		Read one probe, the first one found if device_id is None.
+
+		Raises DS18B20Error if there is no valid reading after max_retries attempts or timeout seconds.
+		'''
+		if device_id is None:
+			device_id = self.device_ids[0] if self.device_ids else None
+		deadline = time.monotonic() + self.timeout
+		retries = 0
+		lines = self.__read_temp_raw(device_id)
+		while not lines or lines[0].strip()[-3:] != 'YES':
+			retries += 1
+			if retries > self.max_retries or time.monotonic() + 0.2 > deadline:
+				raise DS18B20Error("No valid DS18B20 reading after %d retries" % (retries - 1))
 			time.sleep(0.2)
-			lines = self.__read_temp_raw()
+			lines = self.__read_temp_raw(device_id)
 		equals_pos = lines[1].find('t=')
 		if equals_pos != -1:
 			temp_string = lines[1][equals_pos + 2:]
@@ -32,3 +77,122 @@ class DS18B20:
 			return temp_c
 			# temp_f = temp_c * 9.0 / 5.0 + 32.0
 			# return temp_c, temp_f
+
+	def read_all(self) -> dict:
+		'''
+		Read every probe on the bus.
+
+		All probes convert in parallel through the bus master's therm_bulk_read, so this takes one
+		conversion time instead of one per probe. Kernels without bulk read fall back to reading
+		the probes one after the other.
+
+		Returns a dict of temperatures by device id, None for the probes that could not be read.
+		'''
+		self.__bulk_convert()
+		temperatures = {}
+		for device_id in self.device_ids:
+			try:
+				temperatures[device_id] = self.read_temp(device_id)
+			except DS18B20Error:
+				temperatures[device_id] = None
+		return temperatures
+
+	def __bulk_convert(self) -> bool:
+		if len(self.device_ids) < 2 or not os.path.exists(self.bulk_read_file):
+			return False
+		try:
+			with open(self.bulk_read_file, 'w') as f:
+				f.write('trigger\n')
+			# -1 while at least one probe is still converting
+			deadline = time.monotonic() + self.timeout
+			while True:
+				with open(self.bulk_read_file, 'r') as f:
+					if f.read().strip() != '-1':
+						return True
+				if time.monotonic() > deadline:
+					raise DS18B20Error("Bulk conversion did not complete in %.1f s" % self.timeout)
+				time.sleep(0.01)
+		except OSError as e:
+			raise DS18B20Error("Failed to start the bulk conversion: %s" % e) from e
+
+	def set_resolution(self, bits, device_id=None) -> None:
+		'''
+		Set the resolution (9 to 12 bits) of one probe, of every probe if device_id is None.
+
+		Lower resolutions convert faster: 94 ms at 9 bits (0.5°C steps) against 750 ms at 12 bits (0.0625°C steps).
+		'''
+		if bits not in DS18B20_CONVERSION_TIMES:
+			raise ValueError("Unsupported DS18B20 resolution: %s bits" % bits)
+		for device in ([device_id] if device_id is not None else self.device_ids):
+			try:
+				with open(os.path.join(self.base_dir, device, 'resolution'), 'w') as f:
+					f.write('%d\n' % bits)
+			except OSError as e:
+				raise DS18B20Error("Failed to set the resolution of DS18B20 %s: %s" % (device, e)) from e
+
+	def get_resolution(self, device_id=None) -> int:
+		if device_id is None:
+			device_id = self.device_ids[0] if self.device_ids else None
+		if device_id is None:
+			raise DS18B20Error("No DS18B20 found")
+		try:
+			with open(os.path.join(self.base_dir, device_id, 'resolution'), 'r') as f:
+				return int(f.read())
+		except (OSError, ValueError) as e:
+			raise DS18B20Error("Failed to read the resolution of DS18B20 %s: %s" % (device_id, e)) from e
+
+	def __close_file(self, device_id) -> None:
+		with self._files_lock:
+			f = self._files.pop(device_id, None)
+			if f is not None:
+				f.close()
+
+	def close(self) -> None:
+		with self._files_lock:
+			for device_id in list(self._files):
+				self.__close_file(device_id)
+
+	def start_sampler(self, interval=5.0) -> None:
+		"""
+		Read every probe every interval seconds in a background thread.
+
+		The latest valid reading of each probe and its timestamp are available through get_latest().
+		"""
+		if self._sampler is not None and self._sampler.is_alive():
+			return
+		self._stop_sampler.clear()
+		self._sampler = threading.Thread(target=self.__sample, args=(interval,), daemon=True)
+		self._sampler.start()
+
+	def stop_sampler(self) -> None:
+		self._stop_sampler.set()
+		if self._sampler is not None:
+			self._sampler.join()
+			self._sampler = None
+
+	def is_sampling(self) -> bool:
+		return self._sampler is not None and self._sampler.is_alive()
+
+	def get_latest(self, device_id=None) -> tuple:
+		"""
+		:return: (temperature, timestamp) of the latest valid reading of a probe (the first one if
+		         device_id is None), (None, None) before the first one.
+		"""
+		if device_id is None:
+			device_id = self.device_ids[0] if self.device_ids else None
+		with self._latest_lock:
+			return self._latest.get(device_id, (None, None))
+
+	def __sample(self, interval) -> None:
+		while not self._stop_sampler.is_set():
+			try:
+				temperatures = self.read_all()
+			except DS18B20Error:
+				temperatures = {}
+			timestamp = time.time()
+			with self._latest_lock:
+				for device_id, temperature in temperatures.items():
+					# Keep the previous reading on errors, its timestamp shows how stale it is
+					if temperature is not None:
+						self._latest[device_id] = (temperature, timestamp)
+			self._stop_sampler.wait(interval)
@@ -9,15 +9,22 @@ try:
 except ImportError:
     import mock.smbus as smbus
 import time
+import threading
+from contextlib import contextmanager
 class PCF8574_I2C(object):
     OUPUT = 0
     INPUT = 1
+    BLOCK_SIZE = 33 # Command byte + 32 data bytes (SMBus block limit)
     
     def __init__(self,address):
         # Note you need to change the bus number to 0 if running on a revision 1 Raspberry Pi.
         self.bus = smbus.SMBus(1)
         self.address = address
         self.currentValue = 0
+        self.busValue = None # Last value written to the bus
+        self.batchDepth = 0
+        self.batchLock = threading.RLock() # A batch belongs to one thread, others wait for it to be written
+        self.pendingValues = [] # Sequences gathered by an open batch
         self.writeByte(0)   #I2C test.
         
     def readByte(self):#Read PCF8574 all port of the data
@@ -26,8 +33,49 @@ class PCF8574_I2C(object):
         
     def writeByte(self,value):#Write data to PCF8574 port
         self.currentValue = value
+        if self.batchDepth:
+            return
+        self.busValue = value
         self.bus.write_byte(self.address,value)
 
+    def writeBytes(self,values):#Write a sequence of port values, as few I2C transactions as possible
+        if not values:
+            return
+        self.currentValue = values[-1]
+        if self.batchDepth:
+            self.pendingValues.extend(values)
+            return
+        self.sendBlocks(values)
+
+    def sendBlocks(self,values):
+        # The PCF8574 latches every byte of a write, the "command" byte is just the first port value
+        for i in range(0,len(values),self.BLOCK_SIZE):
+            block = values[i:i+self.BLOCK_SIZE]
+            self.bus.write_i2c_block_data(self.address,block[0],list(block[1:]))
+        self.busValue = values[-1]
+
+    @contextmanager
+    def batch(self):#Gather port changes, write them on exit of the outermost batch
+        with self.batchLock:
+            self.batchDepth += 1
+            try:
+                yield self
+            finally:
+                self.batchDepth -= 1
+                if not self.batchDepth:
+                    self.flush()
+
+    def flush(self):#Write the gathered changes, nothing if the port value is unchanged
+        values = self.pendingValues
+        self.pendingValues = []
+        if values and values[-1] != self.currentValue:
+            values.append(self.currentValue)
+        if values:
+            self.sendBlocks(values)
+        elif self.currentValue != self.busValue:
+            self.busValue = self.currentValue
+            self.bus.write_byte(self.address,self.currentValue)
+
     def digitalRead(self,pin):#Read PCF8574 one port of the data
         value = readByte()  
         return (value&(1<<pin)==(1<<pin)) and 1 or 0
@@ -68,6 +116,12 @@ class PCF8574_GPIO(object):#Standardization function interface
         return self.chip.digitalRead(pin)
     def output(self,pin,value):#Write data to PCF8574 one port
         self.chip.digitalWrite(pin,value)
+    def readPort(self):#Current value of all the ports
+        return self.chip.readByte()
+    def outputSequence(self,values):#Write a sequence of values to all the ports in one burst
+        self.chip.writeBytes(values)
+    def batch(self):#with pcf.batch(): several outputs, at most one write on exit
+        return self.chip.batch()
         
 def destroy():
     bus.close()
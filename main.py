@@ -2,6 +2,7 @@ try:
 	import RPi.GPIO as GPIO
 except ImportError:
 	import mock.GPIO as GPIO
+import sys
 import time
 from datetime import datetime
 from EmbeddedPool import EmbeddedPool
@@ -9,31 +10,51 @@ from EmbeddedPool import EmbeddedPool
 embedded_system = EmbeddedPool("Info")
 
 
-def loop():
+def loop(low_power=False, adaptive=False):
 	check_interval = 5  # seconds
 	last_check_time = datetime.now()
 
-	embedded_system.check_water_temperature()
-	embedded_system.check_humidity_and_environment_temperature()
+	embedded_system.safe_check("check_water_temperature")
+	embedded_system.safe_check("check_humidity_and_environment_temperature")
+	embedded_system.enable_water_level_interrupts()
+	embedded_system.start_lcd_renderer()  # The buttons and the loop only post LCD updates from now on
+
+	if low_power:
+		embedded_system.enable_low_power_mode()
+	else:
+		embedded_system.start_water_temperature_sampler()
+		embedded_system.start_dht_worker()
+	if adaptive:
+		embedded_system.enable_adaptive_sampling()
 
 	while True:
 		current_time = datetime.now()
+		acquisition_start_time = time.monotonic()
 
-		# Read sensors
-		if (current_time - last_check_time).seconds >= check_interval:
-			embedded_system.check_water_temperature()
-			embedded_system.check_humidity_and_environment_temperature()
+		# Read sensors (a failing sensor is skipped for a while instead of stopping the loop)
+		if low_power or (current_time - last_check_time).seconds >= check_interval:
+			embedded_system.safe_check("check_water_temperature")
+			embedded_system.safe_check("check_humidity_and_environment_temperature")
 			last_check_time = current_time
-		embedded_system.check_water_ph()
-		embedded_system.check_orp()
-		embedded_system.check_turbidity()
-		embedded_system.check_environment_light_level()
-		embedded_system.check_water_level()
+		if adaptive:
+			embedded_system.run_adaptive_checks()
+		else:
+			embedded_system.check_analog_sensors()  # One circuit breaker per probe
+		embedded_system.safe_check("check_water_level")
+
+		# Act, only on the values that changed
+		changed = embedded_system.detect_changes()
+		if "humidity" in changed:
+			embedded_system.control_windows()
+		if "environment_light" in changed:
+			embedded_system.control_led()
+		embedded_system.lcd_update(changed)
 
-		# Act
-		embedded_system.control_windows()
-		embedded_system.control_led()
-		embedded_system.lcd_update()
+		if low_power:
+			embedded_system.idle_until_next_acquisition(acquisition_start_time)
+		elif adaptive:
+			# Nothing to do until the next sensor is due (the water level and the buttons are interrupt driven)
+			time.sleep(min(embedded_system.time_until_next_adaptive_check(), check_interval))
 
 		print("\n")
 
@@ -41,6 +62,6 @@ def loop():
 if __name__ == '__main__':
 	try:
 		embedded_system.turn_on_lcd_backlight()
-		loop()
+		loop(low_power="--low-power" in sys.argv, adaptive="--adaptive" in sys.argv)
 	except KeyboardInterrupt:
 		embedded_system.turn_off()
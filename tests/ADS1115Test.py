@@ -0,0 +1,409 @@
+try:
+    import RPi.GPIO as GPIO
+except ImportError:
+    import mock.GPIO as GPIO
+import threading
+import unittest
+from unittest.mock import Mock, call, patch
+from libs import DFRobot_ADS1115
+from libs.DFRobot_ADS1115 import ADS1115, ADS1115_READY_SLEEP, ADS1115_READY_POLL, ADS1115_READY_ALERT
+from libs.DFRobot_ADS1115 import ADS1115_REG_POINTER_CONFIG, ADS1115_REG_POINTER_CONVERT, open_bus
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_DR_128SPS, ADS1115_REG_CONFIG_DR_860SPS
+from libs.DFRobot_ADS1115 import ADS1115_REDUCE_MEAN, ADS1115_REDUCE_MEDIAN, ADS1115_REDUCE_TRIMMED_MEAN
+from libs.DFRobot_ADS1115 import ADS1115_REG_POINTER_LOWTHRESH, ADS1115_REG_POINTER_HITHRESH
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_CMODE_WINDOW, ADS1115_REG_CONFIG_CLAT_LATCH
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_PGA_6_144V, ADS1115_REG_CONFIG_PGA_4_096V
+from libs.DFRobot_ADS1115 import ADS1115_REG_CONFIG_PGA_2_048V, ADS1115_REG_CONFIG_PGA_0_256V
+
+BUS, _ = open_bus(1)
+
+
+class ADS1115TestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.adc = ADS1115(0x48)
+        self.adc.set_gain(0x00)
+
+    ''' CONVERSION-READY TESTS ##################################################################################### '''
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_sleep_mode(self, mock_read, mock_write, mock_sleep):
+        mock_read.return_value = [0x10, 0x00]  # 4096 * 0.1875 = 768 mV
+
+        self.assertEqual(768, self.adc.read_voltage(0))
+        mock_sleep.assert_called_once_with(0.1)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_poll_mode(self, mock_read, mock_write, mock_sleep):
+        # Config register reads busy, then ready, then the conversion result
+        mock_read.side_effect = [[0x05, 0x83], [0x85, 0x83], [0x10, 0x00]]
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+
+        self.assertEqual(768, self.adc.read_voltage(0))
+        config = mock_write.call_args.args[2]
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_MODE_SINGLE, config[0] & 0x01)
+        self.assertNotIn(0.1, [c.args[0] for c in mock_sleep.call_args_list])
+
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_poll_mode_timeout(self, mock_read, mock_write):
+        mock_read.return_value = [0x05, 0x83]  # Never ready
+        self.adc.set_ready_mode(ADS1115_READY_POLL, timeout=0.02)
+
+        self.assertRaises(TimeoutError, self.adc.read_voltage, 0)
+
+    @patch.object(GPIO, "add_event_detect")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_alert_mode(self, mock_read, mock_write, mock_add_event_detect):
+        mock_read.return_value = [0x10, 0x00]
+        self.adc.set_ready_mode(ADS1115_READY_ALERT, alert_pin=23)
+        # The conversion completes as soon as the config register is written
+        mock_write.side_effect = lambda addr, reg, data: self.adc._on_alert(23)
+
+        self.assertEqual(768, self.adc.read_voltage(0))
+        mock_add_event_detect.assert_called_once_with(23, GPIO.FALLING, callback=self.adc._on_alert)
+        mock_read.assert_called_once_with(0x48, DFRobot_ADS1115.ADS1115_REG_POINTER_CONVERT, 2)
+
+    @patch.object(BUS, "write_i2c_block_data")
+    def test_read_voltage_with_alert_mode_timeout(self, mock_write):
+        self.adc.set_ready_mode(ADS1115_READY_ALERT, timeout=0.01, alert_pin=23)
+
+        self.assertRaises(TimeoutError, self.adc.read_voltage, 0)
+
+    def test_set_ready_mode_alert_without_pin(self):
+        self.assertRaises(ValueError, self.adc.set_ready_mode, ADS1115_READY_ALERT)
+        self.assertEqual(ADS1115_READY_SLEEP, self.adc.ready_mode)
+
+    ''' SCAN TESTS ################################################################################################# '''
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_scan_reads_every_channel_in_order(self, mock_read, mock_write, mock_sleep):
+        results = {0: [0x10, 0x00], 1: [0x20, 0x00], 2: [0x00, 0x10], 3: [0x40, 0x00]}
+        mock_read.side_effect = lambda addr, reg, length: (
+            [0x80, 0x00] if reg == ADS1115_REG_POINTER_CONFIG else results[self.adc.channel])
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+
+        scan = self.adc.scan((0, 1, 2, 3))
+
+        self.assertEqual({0: 768, 1: 1536, 2: 3, 3: 3072}, scan.voltages)
+        self.assertIsInstance(scan.timestamp, float)
+        muxes = [c.args[2][0] & 0x70 for c in mock_write.call_args_list]
+        self.assertEqual([0x40, 0x50, 0x60, 0x70], muxes)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_scan_starts_next_conversion_after_reading_previous(self, mock_read, mock_write, mock_sleep):
+        events = []
+        mock_write.side_effect = lambda addr, reg, data: events.append("start")
+        mock_read.side_effect = lambda addr, reg, length: (
+            [0x80, 0x00] if reg == ADS1115_REG_POINTER_CONFIG else events.append("read") or [0x00, 0x00])
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+
+        self.adc.scan((2, 3))
+
+        self.assertEqual(["start", "read", "start", "read"], events)
+
+    ''' DATA RATE + OVERSAMPLING TESTS ############################################################################# '''
+    def _burst(self, mock_read, codes):
+        codes = iter(codes)
+        mock_read.side_effect = lambda addr, reg, length: (
+            [0x80, 0x00] if reg == ADS1115_REG_POINTER_CONFIG else [(c := next(codes)) >> 8, c & 0xFF])
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_set_data_rate_is_per_channel(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [0, 0])
+        self.adc.set_data_rate(0, ADS1115_REG_CONFIG_DR_860SPS)
+
+        self.adc.read_voltage(0)
+        self.adc.read_voltage(1)
+
+        rates = [c.args[2][1] & 0xE0 for c in mock_write.call_args_list]
+        self.assertEqual([ADS1115_REG_CONFIG_DR_860SPS, ADS1115_REG_CONFIG_DR_128SPS], rates)
+        self.assertAlmostEqual(1 / 860, mock_sleep.call_args_list[0].args[0])
+
+    def test_set_data_rate_with_unknown_rate(self):
+        self.assertRaises(ValueError, self.adc.set_data_rate, 0, 0x03)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_mean_oversampling(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [4000, 4100, 4200, 4100])
+        self.adc.set_oversampling(0, 4, ADS1115_REDUCE_MEAN)
+
+        self.assertEqual(int(4100 * 0.1875), self.adc.read_voltage(0))
+        self.assertEqual(4, mock_write.call_count)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_median_oversampling(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [4000, 30000, 4100])
+        self.adc.set_oversampling(0, 3, ADS1115_REDUCE_MEDIAN)
+
+        self.assertEqual(int(4100 * 0.1875), self.adc.read_voltage(0))
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_with_trimmed_mean_oversampling(self, mock_read, mock_write, mock_sleep):
+        # 20% of 5 samples: the lowest and the highest are dropped
+        self._burst(mock_read, [100, 4000, 4200, 4100, 30000])
+        self.adc.set_oversampling(0, 5, ADS1115_REDUCE_TRIMMED_MEAN)
+
+        self.assertEqual(int(4100 * 0.1875), self.adc.read_voltage(0))
+
+    def test_set_oversampling_with_bad_arguments(self):
+        self.assertRaises(ValueError, self.adc.set_oversampling, 0, 0)
+        self.assertRaises(ValueError, self.adc.set_oversampling, 0, 4, "mode")
+
+    ''' MULTIPLE ADCs TESTS ######################################################################################## '''
+    def test_instances_keep_their_own_address_and_gain(self):
+        other = ADS1115(0x49)
+        other.set_gain(0x0A)
+
+        self.assertEqual(0x48, self.adc.addr)
+        self.assertEqual(0.1875, self.adc.coefficient)
+        self.assertEqual(0x49, other.addr)
+        self.assertEqual(0.0078125, other.coefficient)
+
+    def test_instances_on_the_same_bus_share_it(self):
+        other = ADS1115(0x49)
+
+        self.assertIs(self.adc.bus, other.bus)
+        self.assertIs(self.adc.bus_lock, other.bus_lock)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_concurrent_reads_from_two_adcs(self, mock_read, mock_write, mock_sleep):
+        codes = {0x48: [0x10, 0x00], 0x49: [0x20, 0x00]}
+        mock_read.side_effect = lambda addr, reg, length: (
+            [0x80, 0x00] if reg == ADS1115_REG_POINTER_CONFIG else codes[addr])
+        other = ADS1115(0x49)
+        other.set_gain(0x00)
+        results = {}
+        for adc in (self.adc, other):
+            adc.set_ready_mode(ADS1115_READY_POLL)
+
+        threads = [threading.Thread(target=lambda a=adc: results.setdefault(a.addr, a.read_voltage(0)))
+                   for adc in (self.adc, other)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual({0x48: 768, 0x49: 1536}, results)
+
+    ''' WINDOW COMPARATOR TESTS #################################################################################### '''
+    @patch.object(GPIO, "add_event_detect")
+    @patch.object(BUS, "write_i2c_block_data")
+    def test_set_window_alarm_programs_thresholds_and_config(self, mock_write, mock_add_event_detect):
+        self.adc.set_window_alarm(0, 1393.5, 1464.5, 23, Mock())
+
+        # 1393.5 / 0.1875 = 7432 = 0x1D08, 1464.5 / 0.1875 = 7811 = 0x1E83
+        self.assertEqual([
+            call(0x48, ADS1115_REG_POINTER_LOWTHRESH, [0x1D, 0x08]),
+            call(0x48, ADS1115_REG_POINTER_HITHRESH, [0x1E, 0x83]),
+        ], mock_write.call_args_list[:2])
+        config = mock_write.call_args_list[2].args[2]
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_MODE_CONTIN, config[0] & 0x01)
+        self.assertEqual(ADS1115_REG_CONFIG_CMODE_WINDOW | ADS1115_REG_CONFIG_CLAT_LATCH, config[1] & 0x14)
+        mock_add_event_detect.assert_called_once_with(23, GPIO.FALLING, callback=self.adc._on_window_alert)
+
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_window_alert_calls_back_with_voltage(self, mock_read, mock_write):
+        callback = Mock()
+        mock_read.return_value = [0x10, 0x00]
+        self.adc.set_window_alarm(2, 100, 200, 23, callback)
+
+        self.adc._on_window_alert(23)
+
+        callback.assert_called_once_with(2, 768)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_read_voltage_rearms_window_alarm(self, mock_read, mock_write, mock_sleep):
+        mock_read.side_effect = lambda addr, reg, length: [0x80, 0x00]
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+        self.adc.set_window_alarm(0, 100, 200, 23, Mock())
+        window_config = mock_write.call_args.args[2]
+
+        self.adc.read_voltage(3)
+
+        self.assertEqual(call(0x48, ADS1115_REG_POINTER_CONFIG, window_config), mock_write.call_args)
+
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_window_alert_disarms_the_comparator(self, mock_read, mock_write):
+        callback = Mock()
+        mock_read.return_value = [0x10, 0x00]
+        self.adc.set_window_alarm(2, 100, 200, 23, callback)
+
+        self.adc._on_window_alert(23)
+        self.adc._on_window_alert(23)
+
+        callback.assert_called_once_with(2, 768)
+        config = mock_write.call_args.args[2]
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_MODE_SINGLE, config[0] & 0x01)
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_CQUE_NONE, config[1] & 0x03)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_window_alarm_is_rearmed_once_back_in_range(self, mock_read, mock_write, mock_sleep):
+        callback = Mock()
+        self.adc.set_ready_mode(ADS1115_READY_POLL)
+        self.adc.set_window_alarm(2, 100, 200, 23, callback)
+        window_config = mock_write.call_args.args[2]
+        code = [0x10, 0x00]  # 768 mV
+        mock_read.side_effect = lambda addr, reg, length: [0x80, 0x00] if reg == ADS1115_REG_POINTER_CONFIG else code
+        self.adc._on_window_alert(23)
+
+        self.adc.read_voltage(2)  # Still out of range
+        self.assertNotEqual(call(0x48, ADS1115_REG_POINTER_CONFIG, window_config), mock_write.call_args)
+
+        code = [0x03, 0x00]  # 144 mV
+        self.adc.read_voltage(2)
+        self.assertEqual(call(0x48, ADS1115_REG_POINTER_CONFIG, window_config), mock_write.call_args)
+
+        code = [0x10, 0x00]
+        self.adc._on_window_alert(23)
+        self.assertEqual(2, callback.call_count)
+
+    @patch.object(GPIO, "remove_event_detect")
+    @patch.object(BUS, "write_i2c_block_data")
+    def test_clear_window_alarm(self, mock_write, mock_remove_event_detect):
+        self.adc.set_window_alarm(0, 100, 200, 23, Mock())
+
+        self.adc.clear_window_alarm()
+
+        mock_remove_event_detect.assert_called_once_with(23)
+        config = mock_write.call_args.args[2]
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_CQUE_NONE, config[1] & 0x03)
+
+    @patch.object(BUS, "write_i2c_block_data")
+    def test_window_alarm_and_alert_ready_mode_are_exclusive(self, mock_write):
+        self.adc.set_ready_mode(ADS1115_READY_ALERT, alert_pin=23)
+
+        self.assertRaises(ValueError, self.adc.set_window_alarm, 0, 100, 200, 23, Mock())
+
+    ''' AUTORANGING + CONFIG CACHE TESTS ########################################################################### '''
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_autorange_narrows_gain_for_next_read(self, mock_read, mock_write, mock_sleep):
+        # 3000 * 0.1875 = 562 mV fits in 80% of the 1.024 V range but not of the 0.512 V range
+        self._burst(mock_read, [3000, 18000])
+        self.adc.set_autorange(0)
+
+        self.assertEqual(562, self.adc.read_voltage(0))
+        self.assertEqual(562, self.adc.read_voltage(0))
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_PGA_1_024V, mock_write.call_args.args[2][0] & 0x0E)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_autorange_widens_gain_and_reads_again_when_saturated(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [32767, 32767, 16384])
+        self.adc.set_channel_gain(0, ADS1115_REG_CONFIG_PGA_2_048V)
+        self.adc.set_autorange(0)
+
+        self.assertEqual(int(16384 * 0.1875), self.adc.read_voltage(0))
+        gains = [c.args[2][0] & 0x0E for c in mock_write.call_args_list]
+        self.assertEqual([ADS1115_REG_CONFIG_PGA_2_048V, ADS1115_REG_CONFIG_PGA_4_096V,
+                          ADS1115_REG_CONFIG_PGA_6_144V], gains)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_channel_gain_overrides_global_gain(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [0x1000, 0x1000])
+        self.adc.set_channel_gain(1, ADS1115_REG_CONFIG_PGA_0_256V)
+
+        self.assertEqual(768, self.adc.read_voltage(0))
+        self.assertEqual(32, self.adc.read_voltage(1))
+
+    def test_set_channel_gain_with_unknown_gain(self):
+        self.assertRaises(ValueError, self.adc.set_channel_gain, 0, 0x0C)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_unchanged_continuous_config_is_not_written_again(self, mock_read, mock_write, mock_sleep):
+        mock_read.return_value = [0x10, 0x00]
+
+        self.adc.read_voltage(0)
+        self.adc.read_voltage(0)
+        self.adc.read_voltage(1)
+
+        self.assertEqual(2, mock_write.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_single_shot_config_is_written_for_every_conversion(self, mock_read, mock_write, mock_sleep):
+        self._burst(mock_read, [0, 0])
+
+        self.adc.read_voltage(0)
+        self.adc.read_voltage(0)
+
+        self.assertEqual(2, mock_write.call_count)
+        self.assertIs(mock_write.call_args_list[0].args[2], mock_write.call_args_list[1].args[2])
+
+    ''' WAVEFORM CAPTURE TESTS ##################################################################################### '''
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_capture_waveform_stats(self, mock_read, mock_write, mock_sleep):
+        codes = iter([1000, 3000] * 430)
+        mock_read.side_effect = lambda addr, reg, length: [(c := next(codes)) >> 8, c & 0xFF]
+
+        stats = self.adc.capture_waveform(1, 1.0)
+
+        self.assertEqual(860, stats['count'])
+        self.assertAlmostEqual(2000 * 0.1875, stats['mean'])
+        self.assertAlmostEqual(2000 * 0.1875, stats['peak_to_peak'])
+        self.assertAlmostEqual(1000 * 0.1875, stats['stdev'])
+        self.assertEqual(0, stats['gaps'])
+        config = mock_write.call_args_list[0].args[2]
+        self.assertEqual(DFRobot_ADS1115.ADS1115_REG_CONFIG_MODE_CONTIN, config[0] & 0x01)
+        self.assertEqual(ADS1115_REG_CONFIG_DR_860SPS, config[1] & 0xE0)
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_capture_waveform_ring_buffer_keeps_latest_samples(self, mock_read, mock_write, mock_sleep):
+        codes = iter(range(1, 11))
+        mock_read.side_effect = lambda addr, reg, length: [0, next(codes)]
+
+        samples = self.adc.capture_waveform(0, 10 / 860, size=4, raw=True)
+
+        self.assertEqual([7, 8, 9, 10], list(samples))
+
+    @patch.object(DFRobot_ADS1115.time, "sleep")
+    @patch.object(BUS, "write_i2c_block_data")
+    @patch.object(BUS, "read_i2c_block_data")
+    def test_capture_waveform_in_background_with_interleaved_read(self, mock_read, mock_write, mock_sleep):
+        mock_read.return_value = [0x80, 0x00]
+        capture = DFRobot_ADS1115.WaveformCapture(self.adc, 3, 5 / 860)
+        # Another read re-muxes the ADC while the capture is running
+        original_add = capture._add
+        capture._add = lambda code: (original_add(code), capture.count == 2 and self.adc.read_voltage(0))
+
+        capture.start()
+
+        self.assertTrue(capture.join(1.0))
+        self.assertEqual(5, capture.count)
+        self.assertEqual(1, capture.gaps)
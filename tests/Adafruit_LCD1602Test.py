@@ -0,0 +1,204 @@
+import threading
+import time
+import unittest
+from unittest.mock import call, patch
+from libs.Adafruit_LCD1602 import Adafruit_CharLCD
+from libs.PCF8574 import PCF8574_GPIO
+
+FRAME = "pH          7.28 \nORP     770 mV  "
+
+
+@patch.object(Adafruit_CharLCD, "delayMicroseconds")
+class Adafruit_CharLCDTestCase(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(Adafruit_CharLCD, "delayMicroseconds"):
+            self.lcd = Adafruit_CharLCD(pin_rs=0, pin_e=2, pins_db=[4, 5, 6, 7], GPIO=PCF8574_GPIO(0x27))
+            self.lcd.begin(16, 2)
+
+    def written(self, mock_write4bits):
+        return [c.args[0] for c in mock_write4bits.call_args_list if len(c.args) > 1 and c.args[1]]
+
+    ''' SHADOW DDRAM TESTS ######################################################################################'''
+
+    def test_clear_resets_the_shadow(self, mock_delay):
+        self.lcd.message("abc")
+        self.lcd.clear()
+
+        self.assertEqual([' '] * 40, self.lcd.ddram[0])
+        self.assertEqual((0, 0), self.lcd.cursor_position)
+
+    def test_message_updates_the_shadow(self, mock_delay):
+        self.lcd.setCursor(0, 0)
+        self.lcd.message("ab\ncd")
+
+        self.assertEqual(['a', 'b'], self.lcd.ddram[0][:2])
+        self.assertEqual(['c', 'd'], self.lcd.ddram[1][:2])
+        self.assertEqual((2, 1), self.lcd.cursor_position)
+
+    def test_cursor_wraps_to_the_next_line(self, mock_delay):
+        self.lcd.setCursor(39, 0)
+        self.lcd.message("xy")
+
+        self.assertEqual('x', self.lcd.ddram[0][39])
+        self.assertEqual('y', self.lcd.ddram[1][0])
+
+    ''' UPDATE TESTS ############################################################################################'''
+
+    def test_first_update_after_clear_skips_blanks(self, mock_delay):
+        with patch.object(self.lcd, "write4bits", wraps=self.lcd.write4bits) as mock_write4bits:
+            written = self.lcd.update(FRAME)
+
+        self.assertEqual(len(FRAME.replace(" ", "").replace("\n", "")), written)
+        self.assertEqual([ord(c) for c in FRAME.replace(" ", "").replace("\n", "")], self.written(mock_write4bits))
+        self.assertEqual(list(FRAME.split("\n")[1]), self.lcd.ddram[1][:16])
+
+    def test_update_with_one_changed_digit(self, mock_delay):
+        self.lcd.update(FRAME)
+
+        with patch.object(self.lcd, "write4bits", wraps=self.lcd.write4bits) as mock_write4bits:
+            written = self.lcd.update(FRAME.replace("7.28", "7.29"))
+
+        self.assertEqual(1, written)
+        # One cursor move and one character
+        self.assertEqual([call(0x80 | 15), call(ord("9"), True)], mock_write4bits.call_args_list)
+
+    def test_update_without_changes(self, mock_delay):
+        self.lcd.update(FRAME)
+
+        with patch.object(self.lcd, "write4bits") as mock_write4bits:
+            self.assertEqual(0, self.lcd.update(FRAME))
+
+        mock_write4bits.assert_not_called()
+
+    def test_update_moves_the_cursor_only_over_gaps(self, mock_delay):
+        self.lcd.update(FRAME)
+
+        with patch.object(self.lcd, "write4bits", wraps=self.lcd.write4bits) as mock_write4bits:
+            self.lcd.update(FRAME.replace("7.28", "8.30"))
+
+        # "8" at column 12, then "30" at columns 14 and 15
+        self.assertEqual([call(0x80 | 12), call(ord("8"), True), call(0x80 | 14), call(ord("3"), True),
+                          call(ord("0"), True)], mock_write4bits.call_args_list)
+
+    def test_update_pads_short_lines(self, mock_delay):
+        self.lcd.update(FRAME)
+
+        self.lcd.update("pH\nORP")
+
+        self.assertEqual(list("pH".ljust(16)), self.lcd.ddram[0][:16])
+        self.assertEqual(list("ORP".ljust(16)), self.lcd.ddram[1][:16])
+
+    def test_update_after_invalidate_rewrites_everything(self, mock_delay):
+        self.lcd.update(FRAME)
+        self.lcd.invalidate()
+
+        self.assertEqual(32, self.lcd.update(FRAME))
+
+    def test_update_in_right_to_left_mode_rewrites_everything(self, mock_delay):
+        self.lcd.rightToLeft()
+
+        self.assertEqual(32, self.lcd.update(FRAME))
+        self.assertEqual(32, self.lcd.update(FRAME))
+
+    ''' FAST PATH TESTS #########################################################################################'''
+
+    def test_fast_path_sends_one_burst_per_character(self, mock_delay):
+        self.lcd.GPIO.chip.currentValue = 0x08  # backlight on
+
+        with patch.object(self.lcd.GPIO.chip.bus, "write_i2c_block_data") as mock_block, \
+                patch.object(self.lcd.GPIO.chip.bus, "write_byte") as mock_byte:
+            self.lcd.write4bits(ord("A"), True)  # 0x41
+
+        # RS (bit 0) and backlight set, high nibble 0x4 then low nibble 0x1, each strobed with E (bit 2)
+        mock_block.assert_called_once_with(0x27, 0x49, [0x4D, 0x49, 0x19, 0x1D, 0x19])
+        mock_byte.assert_not_called()
+        self.assertEqual(0x19, self.lcd.GPIO.chip.currentValue)
+
+    def test_fast_path_command_clears_rs(self, mock_delay):
+        self.lcd.GPIO.chip.currentValue = 0x09
+
+        with patch.object(self.lcd.GPIO.chip.bus, "write_i2c_block_data") as mock_block:
+            self.lcd.write4bits(0x80 | 12)  # 0x8C
+
+        mock_block.assert_called_once_with(0x27, 0x88, [0x8C, 0x88, 0xC8, 0xCC, 0xC8])
+
+    def test_fast_path_does_not_sleep_after_initialization(self, mock_delay):
+        self.lcd.write4bits(ord("A"), True)
+
+        mock_delay.assert_not_called()
+
+    def test_long_sequences_are_split_in_smbus_blocks(self, mock_delay):
+        with patch.object(self.lcd.GPIO.chip.bus, "write_i2c_block_data") as mock_block:
+            self.lcd.GPIO.outputSequence(list(range(40)))
+
+        self.assertEqual([call(0x27, 0, list(range(1, 33))), call(0x27, 33, list(range(34, 40)))],
+                         mock_block.call_args_list)
+        self.assertEqual(39, self.lcd.GPIO.chip.currentValue)
+
+    def test_update_is_flushed_in_one_burst(self, mock_delay):
+        self.lcd.update(FRAME)
+
+        with patch.object(self.lcd.GPIO.chip.bus, "write_i2c_block_data") as mock_block:
+            self.lcd.update(FRAME.replace("7.28", "8.30"))
+
+        # 2 cursor moves and 3 characters, 6 port values each
+        self.assertEqual(1, mock_block.call_count)
+        self.assertEqual(30, 1 + len(mock_block.call_args.args[2]))
+
+    ''' PRE-ENCODED SCREEN TESTS ################################################################################'''
+
+    def test_show_draws_the_encoded_text_in_one_burst(self, mock_delay):
+        values = self.lcd.encode(FRAME)
+
+        with patch.object(self.lcd.GPIO.chip.bus, "write_i2c_block_data") as mock_block:
+            self.assertEqual(32, self.lcd.show(FRAME, values))
+
+        self.assertEqual(len(values), sum(1 + len(c.args[2]) for c in mock_block.call_args_list))
+        self.assertEqual([list(line[:16]) for line in FRAME.split("\n")], [row[:16] for row in self.lcd.ddram])
+        self.assertEqual((16, 1), self.lcd.cursor_position)
+
+    def test_encode_matches_update(self, mock_delay):
+        self.lcd.invalidate()
+        with patch.object(self.lcd.GPIO.chip, "writeBytes") as mock_write_bytes:
+            self.lcd.update(FRAME)
+
+        self.assertEqual(self.lcd.encode(FRAME), [v for c in mock_write_bytes.call_args_list for v in c.args[0]])
+
+    def test_update_after_show_sends_only_changes(self, mock_delay):
+        self.lcd.show(FRAME, self.lcd.encode(FRAME))
+
+        self.assertEqual(1, self.lcd.update(FRAME.replace("7.28", "7.29")))
+
+    def test_update_during_show_sees_the_shown_text(self, mock_delay):
+        self.lcd.update(FRAME.replace("7.28", "6.00"))
+        values = self.lcd.encode(FRAME)
+        written = []
+        frame_lines = self.lcd.frameLines
+        output_sequence = self.lcd.GPIO.outputSequence
+
+        def slow_frame_lines(text):
+            if threading.current_thread() is show:
+                time.sleep(0.1)  # Leave the update a chance to slip in
+            return frame_lines(text)
+
+        def output_sequence_then_update(port_values):
+            output_sequence(port_values)
+            update.start()
+        show = threading.Thread(target=self.lcd.show, args=(FRAME, values))
+        update = threading.Thread(target=lambda: written.append(self.lcd.update(FRAME)))
+        with patch.object(self.lcd, "frameLines", side_effect=slow_frame_lines), \
+                patch.object(self.lcd.GPIO, "outputSequence", side_effect=output_sequence_then_update):
+            show.start()
+            show.join(5)
+            update.join(5)
+
+        # The update diffed against the shown text, there was nothing left to write
+        self.assertEqual([0], written)
+        self.assertEqual([list(line[:16]) for line in FRAME.split("\n")], [row[:16] for row in self.lcd.ddram])
+
+    def test_show_without_encoded_values_falls_back_to_update(self, mock_delay):
+        with patch.object(self.lcd, "update") as mock_update:
+            self.lcd.show(FRAME, None)
+
+        mock_update.assert_called_once_with(FRAME)
@@ -0,0 +1,85 @@
+import unittest
+from AdaptiveSampling import AdaptiveSampler, SensorSchedule
+
+
+class SensorScheduleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # pH band
+        self.schedule = SensorSchedule(7.2, 7.6, min_interval=1, max_interval=60)
+
+    ''' INTERVAL TESTS ##########################################################################################'''
+
+    def test_interval_grows_while_stable(self):
+        intervals = [self.schedule.update(7.4, now) for now in (0, 2, 6, 14, 30, 62, 126, 186)]
+
+        self.assertEqual([2, 4, 8, 16, 32, 60, 60, 60], intervals)
+
+    def test_interval_drops_near_threshold(self):
+        for now in (0, 2, 6, 14):
+            self.schedule.update(7.4, now)
+
+        self.assertEqual(1, self.schedule.update(7.58, 30))
+
+    def test_interval_drops_outside_band(self):
+        self.assertEqual(1, self.schedule.update(8.0, 0))
+
+    def test_interval_halves_on_fast_change(self):
+        for now in (0, 2, 6, 14):
+            self.schedule.update(7.30, now)
+
+        # 0.06 pH in 16 s is more than 10% of the band
+        self.assertEqual(8, self.schedule.update(7.36, 30))
+
+    def test_interval_stays_shorter_than_drift_to_threshold(self):
+        for now in (0, 2, 6, 14):
+            self.schedule.update(7.40, now)
+
+        # 0.02 pH in 16 s, 0.18 pH from PH_MAX: 144 s to reach it, 72 s with the safety factor
+        self.assertEqual(32, self.schedule.update(7.42, 30))
+        # 0.01 pH in 32 s, 0.17 pH from PH_MAX: 544 s to reach it
+        self.assertEqual(60, self.schedule.update(7.43, 62))
+
+    def test_failed_reading_uses_min_interval(self):
+        for now in (0, 2, 6, 14):
+            self.schedule.update(7.4, now)
+
+        self.assertEqual(1, self.schedule.update(None, 30))
+
+    def test_one_sided_band(self):
+        # Turbidity: only the upper threshold matters
+        schedule = SensorSchedule(None, 0.5, min_interval=1, max_interval=60)
+
+        self.assertEqual(2, schedule.update(0.0, 0))
+        self.assertEqual(1, schedule.update(0.48, 2))
+
+    def test_is_due(self):
+        self.assertTrue(self.schedule.is_due(0))
+        self.schedule.update(7.4, 0)
+
+        self.assertFalse(self.schedule.is_due(1.9))
+        self.assertTrue(self.schedule.is_due(2))
+
+
+class AdaptiveSamplerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.values = {"ph": 7.4, "orp": 760}
+        self.sampler = AdaptiveSampler(clock=lambda: self.now)
+        self.sampler.add("ph", SensorSchedule(7.2, 7.6, 1, 60), lambda: self.values["ph"])
+        self.sampler.add("orp", SensorSchedule(750, 770, 1, 60), lambda: self.values["orp"])
+
+    def test_every_sensor_is_due_at_first(self):
+        self.assertEqual(["ph", "orp"], self.sampler.due())
+        self.assertEqual(0.0, self.sampler.time_until_next())
+
+    def test_only_due_sensors_are_returned(self):
+        self.sampler.sampled("ph")
+        self.values["orp"] = 769
+        self.sampler.sampled("orp")
+        self.now = 1.0
+
+        self.assertEqual(["orp"], self.sampler.due())
+        self.sampler.sampled("orp")
+        self.assertEqual(1.0, self.sampler.time_until_next())
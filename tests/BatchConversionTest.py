@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+import BatchConversion
+from BatchConversion import convert_batch
+from EmbeddedPool import EmbeddedPool
+
+
+@unittest.skipIf(BatchConversion.np is None, "NumPy is not installed")
+class BatchConversionTestCase(unittest.TestCase):
+    VOLTAGES = [0, 500, 1230, 1250, 1390, 1450, 2000, 2500, 4300, 4930]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.ep = EmbeddedPool()
+
+    def test_convert_batch_matches_check_methods(self):
+        result = convert_batch(ph=self.VOLTAGES, orp=self.VOLTAGES, turbidity=self.VOLTAGES, light=self.VOLTAGES)
+
+        for i, voltage in enumerate(self.VOLTAGES):
+            self.ep.check_water_ph(voltage)
+            self.ep.check_orp(voltage)
+            self.ep.check_turbidity(voltage)
+            self.ep.check_environment_light_level(voltage)
+
+            self.assertAlmostEqual(self.ep.water_ph, result["ph"][i])
+            self.assertEqual(self.ep.is_acceptable_ph, result["ph_ok"][i])
+            self.assertEqual(self.ep.orp, result["orp"][i])
+            self.assertEqual(self.ep.is_acceptable_orp, result["orp_ok"][i])
+            self.assertAlmostEqual(self.ep.water_turbidity, result["turbidity"][i])
+            self.assertEqual(self.ep.is_acceptable_turbidity, result["turbidity_ok"][i])
+            self.assertEqual(self.ep.environment_light, result["light"][i])
+            self.assertEqual(self.ep.is_acceptable_light, result["light_ok"][i])
+
+    @patch.object(EmbeddedPool, "LUX_OFFSET", 20)
+    @patch.object(EmbeddedPool, "TURBIDITY_COEFFICIENTS", (-1000.0, 5000.0, -4000.0))
+    @patch.object(EmbeddedPool, "ORP_OFFSET", 10)
+    def test_convert_batch_follows_the_calibration(self):
+        result = convert_batch(orp=self.VOLTAGES, turbidity=self.VOLTAGES, light=self.VOLTAGES)
+
+        self.assertEqual([EmbeddedPool.voltage_to_orp(v) for v in self.VOLTAGES], list(result["orp"]))
+        for v, ntu in zip(self.VOLTAGES, result["turbidity"]):
+            self.assertAlmostEqual(EmbeddedPool.voltage_to_turbidity(v), ntu)
+        self.assertEqual([EmbeddedPool.voltage_to_lux(v) for v in self.VOLTAGES], list(result["light"]))
+
+    def test_convert_batch_with_codes(self):
+        # 6560 * 0.1875 = 1230 mV, 23200 * 0.0625 = 1450 mV
+        result = convert_batch(orp=[6560], ph=[23200], codes=True, gain={"orp": 0x00, "ph": 0x04})
+
+        self.assertEqual([770], list(result["orp"]))
+        self.assertAlmostEqual(self.ep.voltage_to_ph(1450), result["ph"][0])
+
+    def test_convert_batch_skips_missing_sensors(self):
+        result = convert_batch(light=[1390])
+
+        self.assertEqual({"light", "light_ok"}, set(result))
+
+    def test_convert_batch_with_calibration(self):
+        result = convert_batch(ph=[1500, 2100], calibration=(1500.0, 2100.0))
+
+        self.assertAlmostEqual(7.0, result["ph"][0])
+        self.assertAlmostEqual(4.0, result["ph"][1])
+
+    def test_convert_batch_with_water_temperature(self):
+        result = convert_batch(ph=[1400, 1450], temperature=[5.0, 30.0])
+
+        self.assertAlmostEqual(self.ep.voltage_to_ph(1400, 5.0), result["ph"][0])
+        self.assertAlmostEqual(self.ep.voltage_to_ph(1450, 30.0), result["ph"][1])
+        self.assertEqual([False, True], list(result["ph_ok"]))
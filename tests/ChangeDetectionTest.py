@@ -0,0 +1,48 @@
+import unittest
+from ChangeDetection import ChangeDetector
+
+
+class ChangeDetectorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.detector = ChangeDetector({"ph": 0.05})
+
+    def test_first_reading_is_a_change(self):
+        self.assertTrue(self.detector.update("ph", 7.40, True))
+        self.assertEqual((7.40, True), self.detector.last("ph"))
+
+    def test_reading_within_deadband_is_not_a_change(self):
+        self.detector.update("ph", 7.40, True)
+
+        self.assertFalse(self.detector.update("ph", 7.44, True))
+        self.assertFalse(self.detector.update("ph", 7.36, True))
+        self.assertEqual((7.40, True), self.detector.last("ph"))
+
+    def test_slow_drift_is_reported_once_it_exceeds_the_deadband(self):
+        self.detector.update("ph", 7.40, True)
+        reports = [self.detector.update("ph", value, True) for value in (7.42, 7.44, 7.46, 7.48, 7.50)]
+
+        self.assertEqual([False, False, True, False, False], reports)
+
+    def test_threshold_crossing_is_a_change(self):
+        self.detector.update("ph", 7.58, True)
+
+        self.assertTrue(self.detector.update("ph", 7.61, False))
+
+    def test_missing_reading_is_a_change(self):
+        self.detector.update("ph", 7.40, True)
+
+        self.assertTrue(self.detector.update("ph", None, None))
+        self.assertFalse(self.detector.update("ph", None, None))
+        self.assertTrue(self.detector.update("ph", 7.40, True))
+
+    def test_default_deadband(self):
+        self.assertTrue(self.detector.update("level", True))
+        self.assertFalse(self.detector.update("level", True))
+        self.assertTrue(self.detector.update("level", False))
+
+    def test_reset(self):
+        self.detector.update("ph", 7.40, True)
+        self.detector.reset()
+
+        self.assertTrue(self.detector.update("ph", 7.40, True))
@@ -0,0 +1,72 @@
+import unittest
+from CircuitBreaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=3, base_delay=5.0, max_delay=20.0, clock=lambda: self.now)
+
+    def fail(self):
+        raise OSError("sensor not responding")
+
+    ''' STATE TESTS #############################################################################################'''
+
+    def test_circuit_stays_closed_below_threshold(self):
+        self.breaker.call(self.fail)
+        self.breaker.call(self.fail)
+
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+
+    def test_circuit_opens_after_threshold(self):
+        for _ in range(3):
+            self.breaker.call(self.fail)
+
+        self.assertEqual(OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(5.0, self.breaker.health()["retry_in"])
+
+    def test_success_resets_failures(self):
+        self.breaker.call(self.fail)
+        self.breaker.call(self.fail)
+        self.assertTrue(self.breaker.call(lambda: None))
+        self.breaker.call(self.fail)
+
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertEqual(1, self.breaker.failures)
+
+    def test_open_circuit_skips_calls(self):
+        for _ in range(3):
+            self.breaker.call(self.fail)
+        calls = []
+
+        self.assertFalse(self.breaker.call(calls.append, 1))
+        self.assertEqual([], calls)
+
+    ''' BACKOFF TESTS ###########################################################################################'''
+
+    def test_half_open_probe_success_closes_circuit(self):
+        for _ in range(3):
+            self.breaker.call(self.fail)
+        self.now = 5.0
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(HALF_OPEN, self.breaker.state)
+        self.breaker.record_success()
+
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertIsNone(self.breaker.health()["retry_in"])
+
+    def test_failed_probe_doubles_the_delay(self):
+        for _ in range(3):
+            self.breaker.call(self.fail)
+        delays = []
+        for _ in range(4):
+            self.now = self.breaker.open_until
+            self.breaker.call(self.fail)
+            delays.append(self.breaker.open_until - self.now)
+
+        self.assertEqual([10.0, 20.0, 20.0, 20.0], delays)
+        self.assertIsInstance(self.breaker.health()["last_error"], OSError)
@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import Mock
+from ConversionTables import ConversionTables
+
+
+class ConversionTablesTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tables = ConversionTables()
+
+    def test_convert_uses_read_voltage_truncation(self):
+        self.tables.register("double", lambda voltage: voltage * 2)
+
+        # 4096 * 0.1875 = 768 mV, -4096 * 0.1875 = -768 mV, 5 * 0.1875 = 0.9375 -> 0 mV
+        self.assertEqual([1536, -1536, 0], self.tables.convert("double", 0x00, [4096, -4096, 5]))
+
+    def test_table_is_built_once_per_gain(self):
+        convert = Mock(return_value=1.0)
+        self.tables.register("sensor", convert)
+
+        self.tables.convert("sensor", 0x00, [1, 2, 3])
+        self.tables.convert("sensor", 0x00, [4, 5, 6])
+        self.assertEqual(65536, convert.call_count)
+
+        self.tables.convert("sensor", 0x04, [1])
+        self.assertEqual(2 * 65536, convert.call_count)
+
+    def test_table_is_rebuilt_when_calibration_changes(self):
+        calibration = {"offset": 0}
+        self.tables.register("sensor", lambda voltage: voltage + calibration["offset"],
+                             lambda: calibration["offset"])
+
+        self.assertEqual([768], self.tables.convert("sensor", 0x00, [4096]))
+        calibration["offset"] = 10
+        self.assertEqual([778], self.tables.convert("sensor", 0x00, [4096]))
+
+    def test_invalidate_drops_tables(self):
+        convert = Mock(return_value=1.0)
+        self.tables.register("sensor", convert)
+        self.tables.convert("sensor", 0x00, [1])
+
+        self.tables.invalidate("sensor")
+        self.tables.convert("sensor", 0x00, [1])
+
+        self.assertEqual(2 * 65536, convert.call_count)
@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from libs import DFRobot_PH as DFRobot_PH_module
+from libs.DFRobot_PH import DFRobot_PH, PHCalibration
+
+
+class PHCalibrationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calibration = PHCalibration(1500.0, 2100.0)
+
+    ''' CONVERSION TESTS ########################################################################################'''
+
+    def test_buffer_voltages_convert_to_buffer_ph(self):
+        self.assertAlmostEqual(7.0, self.calibration.to_PH(1500.0))
+        self.assertAlmostEqual(4.0, self.calibration.to_PH(2100.0))
+
+    def test_matches_the_dfrobot_formula(self):
+        slope = (7.0 - 4.0) / ((1500.0 - 1500.0) / 3.0 - (2100.0 - 1500.0) / 3.0)
+        intercept = 7.0 - slope * (1500.0 - 1500.0) / 3.0
+        self.assertAlmostEqual(slope * (1700.0 - 1500.0) / 3.0 + intercept, self.calibration.to_PH(1700.0))
+
+    def test_temperature_compensation(self):
+        # The electrode slope grows with the absolute temperature, so a warmer solution reads closer to 7
+        self.assertAlmostEqual(7.0, self.calibration.to_PH(1500.0, 35.0))
+        self.assertAlmostEqual(7.0 - 3.0 * 298.15 / 308.15, self.calibration.to_PH(2100.0, 35.0))
+        self.assertAlmostEqual(self.calibration.to_PH(1900.0), self.calibration.to_PH(1900.0, 25.0))
+
+    def test_to_voltage_is_the_inverse_of_to_ph(self):
+        for temperature in (None, 10.0, 30.0):
+            self.assertAlmostEqual(1650.0, self.calibration.to_voltage(self.calibration.to_PH(1650.0, temperature),
+                                                                       temperature))
+
+    def test_invalid_calibration(self):
+        self.assertRaises(ValueError, PHCalibration, 1500.0, 1500.0)
+
+    ''' PERSISTENCE TESTS #######################################################################################'''
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "phdata.txt")
+            self.calibration.save(path)
+
+            self.assertEqual((1500.0, 2100.0), PHCalibration.load(path).get())
+            self.assertEqual(["phdata.txt"], os.listdir(tmp))
+
+    def test_load_parses_key_value_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "phdata.txt")
+            with open(path, "w") as f:
+                # str.strip("acidVoltage=") would also eat the leading "a" and "e" of these values
+                f.write("acidVoltage = 2000.5\n\nneutralVoltage=1490\n")
+
+            self.assertEqual((1490.0, 2000.5), PHCalibration.load(path).get())
+
+    def test_load_with_missing_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "phdata.txt")
+            with open(path, "w") as f:
+                f.write("neutralVoltage=1500.0\n")
+
+            self.assertRaises(ValueError, PHCalibration.load, path)
+
+    def test_failed_save_keeps_the_old_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "phdata.txt")
+            self.calibration.save(path)
+
+            with patch.object(DFRobot_PH_module.os, "replace", side_effect=OSError):
+                self.assertRaises(OSError, PHCalibration(1480.0, 2000.0).save, path)
+
+            self.assertEqual((1500.0, 2100.0), PHCalibration.load(path).get())
+            self.assertEqual(["phdata.txt"], os.listdir(tmp))
+
+
+class DFRobot_PHTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ph = DFRobot_PH(os.path.join(self.tmp.name, "phdata.txt"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_calibration_with_neutral_buffer(self):
+        self.ph.reset()
+
+        self.ph.calibration(1510.0)
+
+        self.assertEqual((1510.0, 2032.44), self.ph.get_calibration())
+        self.assertEqual((1510.0, 2032.44), PHCalibration.load(self.ph.path).get())
+        self.assertAlmostEqual(7.0, self.ph.read_PH(1510.0, None))
+
+    def test_calibration_with_acid_buffer(self):
+        self.ph.reset()
+
+        self.ph.calibration(2000.0)
+
+        self.assertEqual((1500.0, 2000.0), self.ph.get_calibration())
+        self.assertAlmostEqual(4.0, self.ph.read_PH(2000.0, None))
+
+    def test_calibration_with_wrong_buffer(self):
+        self.ph.calibration(1800.0)
+
+        self.assertFalse(os.path.exists(self.ph.path))
+
+    def test_begin_loads_the_calibration(self):
+        PHCalibration(1490.0, 2010.0).save(self.ph.path)
+
+        self.ph.begin()
+
+        self.assertEqual((1490.0, 2010.0), self.ph.get_calibration())
+
+    def test_each_sensor_keeps_its_calibration(self):
+        other = DFRobot_PH(os.path.join(self.tmp.name, "phdata2.txt"))
+        PHCalibration(1490.0, 2010.0).save(self.ph.path)
+        PHCalibration(1520.0, 2050.0).save(other.path)
+
+        self.ph.begin()
+        other.begin()
+        other.reset()
+
+        self.assertEqual((1490.0, 2010.0), self.ph.get_calibration())
+        self.assertEqual((1500.0, 2032.44), other.get_calibration())
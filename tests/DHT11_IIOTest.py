@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from libs import DHT11_IIO as DHT11_IIO_module
+from libs.DHT11_IIO import DHT11_IIO
+
+
+class DHT11_IIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.add_device("iio:device0", "ads1015")
+        self.device_dir = self.add_device("iio:device1", "dht11")
+        self.write_values(45000, 23500)
+        self.clock = [100.0]
+        self.monotonic = patch.object(DHT11_IIO_module.time, "monotonic", side_effect=lambda: self.clock[0])
+        self.monotonic.start()
+        self.dht = DHT11_IIO(base_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.monotonic.stop()
+        self.tmp.cleanup()
+
+    def add_device(self, device, name):
+        device_dir = os.path.join(self.tmp.name, device)
+        os.mkdir(device_dir)
+        with open(os.path.join(device_dir, "name"), "w") as f:
+            f.write(name + "\n")
+        return device_dir
+
+    def write_values(self, humidity, temperature):
+        for attribute, value in (("in_humidityrelative_input", humidity), ("in_temp_input", temperature)):
+            path = os.path.join(self.device_dir, attribute)
+            if value is None:
+                # The driver fails the read, simulate it with a missing file
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                with open(path, "w") as f:
+                    f.write("%d\n" % value)
+
+    ''' READ TESTS ##############################################################################################'''
+
+    def test_dht11_device_is_found(self):
+        self.assertTrue(self.dht.is_available())
+        self.assertEqual(self.device_dir, self.dht.device_dir)
+
+    def test_read_converts_milli_units(self):
+        self.assertEqual((45.0, 23.5), self.dht.read())
+
+    def test_read_without_driver(self):
+        dht = DHT11_IIO(base_dir=os.path.join(self.tmp.name, "missing"))
+        self.assertFalse(dht.is_available())
+        self.assertEqual((None, None), dht.read())
+
+    def test_read_is_cached_for_min_interval(self):
+        self.dht.read()
+        self.write_values(50000, 25000)
+        self.clock[0] += 1.9
+        self.assertEqual((45.0, 23.5), self.dht.read())
+        self.clock[0] += 0.1
+        self.assertEqual((50.0, 25.0), self.dht.read())
+
+    def test_failed_read_returns_recent_valid_reading(self):
+        self.dht.read()
+        self.write_values(None, None)
+        self.clock[0] += 2
+        self.assertEqual((45.0, 23.5), self.dht.read())
+        self.assertEqual(2, self.dht.get_age())
+
+    def test_failed_read_after_max_age(self):
+        self.dht.read()
+        self.write_values(None, None)
+        self.clock[0] += 11
+        self.assertEqual((None, None), self.dht.read())
+
+    def test_failed_first_read(self):
+        self.write_values(None, None)
+        self.assertEqual((None, None), self.dht.read())
+        self.assertIsNone(self.dht.get_age())
@@ -0,0 +1,97 @@
+import math
+import time
+import unittest
+from multiprocessing import shared_memory
+from DHTWorker import DHTWorker, SHM_SIZE, publish
+
+
+def fake_reader():
+    return 27.0, 25.5
+
+
+def failing_reader():
+    raise RuntimeError("DHT11 not responding")
+
+
+class DHTWorkerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.worker = DHTWorker(11, 26, interval=0.01, reader=fake_reader)
+
+    def tearDown(self):
+        self.worker.stop()
+
+    ''' SHARED MEMORY TESTS #####################################################################################'''
+
+    def test_read_before_start(self):
+        self.assertEqual((None, None, None), self.worker.read())
+
+    def test_read_published_reading(self):
+        self.worker.shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+        self.worker.shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+        self.assertEqual((None, None, None), self.worker.read())
+
+        publish(self.worker.shm.buf, 40.0, 21.0, 1000.0)
+
+        self.assertEqual((40.0, 21.0, 1000.0), self.worker.read())
+
+    def test_status_before_start(self):
+        self.assertEqual((None, 0), self.worker.get_status())
+
+    def test_read_failed_attempts(self):
+        self.worker.shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+        self.worker.shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+
+        publish(self.worker.shm.buf, math.nan, math.nan, math.nan, 1000.0, 1)
+
+        self.assertEqual((None, None, None), self.worker.read())
+        self.assertEqual((1000.0, 1), self.worker.get_status())
+
+        publish(self.worker.shm.buf, 40.0, 21.0, 1005.0)
+        publish(self.worker.shm.buf, 40.0, 21.0, 1005.0, 1010.0, 1)
+
+        self.assertEqual((40.0, 21.0, 1005.0), self.worker.read())
+        self.assertEqual((1010.0, 1), self.worker.get_status())
+
+    def test_read_during_write_returns_previous_reading(self):
+        self.worker.shm = shared_memory.SharedMemory(create=True, size=SHM_SIZE)
+        self.worker.shm.buf[:SHM_SIZE] = bytes(SHM_SIZE)
+        publish(self.worker.shm.buf, 40.0, 21.0, 1000.0)
+        self.worker.read()
+        # Odd sequence number: a write is in progress
+        self.worker.shm.buf[0] = 3
+
+        self.assertEqual((40.0, 21.0, 1000.0), self.worker.read())
+
+    ''' PROCESS TESTS ###########################################################################################'''
+
+    def test_worker_process_publishes_readings(self):
+        self.worker.start()
+        self.assertTrue(self.worker.is_running())
+        deadline = time.monotonic() + 5
+        while self.worker.read()[0] is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        humidity, temperature, timestamp = self.worker.read()
+
+        self.assertEqual((27.0, 25.5), (humidity, temperature))
+        self.assertLess(time.time() - timestamp, 5)
+
+    def test_worker_process_publishes_failed_attempts(self):
+        self.worker = DHTWorker(11, 26, interval=0.01, reader=failing_reader)
+        self.worker.start()
+        deadline = time.monotonic() + 5
+        while self.worker.get_status()[1] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        attempted, failures = self.worker.get_status()
+
+        self.assertEqual((None, None, None), self.worker.read())
+        self.assertGreaterEqual(failures, 2)
+        self.assertLess(time.time() - attempted, 5)
+
+    def test_stop_releases_the_worker(self):
+        self.worker.start()
+        self.worker.stop()
+        self.assertFalse(self.worker.is_running())
+        self.assertIsNone(self.worker.shm)
@@ -0,0 +1,202 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from libs import DS18B20 as DS18B20_module
+from libs.DS18B20 import DS18B20
+from DS18B20Error import DS18B20Error
+
+GOOD_READING = ("72 01 4b 46 7f ff 0e 10 57 : crc=57 YES\n"
+                "72 01 4b 46 7f ff 0e 10 57 t=23125\n")
+BAD_READING = ("72 01 4b 46 7f ff 0e 10 57 : crc=00 NO\n"
+               "72 01 4b 46 7f ff 0e 10 57 t=23125\n")
+
+
+class DS18B20TestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.tmp.name, "28-000005e2fdc3"))
+        self.w1_slave = os.path.join(self.tmp.name, "28-000005e2fdc3", "w1_slave")
+        self.write_reading(GOOD_READING)
+        self.ds18b20 = DS18B20(base_dir=self.tmp.name + "/", max_retries=3)
+
+    def tearDown(self):
+        self.ds18b20.stop_sampler()
+        self.ds18b20.close()
+        self.tmp.cleanup()
+
+    def write_reading(self, reading, w1_slave=None):
+        # Rewrite in place, the sensor keeps the file open
+        w1_slave = w1_slave or self.w1_slave
+        with open(w1_slave, "r+" if os.path.exists(w1_slave) else "w") as f:
+            f.write(reading)
+            f.truncate()
+
+    def add_probe(self, device_id, reading):
+        os.mkdir(os.path.join(self.tmp.name, device_id))
+        self.write_reading(reading, os.path.join(self.tmp.name, device_id, "w1_slave"))
+        with open(os.path.join(self.tmp.name, device_id, "resolution"), "w") as f:
+            f.write("12\n")
+
+    def add_bus_master(self, state="0"):
+        os.mkdir(os.path.join(self.tmp.name, "w1_bus_master1"))
+        self.bulk_read_file = os.path.join(self.tmp.name, "w1_bus_master1", "therm_bulk_read")
+        with open(self.bulk_read_file, "w") as f:
+            f.write(state + "\n")
+
+    def multi_probe_sensor(self):
+        self.add_probe("28-000005e2aaaa", GOOD_READING.replace("t=23125", "t=30000"))
+        self.add_probe("28-000005e2bbbb", BAD_READING)
+        self.add_bus_master()
+        return DS18B20(base_dir=self.tmp.name + "/", max_retries=0)
+
+    ''' READ TESTS ##############################################################################################'''
+
+    def test_read_temp(self):
+        self.assertEqual(23.125, self.ds18b20.read_temp())
+
+    def test_read_temp_keeps_the_file_open(self):
+        self.ds18b20.read_temp()
+        f = self.ds18b20._files["28-000005e2fdc3"]
+        self.write_reading(GOOD_READING.replace("t=23125", "t=24500"))
+        self.assertEqual(24.5, self.ds18b20.read_temp())
+        self.assertIs(f, self.ds18b20._files["28-000005e2fdc3"])
+
+    def test_read_temp_waits_for_the_file_of_another_thread(self):
+        thread = threading.Thread(target=self.ds18b20.read_temp)
+        with self.ds18b20._files_lock:
+            thread.start()
+            thread.join(0.1)
+            self.assertTrue(thread.is_alive())
+        thread.join(1)
+        self.assertFalse(thread.is_alive())
+
+    @patch.object(DS18B20_module.time, "sleep")
+    def test_read_temp_gives_up_after_max_retries(self, mock_sleep):
+        self.write_reading(BAD_READING)
+        self.assertRaises(DS18B20Error, self.ds18b20.read_temp)
+        self.assertEqual(3, mock_sleep.call_count)
+
+    @patch.object(DS18B20_module.time, "monotonic")
+    @patch.object(DS18B20_module.time, "sleep")
+    def test_read_temp_gives_up_after_timeout(self, mock_sleep, mock_monotonic):
+        clock = [0.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+        mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        self.write_reading(BAD_READING)
+        self.ds18b20.max_retries = 100
+        self.ds18b20.timeout = 0.5
+        self.assertRaises(DS18B20Error, self.ds18b20.read_temp)
+        self.assertEqual(2, mock_sleep.call_count)
+
+    def test_read_temp_without_sensor(self):
+        ds18b20 = DS18B20(base_dir=os.path.join(self.tmp.name, "missing") + "/")
+        self.assertRaises(DS18B20Error, ds18b20.read_temp)
+
+    ''' SAMPLER TESTS ###########################################################################################'''
+
+    def test_get_latest_before_first_sample(self):
+        self.assertEqual((None, None), self.ds18b20.get_latest())
+
+    def test_sampler_keeps_the_latest_reading(self):
+        before = time.time()
+        self.ds18b20.start_sampler(interval=0.01)
+        while self.ds18b20.get_latest()[0] is None:
+            time.sleep(0.01)
+        temperature, timestamp = self.ds18b20.get_latest()
+        self.assertEqual(23.125, temperature)
+        self.assertGreaterEqual(timestamp, before)
+        self.assertTrue(self.ds18b20.is_sampling())
+
+    def test_sampler_keeps_the_previous_reading_on_errors(self):
+        readings = iter([21.0])
+
+        def read_temp(device_id=None):
+            temperature = next(readings, None)
+            if temperature is None:
+                raise DS18B20Error("CRC")
+            return temperature
+
+        with patch.object(self.ds18b20, "read_temp", side_effect=read_temp):
+            self.ds18b20.start_sampler(interval=0.01)
+            time.sleep(0.1)
+            self.ds18b20.stop_sampler()
+        self.assertEqual(21.0, self.ds18b20.get_latest()[0])
+        self.assertFalse(self.ds18b20.is_sampling())
+
+    ''' MULTI-PROBE TESTS #######################################################################################'''
+
+    def test_every_probe_is_found(self):
+        ds18b20 = self.multi_probe_sensor()
+        self.assertEqual(["28-000005e2aaaa", "28-000005e2bbbb", "28-000005e2fdc3"], ds18b20.device_ids)
+        self.assertEqual(30.0, ds18b20.read_temp())
+        self.assertEqual(23.125, ds18b20.read_temp("28-000005e2fdc3"))
+        ds18b20.close()
+
+    def test_read_all_triggers_a_bulk_conversion(self):
+        ds18b20 = self.multi_probe_sensor()
+        temperatures = ds18b20.read_all()
+        ds18b20.close()
+        self.assertEqual({"28-000005e2aaaa": 30.0, "28-000005e2bbbb": None, "28-000005e2fdc3": 23.125},
+                         temperatures)
+        with open(self.bulk_read_file) as f:
+            self.assertEqual("trigger\n", f.read())
+
+    @patch.object(DS18B20_module.time, "monotonic")
+    @patch.object(DS18B20_module.time, "sleep")
+    def test_read_all_gives_up_on_a_stuck_bulk_conversion(self, mock_sleep, mock_monotonic):
+        clock = [0.0]
+        mock_monotonic.side_effect = lambda: clock[0]
+        mock_sleep.side_effect = lambda seconds: clock.__setitem__(0, clock[0] + seconds)
+        ds18b20 = self.multi_probe_sensor()
+        real_open = open
+
+        def fake_open(path, mode="r", *args, **kwargs):
+            # The bus master keeps reporting conversions in progress
+            if path == self.bulk_read_file and mode == "r":
+                return io.StringIO("-1\n")
+            return real_open(path, mode, *args, **kwargs)
+
+        with patch("builtins.open", side_effect=fake_open):
+            self.assertRaises(DS18B20Error, ds18b20.read_all)
+
+    def test_read_all_without_bus_master(self):
+        self.add_probe("28-000005e2aaaa", GOOD_READING.replace("t=23125", "t=30000"))
+        ds18b20 = DS18B20(base_dir=self.tmp.name + "/")
+        self.assertEqual({"28-000005e2aaaa": 30.0, "28-000005e2fdc3": 23.125}, ds18b20.read_all())
+        ds18b20.close()
+
+    def test_sampler_keeps_every_probe(self):
+        ds18b20 = self.multi_probe_sensor()
+        ds18b20.start_sampler(interval=0.01)
+        while ds18b20.get_latest("28-000005e2fdc3")[0] is None:
+            time.sleep(0.01)
+        ds18b20.stop_sampler()
+        ds18b20.close()
+        self.assertEqual(30.0, ds18b20.get_latest()[0])
+        self.assertEqual((None, None), ds18b20.get_latest("28-000005e2bbbb"))
+
+    ''' RESOLUTION TESTS ########################################################################################'''
+
+    def test_set_resolution_of_one_probe(self):
+        ds18b20 = self.multi_probe_sensor()
+        ds18b20.set_resolution(9, "28-000005e2aaaa")
+        self.assertEqual(9, ds18b20.get_resolution("28-000005e2aaaa"))
+        self.assertEqual(12, ds18b20.get_resolution("28-000005e2bbbb"))
+
+    def test_set_resolution_of_every_probe(self):
+        ds18b20 = self.multi_probe_sensor()
+        ds18b20.device_ids.remove("28-000005e2fdc3")
+        ds18b20.set_resolution(10)
+        self.assertEqual([10, 10], [ds18b20.get_resolution(device_id) for device_id in ds18b20.device_ids])
+
+    def test_set_unsupported_resolution(self):
+        self.assertRaises(ValueError, self.ds18b20.set_resolution, 8)
+
+    def test_set_resolution_without_sysfs_support(self):
+        # Older kernels have no resolution attribute
+        self.assertRaises(DS18B20Error, self.ds18b20.get_resolution)
@@ -4,14 +4,28 @@ try:
 except ImportError:
     import mock.GPIO as GPIO
     import mock.Adafruit_DHT as Adafruit_DHT
+import math
+import threading
+import time
 import unittest
-from unittest.mock import call
+from unittest.mock import Mock, call
 from LCDError import LCDError
 from DHTError import DHTError
+from DS18B20Error import DS18B20Error
 from unittest.mock import patch
 from EmbeddedPool import EmbeddedPool
-from libs.DFRobot_ADS1115 import ADS1115
+from libs.DFRobot_ADS1115 import ADS1115, ScanResult, ADS1115_PGA_COEFFICIENTS, ADS1115_REG_CONFIG_PGA_6_144V
+from ConversionTables import ConversionTables
+from CircuitBreaker import CircuitBreaker
 from libs.DS18B20 import DS18B20
+from libs.DHT11_IIO import DHT11_IIO
+from DHTWorker import DHTWorker
+from libs.Adafruit_LCD1602 import Adafruit_CharLCD
+
+
+def adc_code(millivolts, gain=ADS1115_REG_CONFIG_PGA_6_144V):
+    # ADS1115.read_code result that converts back to exactly millivolts (read_voltage truncates to whole mV)
+    return math.ceil(millivolts / ADS1115_PGA_COEFFICIENTS[gain]), gain
 
 
 class MyTestCase(unittest.TestCase):
@@ -59,6 +73,51 @@ class MyTestCase(unittest.TestCase):
 
         self.assertTrue(self.ep.correct_water_temperature)
 
+    @patch.object(DS18B20, "read_temp")
+    @patch.object(DS18B20, "get_latest")
+    @patch.object(DS18B20, "is_sampling")
+    def test_check_water_temperature_uses_the_sampled_value(self, mock_is_sampling, mock_get_latest,
+                                                            mock_read_temp):
+        mock_is_sampling.return_value = True
+        timestamp = time.time()
+        mock_get_latest.return_value = (26.00, timestamp)
+
+        self.ep.check_water_temperature()
+
+        mock_read_temp.assert_not_called()
+        self.assertEqual(26.00, self.ep.water_temperature)
+        self.assertEqual(timestamp, self.ep.water_temperature_timestamp)
+        self.assertTrue(self.ep.correct_water_temperature)
+
+    @patch.object(DS18B20, "read_temp")
+    @patch.object(DS18B20, "get_latest")
+    @patch.object(DS18B20, "is_sampling")
+    def test_check_water_temperature_before_the_first_sample(self, mock_is_sampling, mock_get_latest,
+                                                             mock_read_temp):
+        mock_is_sampling.return_value = True
+        mock_get_latest.return_value = (None, None)
+
+        self.assertRaises(DS18B20Error, self.ep.check_water_temperature)
+        mock_read_temp.assert_not_called()
+
+    def test_check_water_temperature_with_stale_sample(self):
+        read_all = Mock(side_effect=[{"28-000005e2fdc3": 21.0}] + [DS18B20Error("Probe unplugged")] * 1000)
+        self.ep.ds18b20.device_ids = ["28-000005e2fdc3"]
+        with patch.object(self.ep.ds18b20, "read_all", read_all):
+            self.ep.ds18b20.start_sampler(interval=0.01)
+            try:
+                deadline = time.monotonic() + 5
+                while read_all.call_count < 3 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.ep.check_water_temperature()
+                self.assertEqual(21.0, self.ep.water_temperature)
+
+                now = time.time()
+                with patch("EmbeddedPool.time.time", return_value=now + self.ep.WATER_TEMP_MAX_AGE + 1):
+                    self.assertRaises(DS18B20Error, self.ep.check_water_temperature)
+            finally:
+                self.ep.ds18b20.stop_sampler()
+
     ''' ENV. TEMP. + HUMIDITY TESTS ################################################################################ '''
     @patch.object(Adafruit_DHT, "read_retry")
     @patch.object(DS18B20, "read_temp")
@@ -128,109 +187,389 @@ class MyTestCase(unittest.TestCase):
 
         self.assertRaises(DHTError, self.ep.check_humidity_and_environment_temperature)
 
+    @patch.object(Adafruit_DHT, "read_retry")
+    @patch.object(DHT11_IIO, "read")
+    @patch.object(DHT11_IIO, "is_available")
+    @patch.object(DS18B20, "read_temp")
+    def test_check_environment_temperature_and_humidity_with_kernel_driver(self, mock_read_temp, mock_is_available,
+                                                                          mock_read, mock_read_retry):
+        mock_read_temp.return_value = 26.00
+        mock_is_available.return_value = True
+        # DHT11_IIO.read returns (humidity, temperature) too
+        mock_read.return_value = (27.00, 25.00)
+
+        self.ep.check_water_temperature()
+        self.ep.check_humidity_and_environment_temperature()
+
+        mock_read_retry.assert_not_called()
+        self.assertTrue(self.ep.correct_humidity)
+        self.assertTrue(self.ep.correct_environment_temperature)
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    @patch.object(DHTWorker, "get_status")
+    @patch.object(DHTWorker, "read")
+    @patch.object(DHTWorker, "is_running")
+    @patch.object(DS18B20, "read_temp")
+    def test_check_environment_temperature_and_humidity_with_worker(self, mock_read_temp, mock_is_running, mock_read,
+                                                                    mock_get_status, mock_read_retry):
+        mock_read_temp.return_value = 26.00
+        mock_is_running.return_value = True
+        # DHTWorker.read returns (humidity, temperature, timestamp)
+        timestamp = time.time()
+        mock_read.return_value = (40.00, 25.00, timestamp)
+        # DHTWorker.get_status returns (attempted, failures)
+        mock_get_status.return_value = (timestamp, 0)
+
+        self.ep.check_water_temperature()
+        self.ep.check_humidity_and_environment_temperature()
+
+        mock_read_retry.assert_not_called()
+        self.assertFalse(self.ep.correct_humidity)
+        self.assertTrue(self.ep.correct_environment_temperature)
+        self.assertEqual(timestamp, self.ep.environment_timestamp)
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    @patch.object(DHTWorker, "get_status")
+    @patch.object(DHTWorker, "read")
+    @patch.object(DHTWorker, "is_running")
+    def test_check_environment_temperature_and_humidity_before_the_first_worker_reading(self, mock_is_running,
+                                                                                      mock_read, mock_get_status,
+                                                                                      mock_read_retry):
+        mock_is_running.return_value = True
+        mock_read.return_value = (None, None, None)
+        mock_get_status.return_value = (None, 0)
+
+        self.assertRaises(DHTError, self.ep.check_humidity_and_environment_temperature)
+        mock_read_retry.assert_not_called()
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    @patch.object(DHTWorker, "get_status")
+    @patch.object(DHTWorker, "read")
+    @patch.object(DHTWorker, "is_running")
+    def test_check_environment_temperature_and_humidity_with_failing_sensor(self, mock_is_running, mock_read,
+                                                                          mock_get_status, mock_read_retry):
+        mock_is_running.return_value = True
+        # The worker keeps trying, but its last valid reading is old
+        mock_read.return_value = (40.00, 25.00, time.time() - 2 * EmbeddedPool.DHT_MAX_AGE)
+        mock_get_status.return_value = (time.time(), 20)
+
+        self.assertRaises(DHTError, self.ep.check_humidity_and_environment_temperature)
+        mock_read_retry.assert_not_called()
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    @patch.object(DHTWorker, "get_status")
+    @patch.object(DHTWorker, "read")
+    @patch.object(DHTWorker, "is_running")
+    def test_check_environment_temperature_and_humidity_with_stalled_worker(self, mock_is_running, mock_read,
+                                                                          mock_get_status, mock_read_retry):
+        mock_is_running.return_value = True
+        timestamp = time.time() - 2 * EmbeddedPool.DHT_MAX_AGE
+        mock_read.return_value = (40.00, 25.00, timestamp)
+        mock_get_status.return_value = (timestamp, 0)
+
+        self.assertRaises(DHTError, self.ep.check_humidity_and_environment_temperature)
+        mock_read_retry.assert_not_called()
+
     ''' pH TESTS ################################################################################################### '''
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_water_ph_with_good_ph_value(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_with_good_ph_value(self, mock_read_code):
         # IMPORTANT: if the voltage is 1450 mV, the pH will be 7.28 (which is good)
-        mock_read_voltage.return_value = 1450
+        mock_read_code.return_value = adc_code(1450)
 
         self.ep.check_water_ph()
 
         self.assertTrue(self.ep.is_acceptable_ph)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_water_ph_with_too_low_ph_value(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_with_too_low_ph_value(self, mock_read_code):
         # IMPORTANT: if the voltage is 2000 mV, the pH will be 4.18 (which is bad)
-        mock_read_voltage.return_value = 2000
+        mock_read_code.return_value = adc_code(2000)
 
         self.ep.check_water_ph()
 
         self.assertFalse(self.ep.is_acceptable_ph)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_water_ph_with_too_high_ph_value(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_with_too_high_ph_value(self, mock_read_code):
         # IMPORTANT: if the voltage is 500 mV, the pH will be 12.63 (which is bad)
-        mock_read_voltage.return_value = 500
+        mock_read_code.return_value = adc_code(500)
 
         self.ep.check_water_ph()
 
         self.assertFalse(self.ep.is_acceptable_ph)
 
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_is_compensated_with_water_temperature(self, mock_read_code):
+        # 1400 mV is pH 7.56 at 25°C, the probe slope is smaller in cold water: 7.60 at 5°C
+        mock_read_code.return_value = adc_code(1400)
+        self.ep.water_temperature = 5.0
+
+        self.ep.check_water_ph()
+
+        self.assertAlmostEqual(self.ep.ph_helper.read_PH(1400, 5.0), self.ep.water_ph)
+        self.assertGreater(self.ep.water_ph, self.ep.ph_helper.read_PH(1400, None))
+        self.assertFalse(self.ep.is_acceptable_ph)
+
     ''' ORP/CHLORINE TESTS ######################################################################################### '''
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_orp_with_good_orp(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_orp_with_good_orp(self, mock_read_code):
         # 1230 mV -> 770 mV (ORP)
-        mock_read_voltage.return_value = 1230
+        mock_read_code.return_value = adc_code(1230)
 
         self.ep.check_orp()
 
         self.assertTrue(self.ep.is_acceptable_orp)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_orp_with_too_low_orp(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_orp_with_too_low_orp(self, mock_read_code):
         # 2000 mV -> 0 mV (ORP)
-        mock_read_voltage.return_value = 2000
+        mock_read_code.return_value = adc_code(2000)
 
         self.ep.check_orp()
 
         self.assertFalse(self.ep.is_acceptable_orp)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_orp_with_too_high_orp(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_orp_with_too_high_orp(self, mock_read_code):
         # 800 mV -> 1200 mV (ORP)
-        mock_read_voltage.return_value = 800
+        mock_read_code.return_value = adc_code(800)
 
         self.ep.check_orp()
 
         self.assertFalse(self.ep.is_acceptable_orp)
 
     ''' WATER TURBIDITY TESTS ###################################################################################### '''
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_turbidity_with_good_turbidity(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_turbidity_with_good_turbidity(self, mock_read_code):
         # 4300 mV -> O NTU
-        mock_read_voltage.return_value = 4300
+        mock_read_code.return_value = adc_code(4300)
 
         self.ep.check_turbidity()
 
         self.assertTrue(self.ep.is_acceptable_turbidity)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_turbidity_with_too_high_turbidity(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_turbidity_with_too_high_turbidity(self, mock_read_code):
         # 2500 mV -> 3000.35 NTU
-        mock_read_voltage.return_value = 2500
+        mock_read_code.return_value = adc_code(2500)
 
         self.ep.check_turbidity()
 
         self.assertFalse(self.ep.is_acceptable_turbidity)
 
     ''' ENVIRONMENT LIGHT TESTS #################################################################################### '''
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_environment_light_level_with_good_lighting(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_environment_light_level_with_good_lighting(self, mock_read_code):
         # 1390 mV -> 373 lux
-        mock_read_voltage.return_value = 1390
+        mock_read_code.return_value = adc_code(1390)
 
         self.ep.check_environment_light_level()
 
         self.assertTrue(self.ep.is_acceptable_light)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_environment_light_level_with_too_low_lighting(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_environment_light_level_with_too_low_lighting(self, mock_read_code):
         # 0 mV -> 0 lux
-        mock_read_voltage.return_value = 0
+        mock_read_code.return_value = adc_code(0)
 
         self.ep.check_environment_light_level()
 
         self.assertFalse(self.ep.is_acceptable_light)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_check_environment_light_level_with_too_high_lighting(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_check_environment_light_level_with_too_high_lighting(self, mock_read_code):
         # 4930 mV -> 1443 lux
-        mock_read_voltage.return_value = 4930
+        mock_read_code.return_value = adc_code(4930)
 
         self.ep.check_environment_light_level()
 
         self.assertFalse(self.ep.is_acceptable_light)
 
+    ''' ANALOG SCAN TESTS ########################################################################################## '''
+    @patch.object(ADS1115, "scan")
+    def test_check_analog_sensors_with_all_values_good(self, mock_scan):
+        voltages = {
+            self.ep.PH_SENSOR_PIN: 1450,
+            self.ep.TURBIDITY_SENSOR_PIN: 4300,
+            self.ep.ENV_LIGHT_SENSOR_PIN: 1390,
+            self.ep.ORP_SENSOR_PIN: 1230
+        }
+        mock_scan.return_value = ScanResult(0.0, voltages, {pin: adc_code(mv) for pin, mv in voltages.items()})
+
+        self.ep.check_analog_sensors()
+
+        mock_scan.assert_called_once()
+        self.assertTrue(self.ep.is_acceptable_ph)
+        self.assertTrue(self.ep.is_acceptable_orp)
+        self.assertTrue(self.ep.is_acceptable_turbidity)
+        self.assertTrue(self.ep.is_acceptable_light)
+
+    @patch.object(ADS1115, "scan")
+    def test_check_analog_sensors_trips_only_the_failing_probe(self, mock_scan):
+        voltages = {
+            self.ep.PH_SENSOR_PIN: 1450,
+            self.ep.TURBIDITY_SENSOR_PIN: 4300,
+            self.ep.ENV_LIGHT_SENSOR_PIN: 1390,
+            self.ep.ORP_SENSOR_PIN: 1230
+        }
+        mock_scan.return_value = ScanResult(0.0, voltages, {pin: adc_code(mv) for pin, mv in voltages.items()})
+
+        with patch.object(EmbeddedPool, "check_turbidity", side_effect=OSError("Probe disconnected")):
+            for _ in range(self.ep.SENSOR_FAILURE_THRESHOLD):
+                self.ep.read_cache.invalidate()
+                succeeded = self.ep.check_analog_sensors()
+
+        self.assertEqual({"check_water_ph", "check_orp", "check_environment_light_level"}, set(succeeded))
+        health = self.ep.get_sensor_health()
+        self.assertEqual("open", health["check_turbidity"]["state"])
+        self.assertEqual("closed", health["check_water_ph"]["state"])
+        # The degraded probe is left out of the next scan
+        self.ep.read_cache.invalidate()
+        self.ep.check_analog_sensors()
+        self.assertNotIn(self.ep.TURBIDITY_SENSOR_PIN, mock_scan.call_args[0][0])
+
+    @patch.object(ADS1115, "read_code")
+    @patch.object(ADS1115, "scan")
+    def test_check_analog_sensors_skips_fresh_readings(self, mock_scan, mock_read_code):
+        mock_read_code.return_value = adc_code(1230)
+        mock_scan.return_value = ScanResult(0.0, {}, {pin: adc_code(1450) for pin in self.ep.ADC_GAINS})
+        self.ep.read_sensor("check_orp")
+
+        self.ep.check_analog_sensors()
+
+        self.assertNotIn(self.ep.ORP_SENSOR_PIN, mock_scan.call_args[0][0])
+        self.assertEqual(770, self.ep.orp)
+
+    @patch.object(ADS1115, "read_code")
+    @patch.object(ADS1115, "scan")
+    def test_check_analog_sensors_reads_each_probe_when_the_scan_fails(self, mock_scan, mock_read_code):
+        mock_scan.side_effect = OSError("I2C error")
+        mock_read_code.return_value = adc_code(1450)
+
+        succeeded = self.ep.check_analog_sensors()
+
+        self.assertEqual(4, mock_read_code.call_count)
+        self.assertEqual(set(self.ep.ANALOG_CHECKS), set(succeeded))
+        self.assertTrue(self.ep.are_sensors_healthy())
+
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_with_given_voltage_does_not_read_adc(self, mock_read_code):
+        self.ep.check_water_ph(2000)
+
+        mock_read_code.assert_not_called()
+        self.assertFalse(self.ep.is_acceptable_ph)
+
+    ''' LOOKUP TABLE TESTS ######################################################################################### '''
+    @patch.object(ADS1115, "read_code")
+    def test_check_methods_read_codes_through_the_tables(self, mock_read_code):
+        # 7733 * 0.1875 = 1449 mV, 6560 * 0.1875 = 1230 mV, 22933 * 0.1875 = 4299 mV, 7413 * 0.1875 = 1389 mV
+        mock_read_code.return_value = (7733, ADS1115_REG_CONFIG_PGA_6_144V)
+        self.ep.check_water_ph()
+        mock_read_code.return_value = (6560, ADS1115_REG_CONFIG_PGA_6_144V)
+        self.ep.check_orp()
+        mock_read_code.return_value = (22933, ADS1115_REG_CONFIG_PGA_6_144V)
+        self.ep.check_turbidity()
+        mock_read_code.return_value = (7413, ADS1115_REG_CONFIG_PGA_6_144V)
+        self.ep.check_environment_light_level()
+
+        self.assertAlmostEqual(self.ep.voltage_to_ph(1449), self.ep.water_ph)
+        self.assertEqual(self.ep.voltage_to_orp(1230), self.ep.orp)
+        self.assertIsInstance(self.ep.orp, int)
+        self.assertEqual(self.ep.voltage_to_turbidity(4299), self.ep.water_turbidity)
+        self.assertEqual(self.ep.voltage_to_lux(1389), self.ep.environment_light)
+        self.assertEqual({(pin, ADS1115_REG_CONFIG_PGA_6_144V) for pin in self.ep.ADC_GAINS},
+                         set(self.ep.conversion_tables.tables))
+
+    @patch.object(ConversionTables, "table")
+    @patch.object(ADS1115, "read_code")
+    def test_check_water_ph_does_not_evaluate_the_formula(self, mock_read_code, mock_table):
+        mock_read_code.return_value = (7733, ADS1115_REG_CONFIG_PGA_6_144V)
+        mock_table.return_value = {7733: 7.3}
+
+        with patch.object(self.ep.ph_helper, "read_PH") as mock_read_ph:
+            self.ep.check_water_ph()
+
+        mock_read_ph.assert_not_called()
+        self.assertEqual(7.3, self.ep.water_ph)
+
+    def test_convert_adc_codes_applies_ph_temperature_compensation(self):
+        self.ep.water_temperature = 30.0
+
+        self.assertAlmostEqual(self.ep.voltage_to_ph(1450, 30.0),
+                               self.ep.convert_adc_codes(self.ep.PH_SENSOR_PIN, [23200], gain=0x04)[0])
+
+    def test_convert_adc_codes_with_explicit_gain(self):
+        # 23200 * 0.0625 = 1450 mV
+        self.assertEqual([self.ep.voltage_to_ph(1450)],
+                         self.ep.convert_adc_codes(self.ep.PH_SENSOR_PIN, [23200], gain=0x04))
+
+    ''' ADC ALARM TESTS ############################################################################################ '''
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_enable_ph_alarm_uses_ph_thresholds(self, mock_set_window_alarm):
+        self.ep.enable_ph_alarm()
+
+        channel, low, high, alert_pin, on_alert = mock_set_window_alarm.call_args.args
+        self.assertEqual(self.ep.PH_SENSOR_PIN, channel)
+        self.assertAlmostEqual(self.ep.PH_MAX, self.ep.ph_helper.read_PH(low, None))
+        self.assertAlmostEqual(self.ep.PH_MIN, self.ep.ph_helper.read_PH(high, None))
+        self.assertEqual(self.ep.ADC_ALERT_PIN, alert_pin)
+
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_enable_orp_alarm_uses_orp_thresholds(self, mock_set_window_alarm):
+        self.ep.enable_orp_alarm()
+
+        channel, low, high, alert_pin, on_alert = mock_set_window_alarm.call_args.args
+        self.assertEqual(self.ep.ORP_SENSOR_PIN, channel)
+        self.assertEqual((1230, 1250), (low, high))
+
+    @patch.object(EmbeddedPool, "ORP_OFFSET", 10)
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_enable_orp_alarm_follows_the_orp_calibration(self, mock_set_window_alarm):
+        self.ep.enable_orp_alarm()
+
+        channel, low, high, alert_pin, on_alert = mock_set_window_alarm.call_args.args
+        self.assertEqual(self.ep.ORP_MAX, self.ep.voltage_to_orp(low))
+        self.assertEqual(self.ep.ORP_MIN, self.ep.voltage_to_orp(high))
+
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_ph_alarm_updates_ph_and_calls_back(self, mock_set_window_alarm):
+        callback = Mock()
+        self.ep.enable_ph_alarm(callback)
+        on_alert = mock_set_window_alarm.call_args.args[4]
+
+        on_alert(self.ep.PH_SENSOR_PIN, 2000)
+
+        self.assertFalse(self.ep.is_acceptable_ph)
+        callback.assert_called_once_with()
+
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_ph_alarm_waits_for_the_running_check(self, mock_set_window_alarm):
+        self.ep.enable_ph_alarm()
+        on_alert = mock_set_window_alarm.call_args.args[4]
+        alert = threading.Thread(target=on_alert, args=(self.ep.PH_SENSOR_PIN, 2000))
+
+        with self.ep.analog_lock:
+            alert.start()
+            alert.join(0.05)
+            self.assertTrue(alert.is_alive())
+            self.assertIsNone(self.ep.water_ph)
+        alert.join(5)
+
+        self.assertFalse(self.ep.is_acceptable_ph)
+
+    @patch.object(ADS1115, "read_code")
+    @patch.object(ADS1115, "set_window_alarm")
+    def test_ph_alarm_invalidates_the_cached_reading(self, mock_set_window_alarm, mock_read_code):
+        mock_read_code.return_value = adc_code(1450)
+        self.assertTrue(self.ep.read_sensor("check_water_ph")["is_acceptable_ph"])
+        self.ep.enable_ph_alarm()
+        on_alert = mock_set_window_alarm.call_args.args[4]
+
+        on_alert(self.ep.PH_SENSOR_PIN, 2000)
+        mock_read_code.return_value = adc_code(2000)
+
+        self.assertFalse(self.ep.read_sensor("check_water_ph")["is_acceptable_ph"])
+
     ''' WATER LEVEL TESTS ########################################################################################## '''
     @patch.object(GPIO, "input")
     def test_check_water_level_with_correct_level(self, mock_input):
@@ -248,6 +587,97 @@ class MyTestCase(unittest.TestCase):
 
         self.assertFalse(self.ep.is_water_level_good)
 
+    @patch.object(GPIO, "add_event_detect")
+    @patch.object(GPIO, "input")
+    def test_enable_water_level_interrupts(self, mock_input, mock_add_event_detect):
+        mock_input.return_value = 1
+
+        self.ep.enable_water_level_interrupts(debounce=20)
+
+        self.assertTrue(self.ep.is_water_level_good)
+        mock_add_event_detect.assert_called_once_with(self.ep.WATER_LEVEL_PIN, GPIO.BOTH,
+                                                      callback=self.ep.water_level_event, bouncetime=20)
+        # The loop no longer polls the sensor
+        mock_input.return_value = 0
+        self.ep.check_water_level()
+        self.assertTrue(self.ep.is_water_level_good)
+
+    @patch.object(GPIO, "input")
+    def test_water_level_change_is_accepted_after_settle_time(self, mock_input):
+        mock_input.return_value = 1
+        self.ep.enable_water_level_interrupts(settle_time=0.01)
+
+        mock_input.return_value = 0
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+        self.assertTrue(self.ep.is_water_level_good)
+        self.ep.water_level_timer.join()
+
+        self.assertFalse(self.ep.is_water_level_good)
+
+    @patch.object(GPIO, "input")
+    def test_water_level_slosh_is_ignored(self, mock_input):
+        mock_input.return_value = 1
+        self.ep.enable_water_level_interrupts(settle_time=10)
+
+        mock_input.return_value = 0
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+        timer = self.ep.water_level_timer
+        mock_input.return_value = 1
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+
+        self.assertTrue(timer.finished.is_set())  # Cancelled
+        self.assertIsNone(self.ep.water_level_timer)
+        self.assertTrue(self.ep.is_water_level_good)
+
+    @patch.object(GPIO, "input")
+    def test_water_level_change_that_does_not_hold_is_ignored(self, mock_input):
+        mock_input.return_value = 1
+        self.ep.enable_water_level_interrupts(settle_time=0.05)
+        mock_input.return_value = 0
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+        timer = self.ep.water_level_timer
+        # Back to the previous level, without an edge
+        mock_input.return_value = 1
+
+        timer.join()
+
+        self.assertTrue(self.ep.is_water_level_good)
+        self.assertIsNone(self.ep.water_level_timer)
+
+    @patch.object(GPIO, "input")
+    def test_stale_water_level_timer_leaves_the_new_one_alone(self, mock_input):
+        mock_input.return_value = 1
+        self.ep.enable_water_level_interrupts(settle_time=10)
+        mock_input.return_value = 0
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+        timer = self.ep.water_level_timer
+        # A cancelled timer that had already fired gets the lock after the new timer started
+        stale = threading.Thread(target=self.ep.settle_water_level, args=(False,))
+
+        stale.start()
+        stale.join(5)
+
+        self.assertIs(timer, self.ep.water_level_timer)
+        self.assertTrue(self.ep.is_water_level_good)
+        self.ep.disable_water_level_interrupts()
+        self.assertTrue(timer.finished.is_set())  # Still cancellable
+
+    @patch.object(GPIO, "remove_event_detect")
+    @patch.object(GPIO, "input")
+    def test_disable_water_level_interrupts(self, mock_input, mock_remove_event_detect):
+        mock_input.return_value = 1
+        self.ep.enable_water_level_interrupts(settle_time=10)
+        mock_input.return_value = 0
+        self.ep.water_level_event(self.ep.WATER_LEVEL_PIN)
+        timer = self.ep.water_level_timer
+
+        self.ep.disable_water_level_interrupts()
+        self.ep.check_water_level()
+
+        mock_remove_event_detect.assert_called_once_with(self.ep.WATER_LEVEL_PIN)
+        timer.join()
+        self.assertFalse(self.ep.is_water_level_good)
+
     ''' SERVO MOTOR TESTS ########################################################################################## '''
     @patch.object(GPIO, "output")
     @patch.object(Adafruit_DHT, "read_retry")
@@ -322,10 +752,10 @@ class MyTestCase(unittest.TestCase):
         self.assertFalse(self.ep.are_windows_open)
 
     ''' LED TESTS ################################################################################################## '''
-    @patch.object(ADS1115, "read_voltage")
+    @patch.object(ADS1115, "read_code")
     @patch.object(GPIO, "output")
-    def test_control_led_with_correct_lighting(self, mock_output, mock_read_voltage):
-        mock_read_voltage.return_value = 1390
+    def test_control_led_with_correct_lighting(self, mock_output, mock_read_code):
+        mock_read_code.return_value = adc_code(1390)
 
         self.ep.check_environment_light_level()
         self.ep.control_led()
@@ -333,10 +763,10 @@ class MyTestCase(unittest.TestCase):
         mock_output.assert_called_once_with(self.ep.LED_PIN, GPIO.LOW)
         self.assertFalse(self.ep.is_led_on)
 
-    @patch.object(ADS1115, "read_voltage")
+    @patch.object(ADS1115, "read_code")
     @patch.object(GPIO, "output")
-    def test_control_led_with_too_low_lighting(self, mock_output, mock_read_voltage):
-        mock_read_voltage.return_value = 100
+    def test_control_led_with_too_low_lighting(self, mock_output, mock_read_code):
+        mock_read_code.return_value = adc_code(100)
 
         self.ep.check_environment_light_level()
         self.ep.control_led()
@@ -344,10 +774,10 @@ class MyTestCase(unittest.TestCase):
         mock_output.assert_called_once_with(self.ep.LED_PIN, GPIO.HIGH)
         self.assertTrue(self.ep.is_led_on)
 
-    @patch.object(ADS1115, "read_voltage")
+    @patch.object(ADS1115, "read_code")
     @patch.object(GPIO, "output")
-    def test_control_led_with_too_high_lighting(self, mock_output, mock_read_voltage):
-        mock_read_voltage.return_value = 4000
+    def test_control_led_with_too_high_lighting(self, mock_output, mock_read_code):
+        mock_read_code.return_value = adc_code(4000)
 
         self.ep.check_environment_light_level()
         self.ep.control_led()
@@ -495,10 +925,10 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual("WatTmp 26.00" + chr(223) + "C  \nWater Level: BAD", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_2_with_ph_and_orp_good(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_2_with_ph_and_orp_good(self, mock_read_code):
         self.ep.current_screen = 2
-        mock_read_voltage.side_effect = [1450, 1230]
+        mock_read_code.side_effect = [adc_code(1450), adc_code(1230)]
 
         self.ep.check_water_ph()
         self.ep.check_orp()
@@ -506,10 +936,10 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual("pH        7.28  \nORP     770 mV  ", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_2_with_ph_and_orp_bad(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_2_with_ph_and_orp_bad(self, mock_read_code):
         self.ep.current_screen = 2
-        mock_read_voltage.side_effect = [2000, 2000]
+        mock_read_code.side_effect = [adc_code(2000), adc_code(2000)]
 
         self.ep.check_water_ph()
         self.ep.check_orp()
@@ -517,10 +947,10 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual("pH        4.18 #\nORP       0 mV #", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_2_with_good_ph(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_2_with_good_ph(self, mock_read_code):
         self.ep.current_screen = 2
-        mock_read_voltage.side_effect = [1450, 2000]
+        mock_read_code.side_effect = [adc_code(1450), adc_code(2000)]
 
         self.ep.check_water_ph()
         self.ep.check_orp()
@@ -528,10 +958,10 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual("pH        7.28  \nORP       0 mV #", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_2_with_good_orp(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_2_with_good_orp(self, mock_read_code):
         self.ep.current_screen = 2
-        mock_read_voltage.side_effect = [2000, 1230]
+        mock_read_code.side_effect = [adc_code(2000), adc_code(1230)]
 
         self.ep.check_water_ph()
         self.ep.check_orp()
@@ -539,40 +969,40 @@ class MyTestCase(unittest.TestCase):
 
         self.assertEqual("pH        4.18 #\nORP     770 mV  ", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_3_with_good_lighting_level(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_3_with_good_lighting_level(self, mock_read_code):
         self.ep.current_screen = 3
-        mock_read_voltage.return_value = 1390
+        mock_read_code.return_value = adc_code(1390)
 
         self.ep.check_environment_light_level()
         self.ep.update_current_screen_text()
 
         self.assertEqual("Env. Light      \n       373 lux  ", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_3_with_bad_lighting_level(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_3_with_bad_lighting_level(self, mock_read_code):
         self.ep.current_screen = 3
-        mock_read_voltage.return_value = 0
+        mock_read_code.return_value = adc_code(0)
 
         self.ep.check_environment_light_level()
         self.ep.update_current_screen_text()
 
         self.assertEqual("Env. Light      \n         0 lux #", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_4_with_good_water_turbidity(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_4_with_good_water_turbidity(self, mock_read_code):
         self.ep.current_screen = 4
-        mock_read_voltage.return_value = 4300
+        mock_read_code.return_value = adc_code(4300)
 
         self.ep.check_turbidity()
         self.ep.update_current_screen_text()
 
         self.assertEqual("Water Turbidity \n      0.00 NTU  ", self.ep.current_lcd_text)
 
-    @patch.object(ADS1115, "read_voltage")
-    def test_update_current_screen_text_on_screen_4_with_bad_water_turbidity(self, mock_read_voltage):
+    @patch.object(ADS1115, "read_code")
+    def test_update_current_screen_text_on_screen_4_with_bad_water_turbidity(self, mock_read_code):
         self.ep.current_screen = 4
-        mock_read_voltage.return_value = 2500
+        mock_read_code.return_value = adc_code(2500)
 
         self.ep.check_turbidity()
         self.ep.update_current_screen_text()
@@ -666,3 +1096,427 @@ class MyTestCase(unittest.TestCase):
         self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
 
         self.assertEqual(0, self.ep.current_screen)
+
+    ''' LOW-POWER MODE TESTS ####################################################################################### '''
+    def test_enable_low_power_mode_turns_off_lcd_backlight(self):
+        self.ep.turn_on_lcd_backlight()
+
+        self.ep.enable_low_power_mode()
+
+        self.assertTrue(self.ep.is_low_power_mode_on)
+        self.assertFalse(self.ep.is_lcd_backlight_on)
+
+    def test_button_event_in_low_power_mode_turns_on_lcd_backlight(self):
+        self.ep.enable_low_power_mode()
+        self.ep.water_temperature = 26
+        self.ep.is_water_level_good = True
+
+        self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+
+        self.assertTrue(self.ep.is_lcd_backlight_on)
+
+    @patch("EmbeddedPool.time.monotonic")
+    def test_update_lcd_backlight_after_timeout(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        self.ep.enable_low_power_mode()
+        self.ep.wake_lcd_backlight()
+
+        mock_monotonic.return_value = 100.0 + self.ep.LCD_BACKLIGHT_TIMEOUT - 1
+        self.ep.update_lcd_backlight()
+        self.assertTrue(self.ep.is_lcd_backlight_on)
+
+        mock_monotonic.return_value = 100.0 + self.ep.LCD_BACKLIGHT_TIMEOUT
+        self.ep.update_lcd_backlight()
+        self.assertFalse(self.ep.is_lcd_backlight_on)
+
+    def test_button_wake_waits_for_the_backlight_timeout(self):
+        self.ep.turn_on_lcd_backlight()
+        turn_off_lcd_backlight = self.ep.turn_off_lcd_backlight
+        errors = []
+
+        def wake():
+            try:
+                self.ep.wake_lcd_backlight()
+            except LCDError as e:
+                errors.append(e)
+        button = threading.Thread(target=wake)
+
+        def turn_off_during_a_press():
+            # A button press between the timeout check and the switch waits for it to complete
+            button.start()
+            button.join(0.05)
+            self.assertTrue(button.is_alive())
+            turn_off_lcd_backlight()
+        with patch.object(self.ep, "turn_off_lcd_backlight", side_effect=turn_off_during_a_press):
+            self.ep.update_lcd_backlight()
+        button.join(5)
+
+        self.assertEqual([], errors)
+        self.assertTrue(self.ep.is_lcd_backlight_on)
+
+    @patch("EmbeddedPool.time.sleep")
+    @patch("EmbeddedPool.time.monotonic")
+    def test_idle_until_next_acquisition_reports_duty_cycle(self, mock_monotonic, mock_sleep):
+        mock_monotonic.return_value = 0.0
+        self.ep.enable_low_power_mode()
+
+        # The acquisition took 3 s, so the loop sleeps for the rest of the interval
+        mock_monotonic.return_value = 3.0
+        self.ep.idle_until_next_acquisition(0.0)
+        mock_sleep.assert_called_once_with(self.ep.LOW_POWER_ACQUISITION_INTERVAL - 3.0)
+
+        mock_monotonic.return_value = self.ep.LOW_POWER_ACQUISITION_INTERVAL
+        self.assertAlmostEqual(3.0 / self.ep.LOW_POWER_ACQUISITION_INTERVAL, self.ep.get_duty_cycle())
+
+    def test_get_duty_cycle_without_low_power_mode(self):
+        self.assertIsNone(self.ep.get_duty_cycle())
+
+    ''' SENSOR HEALTH TESTS ######################################################################################## '''
+    @patch.object(DS18B20, "read_temp")
+    def test_safe_check_with_working_sensor(self, mock_read_temp):
+        mock_read_temp.return_value = 26.00
+
+        self.assertTrue(self.ep.safe_check("check_water_temperature"))
+
+        self.assertTrue(self.ep.correct_water_temperature)
+        self.assertTrue(self.ep.are_sensors_healthy())
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    def test_safe_check_skips_failing_sensor(self, mock_read_retry):
+        mock_read_retry.return_value = [None, None]
+
+        for _ in range(self.ep.SENSOR_FAILURE_THRESHOLD):
+            self.assertFalse(self.ep.safe_check("check_humidity_and_environment_temperature"))
+        self.assertFalse(self.ep.safe_check("check_humidity_and_environment_temperature"))
+
+        self.assertEqual(self.ep.SENSOR_FAILURE_THRESHOLD, mock_read_retry.call_count)
+        health = self.ep.get_sensor_health()["check_humidity_and_environment_temperature"]
+        self.assertEqual("open", health["state"])
+        self.assertIsInstance(health["last_error"], DHTError)
+        self.assertFalse(self.ep.are_sensors_healthy())
+
+    @patch.object(ADS1115, "read_code")
+    def test_safe_check_passes_the_arguments_through_the_breaker(self, mock_read_code):
+        with patch.object(CircuitBreaker, "call", wraps=self.ep.sensor_breakers["check_orp"].call) as mock_call:
+            self.assertTrue(self.ep.safe_check("check_orp", code=adc_code(1230)))
+
+        mock_call.assert_called_once()
+        mock_read_code.assert_not_called()
+        self.assertEqual(770, self.ep.orp)
+
+    @patch.object(GPIO, "output")
+    @patch.object(GPIO, "input")
+    def test_loop_steps_work_without_readings(self, mock_input, mock_output):
+        mock_input.return_value = 1
+        self.ep.check_water_level()
+
+        self.ep.control_windows()
+        self.ep.control_led()
+        for screen in range(self.ep.FIRST_SCREEN, self.ep.LAST_SCREEN + 1):
+            self.ep.current_screen = screen
+            self.ep.update_current_screen_text()
+
+        mock_output.assert_not_called()
+        self.ep.current_screen = 1
+        self.ep.update_current_screen_text()
+        self.assertEqual(f"WatTmp     -{chr(223)}C #\nWater Level:  OK", self.ep.current_lcd_text)
+
+    ''' ADAPTIVE SAMPLING TESTS #################################################################################### '''
+    @patch("AdaptiveSampling.time.monotonic")
+    @patch.object(ADS1115, "read_code")
+    def test_run_adaptive_checks_reads_every_sensor_at_first(self, mock_read_code, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        mock_read_code.return_value = adc_code(1450)
+        self.ep.enable_adaptive_sampling()
+
+        checks = self.ep.run_adaptive_checks()
+
+        self.assertEqual({"check_water_ph", "check_orp", "check_turbidity", "check_environment_light_level"},
+                         set(checks))
+        self.assertEqual(4, mock_read_code.call_count)
+        self.assertIsNotNone(self.ep.water_ph)
+
+    @patch("AdaptiveSampling.time.monotonic")
+    @patch.object(ADS1115, "read_code")
+    def test_run_adaptive_checks_skips_stable_sensors(self, mock_read_code, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        mock_read_code.side_effect = lambda channel: adc_code({
+            self.ep.PH_SENSOR_PIN: 1460,  # pH 7.23, close to PH_MIN
+            self.ep.ORP_SENSOR_PIN: 1240,  # ORP 760, in the middle of the band
+            self.ep.TURBIDITY_SENSOR_PIN: 4300,  # Clear water, 0 NTU
+            self.ep.ENV_LIGHT_SENSOR_PIN: 1200,  # 315 lux
+        }[channel])
+        self.ep.enable_adaptive_sampling()
+        self.ep.run_adaptive_checks()
+
+        mock_monotonic.return_value = 1.0
+        checks = self.ep.run_adaptive_checks()
+
+        # Only the pH is close enough to a threshold to be read again after 1 s
+        self.assertEqual(["check_water_ph"], checks)
+        self.assertEqual(1.0, self.ep.time_until_next_adaptive_check())
+
+    @patch("AdaptiveSampling.time.monotonic")
+    @patch.object(ADS1115, "read_code")
+    def test_run_adaptive_checks_retries_failed_sensor_soon(self, mock_read_code, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        mock_read_code.side_effect = OSError("I2C error")
+        self.ep.enable_adaptive_sampling()
+        self.ep.run_adaptive_checks()
+
+        self.assertEqual(self.ep.ADAPTIVE_MIN_INTERVAL, self.ep.time_until_next_adaptive_check())
+        self.assertEqual("closed", self.ep.get_sensor_health()["check_water_ph"]["state"])
+
+    ''' CHANGE DETECTION TESTS ##################################################################################### '''
+    @patch.object(ADS1115, "read_code")
+    def test_detect_changes_reports_each_value_once(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1450)
+        self.ep.check_water_ph()
+
+        self.assertIn("water_ph", self.ep.detect_changes())
+        self.assertEqual(set(), self.ep.detect_changes())
+
+    @patch.object(ADS1115, "read_code")
+    def test_only_changes_are_logged_at_info_level(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1450)
+        self.ep.detect_changes()
+
+        with self.assertLogs(level="INFO") as logs:
+            self.ep.check_water_ph()
+            self.ep.detect_changes()
+
+        self.assertEqual(["INFO:root:CHANGED water_ph = %s" % self.ep.water_ph], logs.output)
+
+    @patch.object(ADS1115, "read_code")
+    def test_detect_changes_ignores_noise_within_deadband(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1450)
+        self.ep.check_water_ph()
+        self.ep.detect_changes()
+
+        # 1 mV is about 0.006 pH
+        mock_read_code.return_value = adc_code(1451)
+        self.ep.check_water_ph()
+
+        self.assertEqual(set(), self.ep.detect_changes())
+
+    @patch.object(ADS1115, "read_code")
+    def test_detect_changes_reports_threshold_crossing(self, mock_read_code):
+        # 400 lux, then 401 lux: within the deadband but above LUX_MAX
+        mock_read_code.return_value = adc_code(1480)
+        self.ep.check_environment_light_level()
+        self.ep.detect_changes()
+        mock_read_code.return_value = adc_code(1483)
+        self.ep.check_environment_light_level()
+
+        self.assertEqual({"environment_light"}, self.ep.detect_changes())
+
+    @patch.object(Adafruit_CharLCD, "update")
+    def test_lcd_update_only_redraws_for_values_on_screen(self, mock_message):
+        self.ep.water_ph = 7.4
+        self.ep.orp = 760
+        self.ep.current_screen = 2
+
+        self.ep.lcd_update({"humidity"})
+        mock_message.assert_not_called()
+
+        self.ep.lcd_update({"orp"})
+        mock_message.assert_called_once()
+
+    ''' ON-DEMAND READING TESTS #################################################################################### '''
+    @patch.object(ADS1115, "read_code")
+    def test_read_sensor_returns_the_check_values(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1230)
+
+        self.assertEqual({"orp": 770, "is_acceptable_orp": True}, self.ep.read_sensor("check_orp"))
+
+    @patch.object(ADS1115, "read_code")
+    def test_read_sensor_is_cached(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1230)
+        self.ep.read_sensor("check_orp")
+
+        mock_read_code.return_value = adc_code(2000)
+        self.assertEqual({"orp": 770, "is_acceptable_orp": True}, self.ep.read_sensor("check_orp"))
+
+        mock_read_code.assert_called_once()
+
+    @patch.object(ADS1115, "read_code")
+    def test_safe_check_shares_the_on_demand_reading(self, mock_read_code):
+        mock_read_code.return_value = adc_code(1230)
+
+        self.assertTrue(self.ep.safe_check("check_orp"))
+        self.assertEqual({"orp": 770, "is_acceptable_orp": True}, self.ep.read_sensor("check_orp"))
+        self.assertTrue(self.ep.safe_check("check_orp"))
+
+        mock_read_code.assert_called_once()
+
+    @patch.object(Adafruit_DHT, "read_retry")
+    def test_read_sensor_raises_check_errors(self, mock_read_retry):
+        mock_read_retry.return_value = [None, None]
+
+        self.assertRaises(DHTError, self.ep.read_sensor, "check_humidity_and_environment_temperature")
+
+    ''' SCREEN CACHE TESTS ######################################################################################### '''
+    def test_render_screens_only_renders_screens_with_changed_values(self):
+        self.ep.orp = 760
+        self.ep.render_screens({"orp"})
+
+        self.assertEqual([2], list(self.ep.screen_cache))
+        self.assertEqual("pH           - #\nORP     760 mV #", self.ep.screen_cache[2][0])
+
+    def test_render_screens_pre_encodes_the_screens(self):
+        self.ep.render_screens()
+
+        self.assertEqual(list(range(self.ep.FIRST_SCREEN, self.ep.LAST_SCREEN + 1)), sorted(self.ep.screen_cache))
+        # 2 cursor moves and 32 characters, 6 port values each
+        self.assertEqual(34 * 6, len(self.ep.screen_cache[0][1]))
+
+    @patch.object(Adafruit_CharLCD, "clear")
+    def test_button_event_shows_the_cached_screen_in_one_burst(self, mock_clear):
+        self.ep.orp = 760
+        self.ep.render_screens()
+        self.ep.orp = 0  # not reported yet, the cached screen is shown
+
+        with patch.object(self.ep.pcf.chip, "writeBytes") as mock_write_bytes:
+            self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+            self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+
+        self.assertEqual(2, mock_write_bytes.call_count)
+        mock_clear.assert_not_called()
+        self.assertEqual("pH           - #\nORP     760 mV #", self.ep.current_lcd_text)
+        self.assertEqual(list("ORP     760 mV #"), self.ep.lcd.ddram[1][:16])
+
+    def test_button_event_renders_an_uncached_screen(self):
+        self.ep.water_turbidity = 0
+
+        self.ep.button_prev_event(self.ep.BUTTON_PREV_PIN)
+
+        self.assertEqual("Water Turbidity \n      0.00 NTU #", self.ep.current_lcd_text)
+        self.assertIn(4, self.ep.screen_cache)
+
+    def test_lcd_update_renders_screens_that_are_not_shown(self):
+        self.ep.orp = 760
+        self.ep.lcd_update({"orp"})
+
+        self.assertEqual(0, self.ep.current_screen)
+        self.assertEqual("pH           - #\nORP     760 mV #", self.ep.screen_cache[2][0])
+
+    ''' LCD RENDER THREAD TESTS #################################################################################### '''
+    def test_post_lcd_request_merges_pending_requests(self):
+        self.ep.post_lcd_request(changed={"orp"})
+        self.ep.post_lcd_request(screen=3)
+        self.ep.post_lcd_request(screen=2)
+        self.ep.post_lcd_request(changed={"humidity"})
+
+        self.assertEqual(({"orp", "humidity"}, 2), self.ep.lcd_request)
+
+    def test_post_lcd_request_for_all_values_wins(self):
+        self.ep.post_lcd_request(changed={"orp"})
+        self.ep.post_lcd_request(changed=None)
+        self.ep.post_lcd_request(changed={"humidity"})
+
+        self.assertEqual((None, None), self.ep.lcd_request)
+
+    def test_lcd_update_without_changes_posts_nothing(self):
+        with patch.object(self.ep, "is_lcd_renderer_running", return_value=True), \
+                patch.object(self.ep, "post_lcd_request") as mock_post_lcd_request:
+            self.ep.lcd_update(set())
+
+        mock_post_lcd_request.assert_not_called()
+
+    def test_button_event_with_renderer_only_posts_the_switch(self):
+        self.ep.start_lcd_renderer()
+        drawing = threading.Event()
+        release = threading.Event()
+        redrawn = threading.Event()
+
+        def slow_draw(changed, screen):
+            if drawing.is_set():
+                redrawn.set()
+            drawing.set()
+            release.wait(5)
+        try:
+            with patch.object(self.ep, "draw_lcd", side_effect=slow_draw) as mock_draw_lcd, \
+                    patch.object(self.ep, "show_screen") as mock_show_screen:
+                self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+                self.assertTrue(drawing.wait(5))
+                # The LCD is busy, the next presses are collapsed into one redraw
+                self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+                self.ep.button_next_event(self.ep.BUTTON_NEXT_PIN)
+                self.ep.button_prev_event(self.ep.BUTTON_PREV_PIN)
+                release.set()
+                self.assertTrue(redrawn.wait(5))
+                self.ep.stop_lcd_renderer()
+
+                mock_show_screen.assert_not_called()
+                # The latest screen wins
+                self.assertEqual([call(frozenset(), 1), call(frozenset(), 2)], mock_draw_lcd.call_args_list)
+            self.assertEqual(2, self.ep.current_screen)
+        finally:
+            release.set()
+            self.ep.stop_lcd_renderer()
+
+    def test_button_event_is_not_held_back_by_a_draw(self):
+        self.ep.orp = 760
+        self.ep.current_screen = 2
+        self.ep.start_lcd_renderer()
+        drawing = threading.Event()
+        release = threading.Event()
+
+        def slow_update(message):
+            drawing.set()
+            release.wait(5)
+        try:
+            with patch.object(Adafruit_CharLCD, "update", side_effect=slow_update), \
+                    patch.object(Adafruit_CharLCD, "show"):
+                self.ep.lcd_update({"orp"})
+                self.assertTrue(drawing.wait(5))
+                button = threading.Thread(target=self.ep.button_next_event, args=(self.ep.BUTTON_NEXT_PIN,))
+                button.start()
+                button.join(1)
+
+                self.assertFalse(button.is_alive())
+                self.assertEqual(3, self.ep.current_screen)
+                release.set()
+                self.ep.stop_lcd_renderer()
+        finally:
+            release.set()
+            self.ep.stop_lcd_renderer()
+
+    def test_lcd_update_with_renderer_draws_in_the_render_thread(self):
+        self.ep.orp = 760
+        self.ep.current_screen = 2
+        self.ep.start_lcd_renderer()
+        drawn = threading.Event()
+
+        def draw(message):
+            self.assertIsNot(threading.main_thread(), threading.current_thread())
+            drawn.set()
+        try:
+            with patch.object(Adafruit_CharLCD, "update", side_effect=draw):
+                self.ep.lcd_update({"orp"})
+
+                self.assertTrue(drawn.wait(5))
+        finally:
+            self.ep.stop_lcd_renderer()
+        self.assertFalse(self.ep.is_lcd_renderer_running())
+
+    def test_lcd_render_thread_survives_a_failed_draw(self):
+        self.ep.start_lcd_renderer()
+        failed = threading.Event()
+        drawn = threading.Event()
+
+        def draw(changed, screen):
+            if not failed.is_set():
+                failed.set()
+                raise OSError("I2C error")
+            drawn.set()
+        try:
+            with patch.object(self.ep, "draw_lcd", side_effect=draw):
+                self.ep.post_lcd_request(screen=0)
+                self.assertTrue(failed.wait(5))
+                self.ep.post_lcd_request(screen=0)
+
+                self.assertTrue(drawn.wait(5))
+                self.assertTrue(self.ep.is_lcd_renderer_running())
+        finally:
+            self.ep.stop_lcd_renderer()
@@ -0,0 +1,90 @@
+try:
+    import smbus
+except ImportError:
+    import mock.smbus as smbus
+import threading
+import unittest
+from unittest.mock import call, patch
+from libs.PCF8574 import PCF8574_GPIO
+
+
+class PCF8574_GPIOTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pcf = PCF8574_GPIO(0x27)
+
+    ''' BATCH TESTS #############################################################################################'''
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_output_outside_a_batch_writes_immediately(self, mock_write_byte):
+        self.pcf.output(3, 1)
+        self.pcf.output(0, 1)
+
+        self.assertEqual([call(0x27, 0x08), call(0x27, 0x09)], mock_write_byte.call_args_list)
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_batch_writes_once_on_exit(self, mock_write_byte):
+        with self.pcf.batch():
+            self.pcf.output(3, 1)
+            self.pcf.output(0, 1)
+            self.pcf.output(2, 1)
+            mock_write_byte.assert_not_called()
+
+        mock_write_byte.assert_called_once_with(0x27, 0x0D)
+        self.assertEqual(0x0D, self.pcf.readPort())
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_batch_skips_the_write_when_unchanged(self, mock_write_byte):
+        with self.pcf.batch():
+            self.pcf.output(3, 1)
+            self.pcf.output(3, 0)
+
+        mock_write_byte.assert_not_called()
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_nested_batches_write_on_the_outermost_exit(self, mock_write_byte):
+        with self.pcf.batch():
+            with self.pcf.batch():
+                self.pcf.output(3, 1)
+            mock_write_byte.assert_not_called()
+
+        mock_write_byte.assert_called_once_with(0x27, 0x08)
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_batch_flushes_when_the_body_raises(self, mock_write_byte):
+        with self.assertRaises(RuntimeError):
+            with self.pcf.batch():
+                self.pcf.output(3, 1)
+                raise RuntimeError()
+
+        mock_write_byte.assert_called_once_with(0x27, 0x08)
+
+    @patch.object(smbus.SMBus, "write_i2c_block_data")
+    def test_batch_joins_sequences_in_one_burst(self, mock_block):
+        with self.pcf.batch():
+            self.pcf.outputSequence([1, 2, 3])
+            self.pcf.outputSequence([4, 5])
+            self.pcf.output(3, 1)  # 5 | 0x08
+
+        mock_block.assert_called_once_with(0x27, 1, [2, 3, 4, 5, 0x0D])
+
+    @patch.object(smbus.SMBus, "write_byte")
+    def test_batch_from_another_thread_waits_for_the_open_batch(self, mock_write_byte):
+        with self.pcf.batch():
+            self.pcf.output(0, 1)
+            other = threading.Thread(target=self.backlight_on)
+            other.start()
+            other.join(0.05)
+            self.assertTrue(other.is_alive())
+            mock_write_byte.assert_not_called()
+        other.join(5)
+
+        self.assertEqual([call(0x27, 0x01), call(0x27, 0x09)], mock_write_byte.call_args_list)
+
+    def backlight_on(self):
+        with self.pcf.batch():
+            self.pcf.output(3, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
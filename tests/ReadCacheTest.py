@@ -0,0 +1,97 @@
+import threading
+import time
+import unittest
+from ReadCache import ReadCache
+
+
+class ReadCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.cache = ReadCache({"ph": 1.0}, clock=lambda: self.now)
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.loads
+
+    ''' TTL TESTS ###############################################################################################'''
+
+    def test_value_is_cached_for_its_ttl(self):
+        self.assertEqual(1, self.cache.get("ph", self.load))
+        self.now = 0.9
+        self.assertEqual(1, self.cache.get("ph", self.load))
+        self.now = 1.0
+        self.assertEqual(2, self.cache.get("ph", self.load))
+
+    def test_default_ttl(self):
+        self.cache.get("orp", self.load)
+
+        self.assertEqual(2, self.cache.get("orp", self.load))
+
+    def test_is_fresh(self):
+        self.assertFalse(self.cache.is_fresh("ph"))
+        self.cache.get("ph", self.load)
+        self.assertTrue(self.cache.is_fresh("ph"))
+        self.now = 1.0
+        self.assertFalse(self.cache.is_fresh("ph"))
+
+    def test_invalidate(self):
+        self.cache.get("ph", self.load)
+        self.cache.invalidate("ph")
+
+        self.assertEqual(2, self.cache.get("ph", self.load))
+
+    def test_failed_load_is_not_cached(self):
+        def fail():
+            raise OSError("I2C error")
+
+        self.assertRaises(OSError, self.cache.get, "ph", fail)
+        self.assertEqual(1, self.cache.get("ph", self.load))
+
+    ''' SINGLE-FLIGHT TESTS #####################################################################################'''
+
+    def run_concurrently(self, load, callers=5):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def slow_load():
+            started.set()
+            release.wait()
+            return load()
+
+        def caller():
+            try:
+                # No TTL: a caller arriving after the load would load again
+                results.append(self.cache.get("orp", slow_load))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=caller) for _ in range(callers)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)  # Let the other callers reach the in-flight load
+        release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_callers_share_one_load(self):
+        results = self.run_concurrently(self.load)
+
+        self.assertEqual(1, self.loads)
+        self.assertEqual([1] * 5, results)
+
+    def test_concurrent_callers_share_the_error(self):
+        def fail():
+            self.loads += 1
+            raise OSError("I2C error")
+
+        results = self.run_concurrently(fail)
+
+        self.assertEqual(1, self.loads)
+        self.assertEqual(5, len(results))
+        self.assertTrue(all(isinstance(result, OSError) for result in results))